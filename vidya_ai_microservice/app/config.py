@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, TypeVar
+from typing import Any, Dict, List, Literal, Optional, Type, TypeVar
 
 from pydantic import BaseModel, Field, ConfigDict
 from pydantic_settings import BaseSettings
@@ -12,6 +12,8 @@ from pydantic_settings import BaseSettings
 class WeightConfig(BaseModel):
     """Weights applied to each layer for final risk aggregation."""
 
+    model_config = ConfigDict(frozen=True)
+
     image_quality_weight: float = Field(0.15, ge=0.0)
     asset_match_weight: float = Field(0.20, ge=0.0)
     ocr_match_weight: float = Field(0.20, ge=0.0)
@@ -25,11 +27,15 @@ class WeightConfig(BaseModel):
 class ThresholdConfig(BaseModel):
     """Routing thresholds for risk tiers."""
 
+    model_config = ConfigDict(frozen=True)
+
     auto_approve_threshold: int = Field(65, ge=0, le=100)
     officer_review_threshold: int = Field(85, ge=0, le=100)
 
 
 class QualityConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     blur_variance_threshold: float = 100.0
     brightness_dark_threshold: float = 60.0
     brightness_bright_threshold: float = 220.0
@@ -40,12 +46,16 @@ class QualityConfig(BaseModel):
 
 
 class DetectionConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     confidence_threshold: float = Field(0.45, ge=0.0, le=1.0)
     iou_threshold: float = Field(0.4, ge=0.0, le=1.0)
     asset_synonyms: Dict[str, List[str]] = Field(default_factory=dict)
 
 
 class OCRConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     provider_confidence_threshold: float = Field(0.7, ge=0.0, le=1.0)
     amount_tolerance_pct: float = Field(0.25, ge=0.0, le=1.0)
     date_tolerance_days: int = 30
@@ -56,11 +66,16 @@ class OCRConfig(BaseModel):
 
 
 class DuplicateConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     hash_distance_threshold: int = 5
     duplicate_penalty_points: float = 15.0
+    cross_applicant: bool = Field(True, description="Match hashes across the whole portfolio, not just the applicant")
 
 
 class FraudRuleConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     gps_threshold_km: float = 25.0
     gps_penalty: float = 15.0
     off_hours_start: int = 7
@@ -82,9 +97,17 @@ class Settings(BaseSettings):
         default=Path(__file__).resolve().parents[1] / "configs" / "risk_weights.default.json",
         description="Path to JSON file carrying weight overrides.",
     )
+    runtime_config_path: Path = Field(
+        default=Path(__file__).resolve().parents[1] / "data" / "runtime_config.db",
+        description="SQLite history of runtime config versions; the newest wins over weight_file until that file changes.",
+    )
     duplicate_state_path: Path = Field(
+        default=Path(__file__).resolve().parents[1] / "data" / "vidya_state.db",
+        description="SQLite database persisting perceptual hashes and usage counters.",
+    )
+    legacy_state_path: Optional[Path] = Field(
         default=Path(__file__).resolve().parents[1] / "data" / "duplicates_state.json",
-        description="Path for persisting perceptual hash comparisons.",
+        description="JSON state from earlier releases, imported once into the SQLite store.",
     )
     device_state_path: Path = Field(
         default=Path(__file__).resolve().parents[1] / "data" / "device_state.json",
@@ -93,11 +116,104 @@ class Settings(BaseSettings):
     google_credentials_path: Optional[Path] = Field(default=None, description="Service account key for Vision API")
     google_api_key: Optional[str] = Field(default=None, description="Direct API key for Google Vision REST usage", validation_alias="GOOGLE_API_KEY")
     google_project_id: Optional[str] = Field(default=None)
+    vision_api_url: str = Field("https://vision.googleapis.com/v1", description="Base URL for the Vision REST API")
+    vision_timeout_seconds: float = Field(10.0, gt=0, description="Per-request timeout for Vision REST calls")
+    vision_max_concurrency: int = Field(4, ge=1, description="Concurrent Vision REST requests (also the pool size)")
+    ocr_batch_window_ms: float = Field(
+        0.0,
+        ge=0.0,
+        description="Window for merging Vision REST pages from concurrent cases into one request (0 disables)",
+    )
+    vision_max_retries: int = Field(3, ge=0, description="Retries for 429/5xx Vision REST responses")
     yolo_model_path: Optional[Path] = Field(default=None)
+    yolo_backend: Optional[Literal["ultralytics", "onnx"]] = Field(
+        default=None,
+        description="Detection runtime; inferred from the model extension (.onnx -> onnx) when unset",
+    )
+    onnx_intra_op_threads: int = Field(0, ge=0, description="onnxruntime intra-op threads (0 lets ORT decide)")
+    detection_max_batch: int = Field(16, ge=1, description="Maximum frames per YOLO predict call")
+    detection_batch_window_ms: float = Field(
+        0.0,
+        ge=0.0,
+        description="Window for merging frames from concurrent cases into one YOLO call (0 disables)",
+    )
     model_registry_path: Path = Field(
         default=Path(__file__).resolve().parents[1] / "models",
         description="Folder containing serialized ML models.",
     )
+    media_max_bytes: int = Field(100 * 1024 * 1024, gt=0, description="Reject evidence payloads larger than this")
+    media_spool_threshold_bytes: int = Field(
+        8 * 1024 * 1024,
+        ge=0,
+        description="Payloads above this size are spooled to a temp file and memory-mapped",
+    )
+    fraud_model_version: Optional[str] = Field(
+        default=None,
+        description="Pin the live fraud model to this file stem (default: newest *.json in the registry)",
+    )
+    fraud_shadow_version: Optional[str] = Field(
+        default=None,
+        description="Candidate model scored in shadow and logged only; 'latest' tracks the newest non-live file",
+    )
+    model_poll_seconds: float = Field(30.0, ge=0.0, description="Registry polling interval for new models (0 disables)")
+    verification_registry_path: Path = Field(
+        default=Path(__file__).resolve().parents[1] / "data" / "verification_registry.db",
+        description="SQLite file holding the imported GSTN invoice and CBS sanction extracts",
+    )
+    verification_cache_entries: int = Field(
+        65536, ge=0, description="Hot GSTN/CBS lookups kept in memory per registry snapshot (0 disables)"
+    )
+    verification_poll_seconds: float = Field(
+        60.0, ge=0.0, description="Polling interval for a newly imported verification registry (0 disables)"
+    )
+    verification_seed_demo: bool = Field(
+        False,
+        description="Build the registry from the bundled sample records when the file does not exist (dev and tests only)",
+    )
+    gst_gateway_url: Optional[str] = Field(
+        default=None, description="Base URL of the GSTN invoice API (unset: answer from the verification registry)"
+    )
+    cbs_gateway_url: Optional[str] = Field(
+        default=None, description="Base URL of the CBS sanction API (unset: answer from the verification registry)"
+    )
+    verification_timeout_seconds: float = Field(2.0, gt=0, description="Per-request timeout for GSTN/CBS calls")
+    verification_max_concurrency: int = Field(
+        16, ge=1, description="Concurrent requests per verification endpoint (also its connection pool size)"
+    )
+    verification_cache_ttl_seconds: float = Field(
+        300.0, ge=0.0, description="How long GSTN/CBS gateway answers are reused (0 disables)"
+    )
+    verification_breaker_failures: int = Field(
+        5, ge=1, description="Consecutive failures that open a verification endpoint's circuit"
+    )
+    verification_breaker_reset_seconds: float = Field(
+        30.0, gt=0, description="How long an open verification circuit fails fast before a trial request"
+    )
+    result_cache_entries: int = Field(4096, ge=0, description="In-memory per-item result cache size (0 disables)")
+    result_cache_dir: Optional[Path] = Field(default=None, description="Optional on-disk tier for the result cache")
+    pipeline_max_workers: int = Field(4, ge=1, description="Thread pool size for concurrent pipeline stages")
+    response_timings: bool = Field(
+        False, description="Include per-stage timings in ScoreResponse (overridable per call with ?timings=)"
+    )
+    warm_up_backends: bool = Field(
+        True, description="Import OpenCV, pHash and the Vision SDK at startup on a background thread, not on first use"
+    )
+    execution_mode: Literal["thread", "process"] = Field(
+        "thread",
+        description="Score cases in the server process (thread) or in a pool of worker processes (process)",
+    )
+    process_workers: int = Field(0, ge=0, description="Worker processes in process mode (0 uses the CPU count)")
+    batch_max_workers: int = Field(4, ge=1, description="Cases scored concurrently by /cases/score:batch")
+    fraud_batch_window_ms: float = Field(
+        2.0,
+        ge=0.0,
+        description="Window for merging fraud rows of concurrent /cases/score:batch cases into one call (0 disables)",
+    )
+    batch_max_in_flight: int = Field(
+        0,
+        ge=0,
+        description="Packages read ahead of the client in /cases/score:batch (0 means twice batch_max_workers)",
+    )
     enable_mlflow_logging: bool = Field(False, description="Toggle MLflow logging for experiments")
 
     def load_runtime_config(self) -> Dict[str, Any]:
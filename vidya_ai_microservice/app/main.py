@@ -3,32 +3,84 @@
 from __future__ import annotations
 
 import asyncio
-from functools import lru_cache
-from typing import Dict
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 from . import get_version
-from .config import (
-    WeightConfig,
-    detection_config,
-    duplicate_config,
-    fraud_rule_config,
-    ocr_config,
-    quality_config,
-    threshold_config,
-    weight_config,
+from .config import ThresholdConfig, WeightConfig, settings
+from .schemas import (
+    ConfigUpdateRequest,
+    EvidencePackage,
+    HealthResponse,
+    ScoreResponse,
+    WeightSimulationRequest,
+    WeightSimulationResponse,
+    WeightUpdateRequest,
 )
-from .schemas import EvidencePackage, HealthResponse, ScoreResponse, WeightUpdateRequest
-from .services import VidyaAIPipeline
+from .services import BatchScorer, ProcessPoolScorer, VidyaAIPipeline, build_pipeline
+from .services.batch_scoring import iter_items, iter_ndjson
+from .utils.lazy_import import dependency_status, import_timings
+from .utils.metrics import ERRORS, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
 
 
 def create_app() -> FastAPI:
+    started = time.perf_counter()
+    pipeline = build_pipeline()
+    startup: Dict[str, float] = {"pipeline_build_ms": round((time.perf_counter() - started) * 1000, 2)}
+    warmed_up = threading.Event()
+    # In process mode the server pipeline still answers config/health calls,
+    # while scoring runs in worker processes that each hold their own models.
+    process_scorer = (
+        ProcessPoolScorer(pipeline, max_workers=settings.process_workers)
+        if settings.execution_mode == "process"
+        else None
+    )
+    # In thread mode the batch's cases share fraud-model calls; worker processes score alone.
+    score_fn = process_scorer.score_case if process_scorer else partial(pipeline.score_case, batched=True)
+    batch_scorer = BatchScorer(
+        lambda package: _present(score_fn(package), settings.response_timings),
+        max_workers=settings.batch_max_workers,
+        max_in_flight=settings.batch_max_in_flight,
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        if process_scorer is not None:
+            started = time.perf_counter()
+            await asyncio.get_running_loop().run_in_executor(None, process_scorer.start)
+            startup["worker_start_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            warmed_up.set()  # workers warm up in their initializer
+        elif settings.warm_up_backends:
+            # Serve immediately; the first cases import anything still missing themselves.
+            threading.Thread(target=_warm_up, name="vidya-warm-up", daemon=True).start()
+        else:
+            warmed_up.set()
+        # Load the scored-case portfolio before the first what-if simulation asks for it.
+        threading.Thread(target=_sync_portfolio, name="vidya-portfolio-sync", daemon=True).start()
+        yield
+        batch_scorer.shutdown()
+        if process_scorer is not None:
+            process_scorer.shutdown()
+
     app = FastAPI(
         title="VIDYA AI Risk Scoring Service",
         version=get_version(),
         description="Microservice for loan evidence verification, fraud detection, and routing.",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -39,15 +91,22 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    pipeline = VidyaAIPipeline(
-        weights=weight_config,
-        thresholds=threshold_config,
-        quality_cfg=quality_config,
-        detection_cfg=detection_config,
-        ocr_cfg=ocr_config,
-        duplicate_cfg=duplicate_config,
-        fraud_rules=fraud_rule_config,
-    )
+    def _warm_up() -> None:
+        started = time.perf_counter()
+        try:
+            pipeline.warm_up()
+        except Exception:  # pragma: no cover - a failed warm-up only moves the cost to the first case
+            logger.exception("backend warm-up failed")
+        startup["warm_up_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        warmed_up.set()
+
+    def _sync_portfolio() -> None:
+        started = time.perf_counter()
+        try:
+            pipeline.portfolio.sync()
+        except Exception:  # pragma: no cover - the first simulation retries the sync
+            logger.exception("portfolio sync failed")
+        startup["portfolio_sync_ms"] = round((time.perf_counter() - started) * 1000, 2)
 
     @lru_cache
     def get_pipeline() -> VidyaAIPipeline:
@@ -55,41 +114,183 @@ def create_app() -> FastAPI:
 
     @app.get("/health", response_model=HealthResponse)
     async def health() -> HealthResponse:
-        dependencies = {
-            "opencv": _is_module_available("cv2"),
-            "ultralytics": _is_module_available("ultralytics"),
-            "google_cloud_vision": _is_module_available("google.cloud.vision"),
-            "xgboost": _is_module_available("xgboost"),
-        }
-        return HealthResponse(status="ok", version=get_version(), dependencies=dependencies)
+        """Liveness plus cached backend availability; never imports anything itself."""
+        timings = dict(startup)
+        timings.update({f"import_{name}_ms": round(seconds * 1000, 2) for name, seconds in import_timings().items()})
+        return HealthResponse(
+            status="ok",
+            version=get_version(),
+            dependencies=dependency_status(),
+            warmed_up=warmed_up.is_set(),
+            startup=timings,
+        )
 
     @app.post("/cases/score", response_model=ScoreResponse)
-    async def score_case(payload: EvidencePackage, service: VidyaAIPipeline = Depends(get_pipeline)) -> ScoreResponse:
+    async def score_case(
+        payload: EvidencePackage,
+        previous_state_id: Optional[str] = None,
+        timings: Optional[bool] = None,
+        service: VidyaAIPipeline = Depends(get_pipeline),
+    ) -> ScoreResponse:
+        """Score a case; ``previous_state_id`` (from an earlier response) reruns only changed evidence."""
         loop = asyncio.get_running_loop()
+        include_timings = settings.response_timings if timings is None else timings
         try:
-            return await loop.run_in_executor(None, service.score_case, payload)
+            if process_scorer is not None:
+                # Packing decodes every inline payload into shared memory, so it
+                # runs off the event loop; only the wait for the worker is async.
+                pending = await loop.run_in_executor(None, process_scorer.submit, payload, previous_state_id)
+                response = await asyncio.wrap_future(pending)
+            else:
+                response = await loop.run_in_executor(None, service.score_case, payload, None, previous_state_id)
+            return _present(response, include_timings)
         except Exception as exc:  # pragma: no cover - runtime safeguard
+            ERRORS.inc(stage="case", kind="exception")
             raise HTTPException(status_code=500, detail=str(exc)) from exc
 
+    @app.post("/cases/score:batch")
+    async def score_batch(request: Request) -> StreamingResponse:
+        """Score a JSON array or NDJSON stream of packages; results stream back as NDJSON."""
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type in NDJSON_MEDIA_TYPES:
+            pump = _RequestBodyPump(request.receive)
+            return _BatchStreamingResponse(
+                batch_scorer.stream(iter_ndjson(pump.chunks())), pump, media_type="application/x-ndjson"
+            )
+        try:
+            body = json.loads(await request.body())
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {exc}") from exc
+        if not isinstance(body, list):
+            raise HTTPException(status_code=422, detail="Expected a JSON array of evidence packages")
+        return StreamingResponse(batch_scorer.stream(iter_items(body)), media_type="application/x-ndjson")
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        """Prometheus scrape endpoint (stage/item latency, cache, fallback and error counters)."""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @app.get("/config")
+    async def get_config(
+        version: Optional[int] = None, service: VidyaAIPipeline = Depends(get_pipeline)
+    ) -> Dict[str, Any]:
+        """The live runtime config, or the one a response's ``config_version`` names."""
+        snapshot = service.config if version is None else service.config_store.get(version)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail=f"Unknown config version {version}")
+        return snapshot.describe()
+
+    @app.get("/config/versions")
+    async def config_versions(limit: int = 50, service: VidyaAIPipeline = Depends(get_pipeline)) -> List[Dict[str, Any]]:
+        return service.config_store.history(limit)
+
+    @app.patch("/config")
+    async def update_config(
+        payload: ConfigUpdateRequest, service: VidyaAIPipeline = Depends(get_pipeline)
+    ) -> Dict[str, Any]:
+        """Record a new config version from partial sections; cases already running keep theirs."""
+        try:
+            snapshot = service.update_config(**payload.model_dump(exclude_none=True))
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        return snapshot.describe()
+
     @app.get("/config/weights")
     async def get_weights(service: VidyaAIPipeline = Depends(get_pipeline)) -> Dict[str, float]:
         return service.current_weights().model_dump()
 
     @app.patch("/config/weights", response_model=Dict[str, float])
     async def update_weights(payload: WeightUpdateRequest, service: VidyaAIPipeline = Depends(get_pipeline)) -> Dict[str, float]:
-        new_weights = WeightConfig(**payload.weights)
-        service.update_weights(new_weights)
-        return new_weights.model_dump()
+        try:
+            new_weights = WeightConfig(**payload.weights)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        return service.update_weights(new_weights).weights.model_dump()
+
+    @app.post("/config/weights/simulate", response_model=WeightSimulationResponse)
+    async def simulate_weights(
+        payload: WeightSimulationRequest, service: VidyaAIPipeline = Depends(get_pipeline)
+    ) -> WeightSimulationResponse:
+        """How every scored case would re-tier under the given weights/thresholds, without rescoring."""
+        try:
+            weights = WeightConfig(**{**service.current_weights().model_dump(), **payload.weights})
+            thresholds = ThresholdConfig(**{**service.config.thresholds.model_dump(), **payload.thresholds})
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None, service.simulate_weights, weights, thresholds, payload.verification_knockout
+        )
+        return WeightSimulationResponse(**result)
 
     return app
 
 
-def _is_module_available(module_name: str) -> bool:
-    try:
-        __import__(module_name)
-        return True
-    except Exception:
-        return False
+class _RequestBodyPump:
+    """Sole reader of ``receive`` for an NDJSON batch request.
+
+    ``StreamingResponse`` normally consumes ``receive`` to watch for client
+    disconnects, which would swallow request-body chunks still being read
+    while results stream out. The pump reads every message itself, hands body
+    chunks to the parser through a small bounded queue (so a slow pipeline
+    stops reading the socket), and exposes disconnects as an event.
+    """
+
+    def __init__(self, receive: Receive):
+        self._receive = receive
+        self._chunks: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=8)
+        self.disconnected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+        while (chunk := await self._chunks.get()) is not None:
+            yield chunk
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _pump(self) -> None:
+        body_done = False
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self.disconnected.set()
+                if not body_done:
+                    try:
+                        self._chunks.put_nowait(None)
+                    except asyncio.QueueFull:
+                        pass
+                return
+            if message["type"] == "http.request" and not body_done:
+                if message.get("body"):
+                    await self._chunks.put(message["body"])
+                if not message.get("more_body", False):
+                    body_done = True
+                    await self._chunks.put(None)
+
+
+class _BatchStreamingResponse(StreamingResponse):
+    """``StreamingResponse`` that learns about disconnects from the body pump."""
+
+    def __init__(self, content: AsyncIterator[str], pump: _RequestBodyPump, **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._pump = pump
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await self._pump.disconnected.wait()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._pump.stop()
+
+
+def _present(response: ScoreResponse, include_timings: bool) -> ScoreResponse:
+    return response if include_timings else response.model_copy(update={"timings": None})
 
 
 
@@ -101,11 +101,21 @@ class OCRResult(BaseModel):
     match_score: float = 1.0
 
 
+class DuplicateMatch(BaseModel):
+    case_id: str
+    applicant_id: str
+    evidence_id: str
+    hash_distance: int
+
+
 class DuplicateResult(BaseModel):
     evidence_id: str
     duplicate_found: bool
     hash_distance: int
     reference_case_id: Optional[str] = None
+    reference_applicant_id: Optional[str] = None
+    cross_applicant: bool = False
+    matches: List[DuplicateMatch] = Field(default_factory=list)
     penalty_points: float = 0.0
 
 
@@ -154,6 +164,14 @@ class ScoreResponse(BaseModel):
     
     # Detailed breakdown (Optional / secondary)
     scores: ScoreBreakdown
+    # Wall-clock milliseconds per pipeline stage (only when timings are switched on)
+    timings: Optional[Dict[str, float]] = None
+    # Pass back as ``previous`` to rescore only what changed
+    state_id: Optional[str] = None
+    # Layer results carried over from the previous state ("quality:<id>", "verification", ...)
+    reused_components: List[str] = Field(default_factory=list)
+    # Runtime config version every layer of this case was scored under (GET /config?version=)
+    config_version: Optional[int] = None
     # full_explanation: Dict[str, Any]  <-- REMOVED (Redundant & Huge)
 
 
@@ -161,7 +179,41 @@ class WeightUpdateRequest(BaseModel):
     weights: Dict[str, float]
 
 
+class ConfigUpdateRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    # Partial sections merged onto the live config; omitted sections and keys keep their value
+    weights: Optional[Dict[str, float]] = None
+    thresholds: Optional[Dict[str, int]] = None
+    quality: Optional[Dict[str, Any]] = None
+    detection: Optional[Dict[str, Any]] = None
+    ocr: Optional[Dict[str, Any]] = None
+    duplicates: Optional[Dict[str, Any]] = None
+    fraud_rules: Optional[Dict[str, Any]] = None
+
+
+class WeightSimulationRequest(BaseModel):
+    # Overrides on top of the live weights and thresholds; omitted keys keep their live value
+    weights: Dict[str, float] = Field(default_factory=dict)
+    thresholds: Dict[str, int] = Field(default_factory=dict)
+    # Also route cases that failed GST/bank verification to video verification
+    verification_knockout: bool = False
+
+
+class WeightSimulationResponse(BaseModel):
+    cases: int
+    # Tier counts under the live config and under the simulated one
+    baseline: Dict[str, int]
+    simulated: Dict[str, int]
+    # from tier -> to tier -> cases that would move (tiers with no movement omitted)
+    migrations: Dict[str, Dict[str, int]]
+    mean_score_delta: float
+    elapsed_ms: float
+
+
 class HealthResponse(BaseModel):
     status: str
     version: str
-    dependencies: Dict[str, bool]
\ No newline at end of file
+    dependencies: Dict[str, bool]
+    warmed_up: bool = False
+    startup: Dict[str, float] = Field(default_factory=dict)
@@ -6,8 +6,17 @@ from .ocr_processing import DocumentOCRService
 from .hashing import DuplicateDetector
 from .feature_engineering import FeatureEngineer
 from .fraud_model import FraudScoringService
+from .model_registry import ModelRegistry
+from .config_store import ConfigSnapshot, ConfigStore
+from .verification import VerificationService
+from .verification_registry import VerificationRegistry
+from .verification_gateway import VerificationGateway
 from .aggregation import RiskAggregator
-from .pipeline import VidyaAIPipeline
+from .portfolio import RiskPortfolio
+from .scheduler import Stage, StageScheduler
+from .pipeline import VidyaAIPipeline, build_pipeline
+from .batch_scoring import BatchScorer
+from .process_pool import ProcessPoolScorer
 
 __all__ = [
     "ImageQualityAnalyzer",
@@ -16,6 +25,18 @@ __all__ = [
     "DuplicateDetector",
     "FeatureEngineer",
     "FraudScoringService",
+    "ModelRegistry",
+    "ConfigSnapshot",
+    "ConfigStore",
+    "VerificationService",
+    "VerificationRegistry",
+    "VerificationGateway",
     "RiskAggregator",
+    "RiskPortfolio",
+    "Stage",
+    "StageScheduler",
     "VidyaAIPipeline",
+    "build_pipeline",
+    "BatchScorer",
+    "ProcessPoolScorer",
 ]
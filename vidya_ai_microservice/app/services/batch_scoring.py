@@ -0,0 +1,121 @@
+"""Streaming batch scoring: many evidence packages in, one NDJSON line out per case."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from ..schemas import EvidencePackage
+from ..utils.metrics import ERRORS
+
+ScoreFn = Callable[[EvidencePackage], BaseModel]
+# Each input item is either a raw JSON object or a parse error for that line.
+BatchItem = Tuple[int, Any]
+
+_END = object()
+
+
+class BatchItemError(ValueError):
+    """An input line that could not be parsed as JSON."""
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[BatchItem]:
+    """Yield ``(index, object)`` for each non-blank line of an NDJSON byte stream."""
+    buffer = b""
+    index = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _parse_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, _parse_line(buffer)
+
+
+async def iter_items(items: Iterable[Any]) -> AsyncIterator[BatchItem]:
+    """Adapt an already-parsed JSON array to the batch item stream."""
+    for index, item in enumerate(items):
+        yield index, item
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return BatchItemError(f"Invalid JSON: {exc}")
+
+
+class BatchScorer:
+    """Fans packages out over a worker pool and streams results as they finish.
+
+    At most ``max_in_flight`` packages are read ahead of the client: a slot is
+    only freed once a finished result has been handed to the response stream,
+    so a slow reader also throttles how fast the request body is consumed.
+    Failures are reported per line and never abort the rest of the batch.
+    """
+
+    def __init__(self, score_fn: ScoreFn, max_workers: int = 4, max_in_flight: int = 0):
+        self.score_fn = score_fn
+        self.max_in_flight = max_in_flight or max_workers * 2
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vidya-batch")
+
+    async def stream(self, items: AsyncIterator[BatchItem]) -> AsyncIterator[str]:
+        slots = asyncio.Semaphore(self.max_in_flight)
+        finished: "asyncio.Queue[Any]" = asyncio.Queue()
+        producer = asyncio.create_task(self._produce(items, slots, finished))
+        try:
+            while True:
+                item = await finished.get()
+                if item is _END:
+                    break
+                line, holds_slot = item
+                yield line + "\n"
+                if holds_slot:
+                    slots.release()
+            await producer
+        finally:
+            producer.cancel()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _produce(self, items: AsyncIterator[BatchItem], slots: asyncio.Semaphore, finished: asyncio.Queue) -> None:
+        tasks = []
+        try:
+            async for index, raw in items:
+                await slots.acquire()
+                tasks.append(asyncio.create_task(self._score_one(index, raw, finished)))
+            await asyncio.gather(*tasks)
+        except Exception as exc:
+            error = {"index": None, "case_id": None, "error": f"Batch input failed: {exc}"}
+            await finished.put((json.dumps(error), False))
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await finished.put(_END)
+
+    async def _score_one(self, index: int, raw: Any, finished: asyncio.Queue) -> None:
+        case_id = raw.get("case_id") if isinstance(raw, dict) else None
+        try:
+            if isinstance(raw, BatchItemError):
+                raise raw
+            package = EvidencePackage.model_validate(raw)
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.executor, self.score_fn, package)
+            line = response.model_dump_json()
+        except ValidationError as exc:
+            ERRORS.inc(stage="batch", kind="invalid_package")
+            error = {"index": index, "case_id": case_id, "error": "Invalid evidence package"}
+            line = json.dumps({**error, "detail": exc.errors(include_url=False)}, default=str)
+        except Exception as exc:
+            ERRORS.inc(stage="batch", kind="invalid_json" if isinstance(exc, BatchItemError) else "exception")
+            line = json.dumps({"index": index, "case_id": case_id, "error": str(exc)})
+        await finished.put((line, True))
+
+
+__all__ = ["BatchItemError", "BatchScorer", "iter_items", "iter_ndjson"]
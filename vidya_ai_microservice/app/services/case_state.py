@@ -0,0 +1,141 @@
+"""Per-case layer snapshots so a resubmitted case only reruns what changed."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+ResultT = TypeVar("ResultT", bound=BaseModel)
+
+# Name of the single entry kept for whole-case layers such as verification.
+CASE_ENTRY = "*"
+
+
+def input_key(*parts: str) -> str:
+    """Digest of everything a layer result depends on."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+class CaseSnapshot:
+    """Layer results of one scoring run, keyed by evidence id and input digest.
+
+    Layers are named ``<component>.<list>`` (e.g. ``quality.assets``). Each
+    entry stores the digest of the item's JSON plus whatever metadata and
+    config the layer reads, together with the serialised result. When a case
+    is rescored against a previous snapshot, items whose digest still matches
+    reuse the stored result and only the rest go through the layer. Ids that
+    repeat within one list are always recomputed. ``fingerprint`` digests an
+    item's content; callers whose items may arrive with their payload
+    stripped (the process pool) pass one that covers the payload too.
+    """
+
+    def __init__(
+        self,
+        case_id: str,
+        layers: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+        fingerprint: Callable[[Any], str] = lambda item: item.model_dump_json(),
+    ):
+        self.case_id = case_id
+        self.fingerprint = fingerprint
+        self.layers: Dict[str, Dict[str, Dict[str, Any]]] = layers or {}
+        self._reused: List[str] = []
+        self._lock = Lock()
+
+    @property
+    def reused(self) -> List[str]:
+        return sorted(self._reused)
+
+    @property
+    def state_id(self) -> str:
+        keys = {
+            name: {item_id: entry["key"] for item_id, entry in entries.items()} for name, entries in self.layers.items()
+        }
+        return input_key(self.case_id, json.dumps(keys, sort_keys=True))
+
+    def run_items(
+        self,
+        name: str,
+        items: Sequence[BaseModel],
+        context: Sequence[str],
+        run: Callable[[List[Any]], List[ResultT]],
+        result_type: Type[ResultT],
+        previous: Optional["CaseSnapshot"],
+    ) -> List[ResultT]:
+        """Results for ``items`` in order, rerunning ``run`` only on changed ones."""
+        component = name.split(".", 1)[0]
+        keys = [input_key(self.fingerprint(item), *context) for item in items]
+        counts = Counter(item.id for item in items)
+        earlier = previous.layers.get(name, {}) if previous else {}
+        results: List[Optional[ResultT]] = [None] * len(items)
+        fresh: List[int] = []
+        for idx, (item, key) in enumerate(zip(items, keys)):
+            entry = earlier.get(item.id)
+            if counts[item.id] == 1 and entry is not None and entry["key"] == key:
+                results[idx] = result_type.model_validate(entry["result"])
+            else:
+                fresh.append(idx)
+
+        if fresh:
+            computed = run([items[idx] for idx in fresh])
+            if len(computed) != len(fresh):
+                # The layer did not answer item for item; fall back to a full run.
+                results, fresh = list(run(list(items))), list(range(len(items)))
+            else:
+                for idx, result in zip(fresh, computed):
+                    results[idx] = result
+
+        recomputed = set(fresh)
+        with self._lock:
+            self._reused.extend(f"{component}:{items[idx].id}" for idx in range(len(items)) if idx not in recomputed)
+            self.layers[name] = {
+                item.id: {"key": key, "result": result.model_dump(mode="json")}
+                for item, key, result in zip(items, keys, results)
+                if counts[item.id] == 1
+            }
+        return results  # type: ignore[return-value]
+
+    def run_case(
+        self,
+        name: str,
+        context: Sequence[str],
+        run: Callable[[], ResultT],
+        result_type: Type[ResultT],
+        previous: Optional["CaseSnapshot"],
+        reusable: Optional[Callable[[ResultT], bool]] = None,
+    ) -> ResultT:
+        """Whole-case counterpart of :meth:`run_items`.
+
+        A fresh result for which ``reusable`` returns false is not stored, so a
+        later rescore runs the layer again.
+        """
+        key = input_key(*context)
+        entry = previous.layers.get(name, {}).get(CASE_ENTRY) if previous else None
+        reused = entry is not None and entry["key"] == key
+        result = result_type.model_validate(entry["result"]) if reused else run()
+        if not reused and reusable is not None and not reusable(result):
+            return result
+        with self._lock:
+            if reused:
+                self._reused.append(name)
+            self.layers[name] = {CASE_ENTRY: {"key": key, "result": result.model_dump(mode="json")}}
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps({"case_id": self.case_id, "layers": self.layers})
+
+    @classmethod
+    def from_json(cls, text: str) -> "CaseSnapshot":
+        data = json.loads(text)
+        return cls(data["case_id"], data["layers"])
+
+
+__all__ = ["CaseSnapshot", "input_key"]
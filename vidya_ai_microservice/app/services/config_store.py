@@ -0,0 +1,234 @@
+"""Versioned, persisted runtime configuration shared by every scoring layer."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Optional, Type, Union
+
+from pydantic import BaseModel
+
+from ..config import (
+    DetectionConfig,
+    DuplicateConfig,
+    FraudRuleConfig,
+    OCRConfig,
+    QualityConfig,
+    ThresholdConfig,
+    WeightConfig,
+)
+from ..utils.result_cache import config_fingerprint
+
+# Section name (as in risk_weights.default.json) -> config model.
+LAYERS: Dict[str, Type[BaseModel]] = {
+    "weights": WeightConfig,
+    "thresholds": ThresholdConfig,
+    "quality": QualityConfig,
+    "detection": DetectionConfig,
+    "ocr": OCRConfig,
+    "duplicates": DuplicateConfig,
+    "fraud_rules": FraudRuleConfig,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS config_versions (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS config_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+SectionUpdate = Union[BaseModel, Mapping[str, Any]]
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One immutable version of every layer config.
+
+    The config models themselves are frozen, so a snapshot can be handed to
+    any number of threads and read without locks.
+    """
+
+    version: int
+    created_at: float
+    source: str
+    weights: WeightConfig
+    thresholds: ThresholdConfig
+    quality: QualityConfig
+    detection: DetectionConfig
+    ocr: OCRConfig
+    duplicates: DuplicateConfig
+    fraud_rules: FraudRuleConfig
+
+    def sections(self) -> Dict[str, BaseModel]:
+        return {name: getattr(self, name) for name in LAYERS}
+
+    def to_json(self) -> str:
+        return json.dumps({name: section.model_dump() for name, section in self.sections().items()}, sort_keys=True)
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-ready view for the API: version metadata plus every section."""
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "source": self.source,
+            **{name: section.model_dump() for name, section in self.sections().items()},
+        }
+
+    @classmethod
+    def from_sections(
+        cls, version: int, created_at: float, source: str, sections: Mapping[str, Any]
+    ) -> "ConfigSnapshot":
+        """Build a snapshot from models or plain dicts; missing sections take model defaults."""
+        built = {}
+        for name, model in LAYERS.items():
+            section = sections.get(name, {})
+            built[name] = section if isinstance(section, model) else model(**section)
+        return cls(version=version, created_at=created_at, source=source, **built)
+
+
+class ConfigStore:
+    """Append-only history of :class:`ConfigSnapshot` versions in SQLite.
+
+    ``current`` is replaced with a single attribute assignment after each
+    update is committed, so readers take no lock and always see a complete
+    snapshot; a scorer that reads it once per case scores the whole case under
+    one version even if an update lands mid-case. Updates never modify an
+    existing row, so any version stamped on a response can be loaded back
+    with :meth:`get`.
+
+    ``seed`` is the file-based config. It becomes version 1 of a new store,
+    and a later change to the file is recorded as a new version on the next
+    start; otherwise the newest persisted version wins over the file, so API
+    changes survive restarts.
+    """
+
+    def __init__(self, path: Path, seed: Mapping[str, BaseModel]):
+        self.path = path
+        self._lock = Lock()
+        self._versions: Dict[int, ConfigSnapshot] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        seed_snapshot = ConfigSnapshot.from_sections(0, 0.0, "file", seed)
+        seed_fingerprint = config_fingerprint(seed_snapshot.to_json())
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM config_meta WHERE key = 'seed_fingerprint'").fetchone()
+            latest = self._load_latest()
+            if latest is None or row is None or row[0] != seed_fingerprint:
+                latest = self._insert(seed_snapshot.sections(), "file")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO config_meta (key, value) VALUES ('seed_fingerprint', ?)",
+                    (seed_fingerprint,),
+                )
+                self._conn.commit()
+        self.current: ConfigSnapshot = latest
+
+    @property
+    def version(self) -> int:
+        return self.current.version
+
+    def update(self, source: str = "api", **sections: SectionUpdate) -> ConfigSnapshot:
+        """Record a new version with ``sections`` replaced and return it.
+
+        A model replaces its section; a mapping is merged onto the newest
+        persisted values of that section. Merging happens under the store's
+        lock against the newest row, so updates from other threads or
+        processes sharing the file are not lost. Raises ``KeyError`` for an
+        unknown section and ``pydantic.ValidationError`` for invalid values,
+        leaving the current version untouched.
+        """
+        unknown = set(sections) - set(LAYERS)
+        if unknown:
+            raise KeyError(f"Unknown config sections: {sorted(unknown)}")
+        with self._lock:
+            # Take the write lock before reading so another process cannot
+            # record a version between our read and insert.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                base = self._load_latest() or self.current
+                merged: Dict[str, BaseModel] = base.sections()
+                for name, section in sections.items():
+                    if isinstance(section, BaseModel):
+                        merged[name] = LAYERS[name](**section.model_dump())
+                    else:
+                        merged[name] = LAYERS[name](**{**merged[name].model_dump(), **section})
+                snapshot = self._insert(merged, source)
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+            self.current = snapshot
+        return snapshot
+
+    def get(self, version: int) -> Optional[ConfigSnapshot]:
+        """Snapshot for ``version`` (from memory, else from the file); ``None`` when unknown."""
+        snapshot = self._versions.get(version)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, created_at, source, config FROM config_versions WHERE version = ?", (version,)
+            ).fetchone()
+            return self._remember(row) if row else None
+
+    def refresh(self) -> bool:
+        """Adopt a newer version written by another process; returns whether ``current`` changed."""
+        with self._lock:
+            latest = self._load_latest()
+            if latest is None or latest.version <= self.current.version:
+                return False
+            self.current = latest
+            return True
+
+    def history(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest-first version metadata (no section values)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, created_at, source FROM config_versions ORDER BY version DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"version": version, "created_at": created_at, "source": source} for version, created_at, source in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _load_latest(self) -> Optional[ConfigSnapshot]:
+        row = self._conn.execute(
+            "SELECT version, created_at, source, config FROM config_versions ORDER BY version DESC LIMIT 1"
+        ).fetchone()
+        return self._remember(row) if row else None
+
+    def _insert(self, sections: Mapping[str, BaseModel], source: str) -> ConfigSnapshot:
+        created_at = time.time()
+        config = json.dumps({name: section.model_dump() for name, section in sections.items()}, sort_keys=True)
+        cursor = self._conn.execute(
+            "INSERT INTO config_versions (created_at, source, config) VALUES (?, ?, ?)", (created_at, source, config)
+        )
+        snapshot = ConfigSnapshot.from_sections(cursor.lastrowid, created_at, source, sections)
+        self._versions[snapshot.version] = snapshot
+        return snapshot
+
+    def _remember(self, row: tuple) -> ConfigSnapshot:
+        version, created_at, source, config = row
+        snapshot = self._versions.get(version)
+        if snapshot is None:
+            snapshot = ConfigSnapshot.from_sections(version, created_at, source, json.loads(config))
+            self._versions[version] = snapshot
+        return snapshot
+
+
+__all__ = ["LAYERS", "ConfigSnapshot", "ConfigStore"]
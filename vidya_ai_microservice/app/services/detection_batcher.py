@@ -0,0 +1,75 @@
+"""Micro-batching of detector (and OCR) calls across concurrently scored cases."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Sequence, Tuple
+
+PredictFn = Callable[[List[Any]], List[Any]]
+
+
+class MicroBatcher:
+    """Merges ``predict`` requests that arrive within a short window.
+
+    Callers block in :meth:`submit` while a single worker thread waits up to
+    ``window_ms`` after the first request for more frames (bounded by
+    ``max_batch``), runs one ``predict_fn`` call over all of them, and hands
+    each caller back its own slice of the results.
+    """
+
+    def __init__(
+        self,
+        predict_fn: PredictFn,
+        window_ms: float = 5.0,
+        max_batch: int = 16,
+        name: str = "vidya-detect-batcher",
+    ):
+        self.predict_fn = predict_fn
+        self.window_seconds = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self._queue: "queue.Queue[Tuple[Sequence[Any], Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, frames: Sequence[Any]) -> List[Any]:
+        if not frames:
+            return []
+        future: Future = Future()
+        self._queue.put((frames, future))
+        return future.result()
+
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.perf_counter() + self.window_seconds
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._dispatch(pending)
+
+    def _dispatch(self, pending: List[Tuple[Sequence[Any], Future]]) -> None:
+        frames = [frame for batch, _ in pending for frame in batch]
+        try:
+            outputs = self.predict_fn(frames)
+        except Exception as exc:
+            for _, future in pending:
+                future.set_exception(exc)
+            return
+        offset = 0
+        for batch, future in pending:
+            future.set_result(outputs[offset : offset + len(batch)])
+            offset += len(batch)
+
+
+__all__ = ["MicroBatcher"]
@@ -3,11 +3,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from statistics import mean
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
-import pandas as pd
 
 from ..config import FraudRuleConfig
 from ..schemas import (
@@ -22,9 +20,60 @@ from ..schemas import (
 from ..utils.geospatial import gps_deviation
 from ..utils.state import LocalStateStore
 
+# Column order of the fraud model (see scripts/train_model.py).
+FEATURE_NAMES = (
+    "avg_quality_score",
+    "low_quality_ratio",
+    "asset_match_rate",
+    "asset_declared",
+    "avg_ocr_confidence",
+    "vendor_match_rate",
+    "amount_match_rate",
+    "duplicate_ratio",
+    "gps_deviation_km",
+    "gps_over_threshold",
+    "device_usage_count",
+    "submission_hour_std",
+    "off_hours_flag",
+    "submission_hour",
+    "historical_rejections",
+    "historical_flags",
+    "total_cases",
+    "rapid_submission_ratio",
+)
+
+(
+    AVG_QUALITY_SCORE,
+    LOW_QUALITY_RATIO,
+    ASSET_MATCH_RATE,
+    ASSET_DECLARED,
+    AVG_OCR_CONFIDENCE,
+    VENDOR_MATCH_RATE,
+    AMOUNT_MATCH_RATE,
+    DUPLICATE_RATIO,
+    GPS_DEVIATION_KM,
+    GPS_OVER_THRESHOLD,
+    DEVICE_USAGE_COUNT,
+    SUBMISSION_HOUR_STD,
+    OFF_HOURS_FLAG,
+    SUBMISSION_HOUR,
+    HISTORICAL_REJECTIONS,
+    HISTORICAL_FLAGS,
+    TOTAL_CASES,
+    RAPID_SUBMISSION_RATIO,
+) = range(len(FEATURE_NAMES))
+
 
 class FeatureEngineer:
-    """Converts raw evidence outputs into ML-ready features."""
+    """Converts raw evidence outputs into ML-ready features.
+
+    Features are written into a fixed ``FEATURE_NAMES`` row with plain
+    arithmetic. Features without evidence behind them (e.g. the low-quality
+    ratio when no images were scored) stay NaN in the row, so the booster
+    treats them as missing. The row is what the scorer reads; the vector's
+    dict (which leaves NaN features out) only feeds rule penalties and the
+    response.
+    """
 
     def __init__(self, state_store: LocalStateStore, rules: FraudRuleConfig):
         self.state = state_store
@@ -37,113 +86,145 @@ class FeatureEngineer:
         detection: List[ObjectDetectionResult],
         ocr_results: List[OCRResult],
         duplicates: List[DuplicateResult],
+        rules: Optional[FraudRuleConfig] = None,
     ) -> FraudFeatureVector:
-        metadata = package.metadata
-        features: Dict[str, float] = {}
+        return self.build_features(package, quality, detection, ocr_results, duplicates, rules)[1]
 
-        features.update(self._quality_features(quality))
-        features.update(self._detection_features(detection, metadata))
-        features.update(self._ocr_features(ocr_results))
-        features.update(self._duplicate_features(duplicates))
-        features.update(self._submission_features(package))
-        features.update(self._history_features(metadata))
+    def build_feature_array(
+        self,
+        package: EvidencePackage,
+        quality: Sequence[ImageQualityResult],
+        detection: Sequence[ObjectDetectionResult],
+        ocr_results: Sequence[OCRResult],
+        duplicates: Sequence[DuplicateResult],
+        rules: Optional[FraudRuleConfig] = None,
+    ) -> np.ndarray:
+        """Fill one ``FEATURE_NAMES``-ordered float64 row; NaN marks missing."""
+        return self._build(package, quality, detection, ocr_results, duplicates, rules or self.rules)[0]
+
+    def build_features(
+        self,
+        package: EvidencePackage,
+        quality: Sequence[ImageQualityResult],
+        detection: Sequence[ObjectDetectionResult],
+        ocr_results: Sequence[OCRResult],
+        duplicates: Sequence[DuplicateResult],
+        rules: Optional[FraudRuleConfig] = None,
+    ) -> Tuple[np.ndarray, FraudFeatureVector]:
+        """The row for :meth:`FraudScoringService.score` plus its vector for the response."""
+        row, velocity = self._build(package, quality, detection, ocr_results, duplicates, rules or self.rules)
+        values = row.tolist()
+        features = {name: value for name, value in zip(FEATURE_NAMES, values) if value == value}
 
         explanation = {
-            "quality_summary": features.get("avg_quality_score"),
-            "detection_match": features.get("asset_match_rate"),
-            "vendor_match": features.get("vendor_match_rate"),
-            "duplicate_ratio": features.get("duplicate_ratio"),
-            "gps_deviation_km": features.get("gps_deviation_km"),
+            "quality_summary": values[AVG_QUALITY_SCORE],
+            "detection_match": values[ASSET_MATCH_RATE],
+            "vendor_match": values[VENDOR_MATCH_RATE],
+            "duplicate_ratio": values[DUPLICATE_RATIO],
+            "gps_deviation_km": values[GPS_DEVIATION_KM],
+            "device_velocity": velocity,
         }
 
-        return FraudFeatureVector(case_id=package.case_id, features=features, explanation_fields=explanation)
+        vector = FraudFeatureVector(case_id=package.case_id, features=features, explanation_fields=explanation)
+        return row, vector
 
-    def _quality_features(self, results: List[ImageQualityResult]) -> Dict[str, float]:
+    def _build(
+        self,
+        package: EvidencePackage,
+        quality: Sequence[ImageQualityResult],
+        detection: Sequence[ObjectDetectionResult],
+        ocr_results: Sequence[OCRResult],
+        duplicates: Sequence[DuplicateResult],
+        rules: FraudRuleConfig,
+    ) -> Tuple[np.ndarray, Dict[str, int]]:
+        row = np.full(len(FEATURE_NAMES), np.nan)
+        metadata = package.metadata
+        self._quality_features(row, quality)
+        self._detection_features(row, detection, metadata)
+        self._ocr_features(row, ocr_results)
+        self._duplicate_features(row, duplicates)
+        velocity = self._submission_features(row, package, rules)
+        self._history_features(row, metadata)
+        return row, velocity
+
+    @staticmethod
+    def _quality_features(row: np.ndarray, results: Sequence[ImageQualityResult]) -> None:
         if not results:
-            return {"avg_quality_score": 0.5}
-        df = pd.DataFrame([r.model_dump() for r in results])
-        return {
-            "avg_quality_score": float(df["quality_score"].mean()),
-            "low_quality_ratio": float((df["quality_score"] < 0.5).mean()),
-        }
-
-    def _detection_features(self, results: List[ObjectDetectionResult], metadata: Metadata) -> Dict[str, float]:
+            row[AVG_QUALITY_SCORE] = 0.5
+            return
+        total = 0.0
+        low = 0
+        for result in results:
+            total += result.quality_score
+            low += result.quality_score < 0.5
+        row[AVG_QUALITY_SCORE] = total / len(results)
+        row[LOW_QUALITY_RATIO] = low / len(results)
+
+    @staticmethod
+    def _detection_features(row: np.ndarray, results: Sequence[ObjectDetectionResult], metadata: Metadata) -> None:
         if not results:
-            return {"asset_match_rate": 0.5}
-        match_scores = [r.match_score for r in results]
-        match_rate = float(np.mean(match_scores))
-        return {
-            "asset_match_rate": match_rate,
-            "asset_declared": 1.0 if metadata.declared_asset_type else 0.0,
-        }
+            row[ASSET_MATCH_RATE] = 0.5
+            return
+        row[ASSET_MATCH_RATE] = sum(result.match_score for result in results) / len(results)
+        row[ASSET_DECLARED] = 1.0 if metadata.declared_asset_type else 0.0
 
-    def _ocr_features(self, results: List[OCRResult]) -> Dict[str, float]:
+    @staticmethod
+    def _ocr_features(row: np.ndarray, results: Sequence[OCRResult]) -> None:
         if not results:
-            return {"avg_ocr_confidence": 0.0, "vendor_match_rate": 0.0, "amount_match_rate": 0.0}
-        vendor_matches = [r.crosscheck_results.get("vendor_match", False) for r in results]
-        amount_matches = [r.crosscheck_results.get("amount_match", False) for r in results]
-        confidences = [r.ocr_confidence for r in results]
-        return {
-            "avg_ocr_confidence": float(mean(confidences)),
-            "vendor_match_rate": float(np.mean(vendor_matches)),
-            "amount_match_rate": float(np.mean(amount_matches)),
-        }
-
-    def _duplicate_features(self, results: List[DuplicateResult]) -> Dict[str, float]:
+            row[AVG_OCR_CONFIDENCE] = 0.0
+            row[VENDOR_MATCH_RATE] = 0.0
+            row[AMOUNT_MATCH_RATE] = 0.0
+            return
+        confidence = vendor = amount = 0.0
+        for result in results:
+            confidence += result.ocr_confidence
+            vendor += bool(result.crosscheck_results.get("vendor_match", False))
+            amount += bool(result.crosscheck_results.get("amount_match", False))
+        count = len(results)
+        row[AVG_OCR_CONFIDENCE] = confidence / count
+        row[VENDOR_MATCH_RATE] = vendor / count
+        row[AMOUNT_MATCH_RATE] = amount / count
+
+    @staticmethod
+    def _duplicate_features(row: np.ndarray, results: Sequence[DuplicateResult]) -> None:
         if not results:
-            return {"duplicate_ratio": 0.0}
-        duplicates = [r.duplicate_found for r in results]
-        return {"duplicate_ratio": float(np.mean(duplicates))}
+            row[DUPLICATE_RATIO] = 0.0
+            return
+        row[DUPLICATE_RATIO] = sum(result.duplicate_found for result in results) / len(results)
 
-    def _submission_features(self, package: EvidencePackage) -> Dict[str, float]:
+    def _submission_features(
+        self, row: np.ndarray, package: EvidencePackage, rules: FraudRuleConfig
+    ) -> Dict[str, int]:
         metadata = package.metadata
         gps_delta = gps_deviation(metadata.declared_asset_location, metadata.submission_location)
-        device_use = float(
-            self.state.record_device_usage(metadata.submission_device_id, metadata.submission_timestamp)
-        )
-        submission_hours = [t.hour for t in (package.timestamps or [])]
-        if not submission_hours:
-            submission_hours = [metadata.submission_timestamp.hour]
-        hour_std = float(np.std(submission_hours)) if len(submission_hours) > 1 else 0.0
         gps_value = gps_delta if gps_delta is not None else 0.0
-        gps_threshold_breach = 1.0 if gps_value > self.rules.gps_threshold_km else 0.0
         hour = metadata.submission_timestamp.hour
-        off_hours_flag = (
-            1.0
-            if hour < self.rules.off_hours_start or hour > self.rules.off_hours_end
-            else 0.0
+        row[GPS_DEVIATION_KM] = gps_value
+        row[GPS_OVER_THRESHOLD] = 1.0 if gps_value > rules.gps_threshold_km else 0.0
+        velocity = self.state.record_device_velocity(metadata.submission_device_id, metadata.submission_timestamp)
+        row[DEVICE_USAGE_COUNT] = velocity["cases_7d"]
+        row[SUBMISSION_HOUR_STD] = _hour_std(package.timestamps or ())
+        row[OFF_HOURS_FLAG] = 1.0 if hour < rules.off_hours_start or hour > rules.off_hours_end else 0.0
+        row[SUBMISSION_HOUR] = hour
+        return velocity
+
+    def _history_features(self, row: np.ndarray, metadata: Metadata) -> None:
+        history = metadata.applicant_history
+        row[HISTORICAL_REJECTIONS] = history.previous_rejections
+        row[HISTORICAL_FLAGS] = history.fraudulent_flags
+        row[TOTAL_CASES] = history.submitted_cases
+        row[RAPID_SUBMISSION_RATIO] = self.state.record_submission(
+            metadata.applicant_id, metadata.submission_timestamp
         )
-        return {
-            "gps_deviation_km": gps_value,
-            "gps_over_threshold": gps_threshold_breach,
-            "device_usage_count": device_use,
-            "submission_hour_std": hour_std,
-            "off_hours_flag": off_hours_flag,
-            "submission_hour": float(hour),
-        }
 
-    def _history_features(self, metadata: Metadata) -> Dict[str, float]:
-        history = metadata.applicant_history
-        timestamps = self.state.record_case_timestamp(metadata.applicant_id, metadata.submission_timestamp.isoformat())
-        rapid_submissions = self._rapid_submission_ratio(timestamps)
-        return {
-            "historical_rejections": float(history.previous_rejections),
-            "historical_flags": float(history.fraudulent_flags),
-            "total_cases": float(history.submitted_cases),
-            "rapid_submission_ratio": rapid_submissions,
-        }
 
-    def _rapid_submission_ratio(self, timestamps: List[str]) -> float:
-        if len(timestamps) < 2:
-            return 0.0
-        parsed = sorted(datetime.fromisoformat(ts) for ts in timestamps)
-        intervals = [
-            (parsed[idx] - parsed[idx - 1]).total_seconds() / 3600 for idx in range(1, len(parsed))
-        ]
-        if not intervals:
-            return 0.0
-        rapid = [1 for interval in intervals if interval < 2]
-        return float(len(rapid) / len(intervals))
+def _hour_std(timestamps: Sequence[datetime]) -> float:
+    """Population standard deviation of the submission hours."""
+    if len(timestamps) < 2:
+        return 0.0
+    hours = [timestamp.hour for timestamp in timestamps]
+    center = sum(hours) / len(hours)
+    return (sum((hour - center) ** 2 for hour in hours) / len(hours)) ** 0.5
 
 
-__all__ = ["FeatureEngineer"]
+__all__ = ["FEATURE_NAMES", "FeatureEngineer"]
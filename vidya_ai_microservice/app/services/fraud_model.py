@@ -2,56 +2,206 @@
 
 from __future__ import annotations
 
+import logging
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
-try:
-    import xgboost as xgb  # type: ignore[import]
-except Exception:  # pragma: no cover - optional dependency
-    xgb = None
-
 from ..config import FraudRuleConfig
 from ..schemas import FraudFeatureVector, FraudScoreResult
+from .detection_batcher import MicroBatcher
+from .model_registry import LoadedModel, ModelRegistry
+
+
+logger = logging.getLogger(__name__)
 
 
 class FraudScoringService:
-    """Wraps a trained XGBoost model with graceful fallback."""
+    """Wraps a trained XGBoost model with graceful fallback.
+
+    Column order comes from the booster's ``feature_names``, so vectors are
+    laid out exactly as the model was trained regardless of dict order;
+    features a vector lacks are passed as missing (NaN). A ``FEATURE_NAMES``
+    row from :meth:`FeatureEngineer.build_features` is copied in directly (or
+    through the model's precomputed column map) without going through the
+    dict. Rows are written into a per-thread preallocated float32 buffer and
+    scored with ``inplace_predict``, and importances are computed once per
+    model version.
+    Models come from a :class:`ModelRegistry`; each call reads the live model
+    once, so a background swap never mixes two versions in one result. A
+    shadow candidate, when configured, is scored on the same row and only
+    logged.
+
+    :meth:`score_batch` scores many cases with one ``inplace_predict`` call.
+    With ``batch_window_ms`` > 0, ``score(..., batched=True)`` calls from
+    concurrently scored cases (the batch endpoint) are merged into it through
+    a :class:`MicroBatcher`.
+    """
 
-    def __init__(self, model_dir: Path, rules: FraudRuleConfig):
+    def __init__(
+        self,
+        model_dir: Path,
+        rules: FraudRuleConfig,
+        registry: Optional[ModelRegistry] = None,
+        batch_window_ms: float = 0.0,
+        max_batch: int = 16,
+    ):
         self.model_dir = model_dir
         self.rules = rules
-        self.model, self.version = self._load_latest_model()
-
-    def _load_latest_model(self) -> Tuple[object | None, str]:
-        if not xgb:
-            return None, "baseline"
-        if not self.model_dir.exists():
-            return None, "baseline"
-        candidates = sorted(self.model_dir.glob("*.json"))
-        if not candidates:
-            return None, "baseline"
-        latest = candidates[-1]
-        booster = xgb.Booster()
-        booster.load_model(str(latest))
-        return booster, latest.stem
-
-    def score(self, feature_vector: FraudFeatureVector) -> FraudScoreResult:
-        features = feature_vector.features
-        penalties = self._rule_penalties(features)
+        self._local = threading.local()
+        self.registry = registry or ModelRegistry(model_dir)
+        self.batcher = (
+            MicroBatcher(self._score_items, window_ms=batch_window_ms, max_batch=max_batch, name="vidya-fraud-batcher")
+            if batch_window_ms > 0
+            else None
+        )
+
+    @property
+    def loaded(self) -> Optional[LoadedModel]:
+        return self.registry.live
+
+    @property
+    def model(self) -> Optional[object]:
+        loaded = self.loaded
+        return loaded.booster if loaded else None
+
+    @property
+    def version(self) -> str:
+        loaded = self.loaded
+        return loaded.version if loaded else "baseline"
+
+    @property
+    def feature_names(self) -> Tuple[str, ...]:
+        loaded = self.loaded
+        return loaded.feature_names if loaded else ()
+
+    def score(
+        self,
+        feature_vector: FraudFeatureVector,
+        rules: Optional[FraudRuleConfig] = None,
+        row: Optional[np.ndarray] = None,
+        batched: bool = False,
+    ) -> FraudScoreResult:
+        """Score one case; ``row`` is its ``FEATURE_NAMES``-ordered array when the caller has it.
+
+        With ``batched`` (and a batch window configured) the row waits briefly
+        to share a booster call with other cases.
+        """
+        rules = rules or self.rules
+        loaded = self.loaded
+        if loaded is None:
+            return self._rule_result(feature_vector, None, loaded, rules)
+        if batched and self.batcher is not None:
+            return self.batcher.submit([(feature_vector, row, rules)])[0]
+        buffer = self._row(len(loaded.feature_names))
+        self._fill(buffer[0], feature_vector, row, loaded)
+        prob = float(loaded.booster.inplace_predict(buffer, validate_features=False)[0])
+        shadow = self.registry.shadow
+        if shadow is not None:
+            self._score_shadow(shadow, feature_vector, row, loaded, prob)
+        return self._rule_result(feature_vector, prob, loaded, rules)
+
+    def score_batch(
+        self,
+        feature_vectors: Sequence[FraudFeatureVector],
+        rules: Optional[FraudRuleConfig] = None,
+        rows: Optional[Sequence[np.ndarray]] = None,
+    ) -> List[FraudScoreResult]:
+        """Score many vectors with a single booster call.
+
+        ``rows`` optionally holds their ``FEATURE_NAMES`` arrays (e.g. one 2-D
+        array), in the same order.
+        """
+        rules = rules or self.rules
+        rows = rows if rows is not None else [None] * len(feature_vectors)
+        return self._score_items([(vector, row, rules) for vector, row in zip(feature_vectors, rows)])
+
+    def _score_items(
+        self, items: Sequence[Tuple[FraudFeatureVector, Optional[np.ndarray], FraudRuleConfig]]
+    ) -> List[FraudScoreResult]:
+        loaded = self.loaded
+        if loaded is None or not items:
+            return [self._rule_result(vector, None, loaded, rules) for vector, _, rules in items]
+        matrix = np.empty((len(items), len(loaded.feature_names)), dtype=np.float32)
+        for target, (vector, row, _) in zip(matrix, items):
+            self._fill(target, vector, row, loaded)
+        probs = loaded.booster.inplace_predict(matrix, validate_features=False)
+        shadow = self.registry.shadow
+        if shadow is not None:
+            for (vector, row, _), prob in zip(items, probs):
+                self._score_shadow(shadow, vector, row, loaded, float(prob))
+        return [self._rule_result(vector, float(prob), loaded, rules) for (vector, _, rules), prob in zip(items, probs)]
+
+    def _score_shadow(
+        self,
+        shadow: LoadedModel,
+        feature_vector: FraudFeatureVector,
+        row: Optional[np.ndarray],
+        live: LoadedModel,
+        live_prob: float,
+    ) -> None:
+        try:
+            started = time.perf_counter()
+            buffer = np.empty((1, len(shadow.feature_names)), dtype=np.float32)
+            self._fill(buffer[0], feature_vector, row, shadow)
+            shadow_prob = float(shadow.booster.inplace_predict(buffer, validate_features=False)[0])
+            latency_ms = (time.perf_counter() - started) * 1000
+        except Exception as exc:
+            logger.warning("shadow model %s failed for case %s: %s", shadow.version, feature_vector.case_id, exc)
+            return
+        logger.info(
+            "shadow_score case_id=%s live_version=%s live_prob=%.4f shadow_version=%s shadow_prob=%.4f "
+            "delta=%.4f shadow_latency_ms=%.3f",
+            feature_vector.case_id,
+            live.version,
+            live_prob,
+            shadow.version,
+            shadow_prob,
+            shadow_prob - live_prob,
+            latency_ms,
+        )
+
+    def _row(self, width: int) -> np.ndarray:
+        row = getattr(self._local, "row", None)
+        if row is None or row.shape[1] != width:
+            row = np.empty((1, width), dtype=np.float32)
+            self._local.row = row
+        return row
+
+    @staticmethod
+    def _fill(
+        target: np.ndarray, feature_vector: FraudFeatureVector, row: Optional[np.ndarray], loaded: LoadedModel
+    ) -> None:
+        if row is None:
+            features = feature_vector.features
+            for idx, name in enumerate(loaded.feature_names):
+                target[idx] = features.get(name, np.nan)
+        elif loaded.column_index is None:
+            target[:] = row
+        else:
+            target[:] = row[loaded.column_index]
+            target[loaded.missing_columns] = np.nan
+
+    def _rule_result(
+        self,
+        feature_vector: FraudFeatureVector,
+        prob: Optional[float],
+        loaded: Optional[LoadedModel],
+        rules: FraudRuleConfig,
+    ) -> FraudScoreResult:
+        penalties = self._rule_penalties(feature_vector.features, rules)
         penalty_total = sum(penalties.values())
 
-        if self.model and xgb:
-            dmatrix = xgb.DMatrix(np.array([list(features.values())]), feature_names=list(features.keys()))
-            prob = float(self.model.predict(dmatrix)[0])
+        if prob is not None and loaded is not None:
             base_score = prob * 100
-            importance = {feat: float(weight) for feat, weight in zip(features.keys(), self.model.get_score().values())}
             fraud_points = float(np.clip(base_score + penalty_total, 0, 100))
             return FraudScoreResult(
                 fraud_score=round(fraud_points, 2),
-                model_version=self.version,
-                feature_importance=importance,
+                model_version=loaded.version,
+                feature_importance=dict(loaded.importance),
                 rule_penalties=penalties,
             )
 
@@ -59,22 +209,22 @@ class FraudScoringService:
         importance = {feature: value for feature, value in penalties.items()}
         return FraudScoreResult(
             fraud_score=fraud_score,
-            model_version=self.version,
+            model_version=loaded.version if loaded else "baseline",
             feature_importance=importance,
             rule_penalties=penalties,
         )
 
-    def _rule_penalties(self, features: Dict[str, float]) -> Dict[str, float]:
+    def _rule_penalties(self, features: Dict[str, float], rules: FraudRuleConfig) -> Dict[str, float]:
         penalties: Dict[str, float] = {}
-        if features.get("gps_deviation_km", 0.0) > self.rules.gps_threshold_km:
-            penalties["gps_deviation"] = self.rules.gps_penalty
+        if features.get("gps_deviation_km", 0.0) > rules.gps_threshold_km:
+            penalties["gps_deviation"] = rules.gps_penalty
         if features.get("off_hours_flag", 0.0) >= 1.0:
-            penalties["off_hours_submission"] = self.rules.off_hours_penalty
-        if features.get("device_usage_count", 0.0) > self.rules.device_cases_limit:
-            penalties["device_reuse"] = self.rules.device_penalty
+            penalties["off_hours_submission"] = rules.off_hours_penalty
+        if features.get("device_usage_count", 0.0) > rules.device_cases_limit:
+            penalties["device_reuse"] = rules.device_penalty
         history_total = features.get("historical_rejections", 0.0) + features.get("historical_flags", 0.0)
         if history_total > 0:
-            penalties["history_flags"] = self.rules.history_penalty
+            penalties["history_flags"] = rules.history_penalty
         return penalties
 
 
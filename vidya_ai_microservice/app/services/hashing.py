@@ -2,42 +2,94 @@
 
 from __future__ import annotations
 
+from threading import Lock
 from typing import List, Optional
 
-from io import BytesIO
-
-from PIL import Image
-
-try:
-    import imagehash  # type: ignore[import]
-except Exception:  # pragma: no cover - optional dependency
-    imagehash = None
-
 from ..config import DuplicateConfig
-from ..schemas import DuplicateResult, EvidenceDocument, EvidenceImage
+from ..schemas import DuplicateMatch, DuplicateResult, EvidenceDocument, EvidenceImage
+from ..utils.hash_index import HammingIndex, HashRecord, parse_hash
+from ..utils.lazy_import import optional_module
+from ..utils.media_context import CaseMediaContext, LoadedMedia
 from ..utils.media_loader import MediaLoader, MediaLoaderError
+from ..utils.metrics import ERRORS, ITEM_SECONDS
+from ..utils.result_cache import ResultCache
 from ..utils.state import LocalStateStore
 
+imagehash = optional_module("imagehash")
+
 
 class DuplicateDetector:
-    """Detects duplicate media using perceptual hashing."""
+    """Detects duplicate media using perceptual hashing.
+
+    Stored hashes are mirrored into a :class:`HammingIndex` so lookups cover
+    every applicant in the portfolio without a linear scan.
+    """
 
-    def __init__(self, loader: MediaLoader, state_store: LocalStateStore, config: DuplicateConfig):
+    MAX_REPORTED_MATCHES = 10
+
+    def __init__(
+        self,
+        loader: MediaLoader,
+        state_store: LocalStateStore,
+        config: DuplicateConfig,
+        cache: Optional[ResultCache] = None,
+    ):
         self.loader = loader
         self.state = state_store
         self.config = config
-
-    def evaluate_images(self, images: List[EvidenceImage], applicant_id: str, case_id: str) -> List[DuplicateResult]:
-        return [self._evaluate_single(image, applicant_id, case_id) for image in images]
-
-    def evaluate_documents(self, documents: List[EvidenceDocument], applicant_id: str, case_id: str) -> List[DuplicateResult]:
-        return [self._evaluate_single(doc, applicant_id, case_id) for doc in documents]
-
-    def _evaluate_single(self, evidence: EvidenceImage | EvidenceDocument, applicant_id: str, case_id: str) -> DuplicateResult:
+        self.cache = cache
+        self.index = HammingIndex()
+        self._index_lock = Lock()
+        self._last_seq = 0
+        self._sync_index()
+
+    def evaluate_images(
+        self,
+        images: List[EvidenceImage],
+        applicant_id: str,
+        case_id: str,
+        media: Optional[CaseMediaContext] = None,
+        config: Optional[DuplicateConfig] = None,
+    ) -> List[DuplicateResult]:
+        media = media or CaseMediaContext(self.loader)
+        config = config or self.config
+        return [self._evaluate_timed(image, applicant_id, case_id, media, config) for image in images]
+
+    def evaluate_documents(
+        self,
+        documents: List[EvidenceDocument],
+        applicant_id: str,
+        case_id: str,
+        media: Optional[CaseMediaContext] = None,
+        config: Optional[DuplicateConfig] = None,
+    ) -> List[DuplicateResult]:
+        media = media or CaseMediaContext(self.loader)
+        config = config or self.config
+        return [self._evaluate_timed(doc, applicant_id, case_id, media, config) for doc in documents]
+
+    def _evaluate_timed(
+        self,
+        evidence: EvidenceImage | EvidenceDocument,
+        applicant_id: str,
+        case_id: str,
+        media: CaseMediaContext,
+        config: DuplicateConfig,
+    ) -> DuplicateResult:
+        with ITEM_SECONDS.time(layer="duplicates"):
+            return self._evaluate_single(evidence, applicant_id, case_id, media, config)
+
+    def _evaluate_single(
+        self,
+        evidence: EvidenceImage | EvidenceDocument,
+        applicant_id: str,
+        case_id: str,
+        media: CaseMediaContext,
+        config: DuplicateConfig,
+    ) -> DuplicateResult:
         try:
-            payload = self.loader.load_image_bytes(evidence)  # Works for doc as subclass
-            hash_value = self._hash_bytes(payload)
+            hash_value = self._hash_media(media.get(evidence))
         except MediaLoaderError as exc:
+            ERRORS.inc(stage="duplicates", kind="media")
             return DuplicateResult(
                 evidence_id=evidence.id,
                 duplicate_found=False,
@@ -45,39 +97,72 @@ class DuplicateDetector:
                 reference_case_id=str(exc),
             )
 
-        duplicates = self.state.list_hashes(applicant_id)
-        duplicate_found = False
-        closest_case: Optional[str] = None
-        min_distance = 64
-        for record in duplicates.values():
-            distance = self._hash_distance(hash_value, record.get("hash", ""))
-            if distance <= self.config.hash_distance_threshold and distance < min_distance:
-                duplicate_found = True
-                min_distance = distance
-                closest_case = record.get("case_id")
+        self._sync_index()
+        matches = [
+            (distance, record)
+            for distance, record in self._query(hash_value, config)
+            # Re-scoring the same case must not flag an item against itself.
+            if record.key != (applicant_id, evidence.id) or record.case_id != case_id
+        ]
+        if not config.cross_applicant:
+            matches = [(distance, record) for distance, record in matches if record.applicant_id == applicant_id]
 
         self.state.record_hash(applicant_id, evidence.id, hash_value, case_id)
+        # The write may wait for the case's batch to commit; indexing it now
+        # keeps it visible to later items and cases in this process.
+        parsed = parse_hash(hash_value)
+        if parsed is not None:
+            self.index.add(HashRecord(applicant_id, evidence.id, case_id, parsed))
+
+        if not matches:
+            return DuplicateResult(evidence_id=evidence.id, duplicate_found=False, hash_distance=0)
 
+        distance, closest = matches[0]
         return DuplicateResult(
             evidence_id=evidence.id,
-            duplicate_found=duplicate_found,
-            hash_distance=min_distance if duplicate_found else 0,
-            reference_case_id=closest_case,
-            penalty_points=self.config.duplicate_penalty_points if duplicate_found else 0.0,
+            duplicate_found=True,
+            hash_distance=distance,
+            reference_case_id=closest.case_id,
+            reference_applicant_id=closest.applicant_id,
+            cross_applicant=any(record.applicant_id != applicant_id for _, record in matches),
+            matches=[
+                DuplicateMatch(
+                    case_id=record.case_id,
+                    applicant_id=record.applicant_id,
+                    evidence_id=record.evidence_id,
+                    hash_distance=match_distance,
+                )
+                for match_distance, record in matches[: self.MAX_REPORTED_MATCHES]
+            ],
+            penalty_points=config.duplicate_penalty_points,
         )
 
-    def _hash_bytes(self, payload: bytes) -> str:
-        if imagehash is None:
+    def _query(self, hash_value: str, config: DuplicateConfig) -> List[tuple[int, HashRecord]]:
+        parsed = parse_hash(hash_value)
+        if parsed is None:
+            return []
+        return self.index.query(parsed, config.hash_distance_threshold)
+
+    def _sync_index(self) -> None:
+        """Pull hashes recorded since the last sync, including other workers' writes."""
+        with self._index_lock:
+            for seq, applicant_id, evidence_id, hash_value, case_id in self.state.iter_hashes(self._last_seq):
+                parsed = parse_hash(hash_value)
+                if parsed is not None:
+                    self.index.add(HashRecord(applicant_id, evidence_id, case_id, parsed))
+                self._last_seq = max(self._last_seq, seq)
+
+    def _hash_media(self, media: LoadedMedia) -> str:
+        if not imagehash:
             raise MediaLoaderError("imagehash dependency missing")
-        image = Image.open(BytesIO(payload))
-        return str(imagehash.phash(image))
-
-    def _hash_distance(self, hash_a: str, hash_b: str) -> int:
-        if imagehash is None:
-            return 64
-        if not hash_a or not hash_b:
-            return 64
-        return imagehash.hex_to_hash(hash_a) - imagehash.hex_to_hash(hash_b)
+        if self.cache is not None:
+            cached = self.cache.get("phash", media.digest)
+            if cached is not None:
+                return cached
+        hash_value = str(imagehash.phash(media.image))
+        if self.cache is not None:
+            self.cache.put("phash", media.digest, "", hash_value)
+        return hash_value
 
 
 __all__ = ["DuplicateDetector"]
@@ -1,21 +1,4 @@
-"""Mock Data for Verification Services."""
-
-# Valid State Codes (2025 List subset)
-STATE_CODES = {
-    "36": "Telangana",
-    "37": "Andhra Pradesh",
-    "29": "Karnataka",
-    "27": "Maharashtra",
-    "33": "Tamil Nadu",
-    "07": "Delhi",
-    "09": "Uttar Pradesh",
-    "19": "West Bengal",
-    "32": "Kerala",
-    "08": "Rajasthan",
-    "24": "Gujarat",
-    "03": "Punjab",
-    "06": "Haryana",
-}
+"""Sample GSTN and CBS records used to seed the demo verification registry."""
 
 # 1. GST Portal Mock (Valid Invoices)
 # Updated with Valid GSTINs
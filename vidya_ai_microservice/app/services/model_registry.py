@@ -0,0 +1,180 @@
+"""Versioned fraud-model registry with background reload and shadow candidates."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..utils.lazy_import import optional_module
+from .feature_engineering import FEATURE_NAMES
+
+xgb = optional_module("xgboost")
+
+# (file name, mtime_ns, size) of every booster in the registry folder
+Listing = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """A booster together with everything derived from it once at load time."""
+
+    booster: object
+    version: str
+    feature_names: Tuple[str, ...]
+    importance: Dict[str, float]
+    # Position of each booster column in a ``FEATURE_NAMES`` row, and which
+    # columns the feature engineer does not produce; ``None`` when the booster
+    # was trained on exactly ``FEATURE_NAMES``.
+    column_index: Optional[np.ndarray] = None
+    missing_columns: Optional[np.ndarray] = None
+
+
+def column_map(names: Tuple[str, ...]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """``(column_index, missing_columns)`` for a booster trained on ``names``."""
+    if names == FEATURE_NAMES:
+        return None, None
+    positions = {name: idx for idx, name in enumerate(FEATURE_NAMES)}
+    index = np.array([positions.get(name, 0) for name in names], dtype=np.intp)
+    missing = np.array([name not in positions for name in names], dtype=bool)
+    return index, missing
+
+
+def load_booster(path: Path) -> Optional[LoadedModel]:
+    """Load one booster file; ``None`` when it has no stored feature schema."""
+    booster = xgb.Booster()
+    booster.load_model(str(path))
+    if not booster.feature_names:
+        # Without a stored schema columns cannot be aligned safely.
+        return None
+    names = tuple(booster.feature_names)
+    scores = booster.get_score(importance_type="weight")
+    importance = {name: float(scores.get(name, 0.0)) for name in names}
+    column_index, missing_columns = column_map(names)
+    return LoadedModel(
+        booster=booster,
+        version=path.stem,
+        feature_names=names,
+        importance=importance,
+        column_index=column_index,
+        missing_columns=missing_columns,
+    )
+
+
+class ModelRegistry:
+    """Tracks the live and shadow boosters in ``model_dir``.
+
+    Versions are the ``*.json`` file stems; the live model is the newest by
+    name unless ``live_version`` pins one. ``shadow_version`` names a candidate
+    to score alongside it (``"latest"`` means the newest file whenever it is
+    not the live one). :meth:`refresh` only reloads when the folder listing
+    changed, loads off to the side, and publishes each model with a single
+    attribute assignment, so scorers always see a complete model. A file that
+    fails to load (e.g. still being copied) leaves the current model in place
+    and is retried on the next poll.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        live_version: Optional[str] = None,
+        shadow_version: Optional[str] = None,
+        poll_seconds: float = 0.0,
+    ):
+        self.model_dir = model_dir
+        self.live_version = live_version
+        self.shadow_version = shadow_version
+        self.poll_seconds = poll_seconds
+        self.live: Optional[LoadedModel] = None
+        self.shadow: Optional[LoadedModel] = None
+        self.load_errors: Dict[str, str] = {}
+        self._listing: Optional[Listing] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Reload if the folder changed; returns whether anything was swapped."""
+        if not xgb:
+            return False
+        with self._refresh_lock:
+            listing = self._scan()
+            if listing == self._listing:
+                return False
+            versions = [name[: -len(".json")] for name, _, _ in listing]
+            live_target = self.live_version or (versions[-1] if versions else None)
+            shadow_target = self.shadow_version
+            if shadow_target == "latest":
+                shadow_target = versions[-1] if versions and versions[-1] != live_target else None
+
+            changed = False
+            live, live_ok = self._resolve(live_target, self.live, listing)
+            shadow, shadow_ok = self._resolve(shadow_target, self.shadow, listing)
+            if live is not self.live:
+                self.live = live
+                changed = True
+            if shadow is not self.shadow:
+                self.shadow = shadow
+                changed = True
+            # Only remember the listing once both targets loaded, so a
+            # half-written file is picked up on the next poll.
+            if live_ok and shadow_ok:
+                self._listing = listing
+            return changed
+
+    def start(self) -> None:
+        """Poll the folder every ``poll_seconds`` in a daemon thread."""
+        if self.poll_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._poll, name="vidya-model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception:  # pragma: no cover - keep polling after unexpected errors
+                continue
+
+    def _scan(self) -> Listing:
+        if not self.model_dir.exists():
+            return ()
+        entries = []
+        for path in sorted(self.model_dir.glob("*.json")):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def _resolve(
+        self, version: Optional[str], current: Optional[LoadedModel], listing: Listing
+    ) -> Tuple[Optional[LoadedModel], bool]:
+        if version is None:
+            return None, True
+        signature = next((entry for entry in listing if entry[0] == f"{version}.json"), None)
+        if signature is None:
+            # Pinned version not deployed (yet); keep serving what we have.
+            # Its arrival changes the listing, which triggers another load.
+            return current, True
+        previous = self._listing and next((entry for entry in self._listing if entry[0] == signature[0]), None)
+        if current is not None and current.version == version and previous == signature:
+            return current, True
+        try:
+            loaded = load_booster(self.model_dir / signature[0])
+        except Exception as exc:
+            self.load_errors[version] = str(exc)
+            return current, False
+        self.load_errors.pop(version, None)
+        return loaded, True
+
+
+__all__ = ["LoadedModel", "ModelRegistry", "column_map", "load_booster"]
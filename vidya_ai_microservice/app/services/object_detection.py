@@ -3,92 +3,203 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List, Optional
-
-try:
-    from ultralytics import YOLO  # type: ignore
-except Exception:  # pragma: no cover - ultralytics may be missing
-    YOLO = None
+from typing import Any, Dict, List, Optional
 
 from ..config import DetectionConfig
 from ..schemas import EvidenceImage, ObjectDetectionResult
+from ..utils.lazy_import import optional_module
+from ..utils.media_context import CaseMediaContext
 from ..utils.media_loader import MediaLoader, MediaLoaderError
+from ..utils.metrics import CALL_SECONDS, DETECTION_MODES, ERRORS, FALLBACKS
+from ..utils.result_cache import ResultCache, config_fingerprint
+from .detection_batcher import MicroBatcher
+from .onnx_detector import Detection, OnnxYoloDetector
+
+# Imported only when an Ultralytics model is configured, so torch stays out of
+# processes that run the ONNX backend or the rule-based fallback.
+YOLO = optional_module("ultralytics", "YOLO", label="ultralytics")
 
 
 class ObjectDetectionService:
-    """Wraps YOLO inference for asset validation."""
+    """Wraps YOLO inference for asset validation.
 
-    def __init__(self, loader: MediaLoader, config: DetectionConfig, model_path: Optional[Path] = None) -> None:
+    All asset images of a case are decoded through the shared media context
+    and sent to the model in one batched ``predict`` call (chunked by
+    ``max_batch``). With ``batch_window_ms`` > 0, a :class:`MicroBatcher` also
+    merges frames from concurrently scored cases into the same call.
+    """
+
+    def __init__(
+        self,
+        loader: MediaLoader,
+        config: DetectionConfig,
+        model_path: Optional[Path] = None,
+        batch_window_ms: float = 0.0,
+        max_batch: int = 16,
+        backend: Optional[str] = None,
+        onnx_intra_op_threads: int = 0,
+        cache: Optional[ResultCache] = None,
+    ) -> None:
         self.loader = loader
         self.config = config
+        self.cache = cache
+        self.model_id = str(model_path) if model_path else None
+        self.max_batch = max(max_batch, 1)
+        self.backend = backend or self._infer_backend(model_path)
+        self.onnx_intra_op_threads = onnx_intra_op_threads
         self.model = self._load_model(model_path) if model_path else None
+        self.batcher = (
+            MicroBatcher(self._predict_frames, window_ms=batch_window_ms, max_batch=self.max_batch)
+            if self.model and batch_window_ms > 0
+            else None
+        )
 
     def _load_model(self, model_path: Path | str | None):
-        if YOLO and model_path and Path(model_path).exists():
-            try:
+        if not model_path or not Path(model_path).exists():
+            return None
+        try:
+            if self.backend == "onnx":
+                return OnnxYoloDetector(model_path, intra_op_threads=self.onnx_intra_op_threads)
+            if YOLO:
                 return YOLO(str(model_path))
-            except Exception:
-                return None
+        except Exception:
+            return None
         return None
 
-    def analyze(self, images: List[EvidenceImage], declared_asset: Optional[str]) -> List[ObjectDetectionResult]:
-        results: List[ObjectDetectionResult] = []
-        for image in images:
+    @staticmethod
+    def _infer_backend(model_path: Path | str | None) -> str:
+        if model_path and Path(model_path).suffix.lower() == ".onnx":
+            return "onnx"
+        return "ultralytics"
+
+    def analyze(
+        self,
+        images: List[EvidenceImage],
+        declared_asset: Optional[str],
+        media: Optional[CaseMediaContext] = None,
+        config: Optional[DetectionConfig] = None,
+    ) -> List[ObjectDetectionResult]:
+        media = media or CaseMediaContext(self.loader)
+        config = config or self.config
+        results: List[Optional[ObjectDetectionResult]] = [None] * len(images)
+        frames: List[Any] = []
+        frame_slots: List[int] = []
+        digests: List[str] = []
+        cache_key = self._cache_key(config)
+        for idx, image in enumerate(images):
             try:
-                payload = self.loader.load_image_bytes(image)
-                results.append(self._run_detection(image, payload, declared_asset))
+                loaded = media.get(image)
+                if not self.model:
+                    results[idx] = self._fallback_result(image, declared_asset, config)
+                    continue
+                if self.cache is not None:
+                    # Raw detections are cached; keyword matching reruns so
+                    # declared asset types and synonyms always apply.
+                    cached = self.cache.get("detection", loaded.digest, cache_key)
+                    if cached is not None:
+                        results[idx] = self._result_from_detections(image, cached, declared_asset, config)
+                        continue
+                # Hand YOLO the shared decoded frame instead of re-decoding bytes.
+                frame = loaded.frame
+                frames.append(frame if frame is not None else loaded.image)
+                frame_slots.append(idx)
+                digests.append(loaded.digest)
             except MediaLoaderError as exc:
-                results.append(
-                    ObjectDetectionResult(
-                        image_id=image.id,
-                        detected_objects=[],
-                        asset_match=False,
-                        asset_match_score=0.0,
-                        match_score=0.0,
-                        details={"error": str(exc)},
-                    )
-                )
-        return results
-
-    def _run_detection(
+                results[idx] = self._error_result(image, exc)
+
+        if frames:
+            # Merged batches run with the service's current thresholds, so a case
+            # pinned to an older config predicts on its own.
+            if self.batcher and config is self.config:
+                detections = self.batcher.submit(frames)
+            else:
+                detections = self._predict_frames(frames, config)
+            for idx, image_detections in zip(frame_slots, detections):
+                results[idx] = self._result_from_detections(images[idx], image_detections, declared_asset, config)
+            if self.cache is not None:
+                for digest, image_detections in zip(digests, detections):
+                    self.cache.put("detection", digest, cache_key, [list(item) for item in image_detections])
+        return [result for result in results if result is not None]
+
+    def _cache_key(self, config: Optional[DetectionConfig] = None) -> str:
+        config = config or self.config
+        return config_fingerprint(f"{config.confidence_threshold}|{config.iou_threshold}|{self.backend}|{self.model_id}")
+
+    def _predict_frames(self, frames: List[Any], config: Optional[DetectionConfig] = None) -> List[List[Detection]]:
+        with CALL_SECONDS.time(backend=f"yolo_{self.backend}"):
+            return self._predict(frames, config or self.config)
+
+    def _predict(self, frames: List[Any], config: DetectionConfig) -> List[List[Detection]]:
+        if isinstance(self.model, OnnxYoloDetector):
+            return self.model.detect(
+                frames,
+                conf=config.confidence_threshold,
+                iou=config.iou_threshold,
+                max_batch=self.max_batch,
+            )
+        outputs: List[List[Detection]] = []
+        for start in range(0, len(frames), self.max_batch):
+            chunk = frames[start : start + self.max_batch]
+            predictions = self.model.predict(
+                source=chunk,
+                verbose=False,
+                conf=config.confidence_threshold,
+                iou=config.iou_threshold,
+            )
+            for result in predictions:
+                boxes = result.boxes
+                detections: List[Detection] = []
+                if boxes is not None:
+                    for box in boxes:
+                        label = self.model.names.get(int(box.cls[0]), "object")
+                        detections.append((label, float(box.conf[0]), box.xyxy[0].tolist()))
+                outputs.append(detections)
+        return outputs
+
+    def _fallback_result(
+        self, image: EvidenceImage, declared_asset: Optional[str], config: DetectionConfig
+    ) -> ObjectDetectionResult:
+        keywords = self._keywords(declared_asset, image.declared_asset_type, config)
+        haystack = (image.declared_asset_type or "").lower()
+        match_score = 1.0 if keywords and any(keyword in haystack for keyword in keywords) else 0.0
+        FALLBACKS.inc(component="detection", reason="model_unavailable")
+        return self._result_from_scores(image.id, [], match_score, declared_asset, "fallback", config)
+
+    def _error_result(self, image: EvidenceImage, exc: Exception) -> ObjectDetectionResult:
+        ERRORS.inc(stage="detection", kind="media")
+        DETECTION_MODES.inc(mode="error")
+        return ObjectDetectionResult(
+            image_id=image.id,
+            detected_objects=[],
+            asset_match=False,
+            asset_match_score=0.0,
+            match_score=0.0,
+            details={"error": str(exc)},
+        )
+
+    def _result_from_detections(
         self,
         image: EvidenceImage,
-        payload: bytes,
+        detections: List[Detection],
         declared_asset: Optional[str],
+        config: DetectionConfig,
     ) -> ObjectDetectionResult:
-        keywords = self._keywords(declared_asset, image.declared_asset_type)
-        if not self.model:
-            haystack = (image.declared_asset_type or "").lower()
-            match_score = 1.0 if keywords and any(keyword in haystack for keyword in keywords) else 0.0
-            return self._result_from_scores(image.id, [], match_score, declared_asset, "fallback")
-
-        detections = self.model.predict(
-            source=payload,
-            verbose=False,
-            conf=self.config.confidence_threshold,
-            iou=self.config.iou_threshold,
-        )
+        keywords = self._keywords(declared_asset, image.declared_asset_type, config)
         detected_objects: List[Dict[str, float | str]] = []
         best_match = 0.0
         matched_label: Optional[str] = None
-        for result in detections:
-            boxes = result.boxes
-            if boxes is None:
-                continue
-            for box in boxes:
-                cls_name = self.model.names.get(int(box.cls[0]), "object")
-                conf = float(box.conf[0])
-                detected_objects.append(
-                    {
-                        "label": cls_name,
-                        "confidence": round(conf, 3),
-                        "bbox": box.xyxy[0].tolist(),
-                    }
-                )
-                if keywords and any(keyword in cls_name.lower() for keyword in keywords):
-                    if conf > best_match:
-                        best_match = conf
-                        matched_label = cls_name
+        for cls_name, conf, bbox in detections:
+            detected_objects.append(
+                {
+                    "label": cls_name,
+                    "confidence": round(conf, 3),
+                    "bbox": bbox,
+                }
+            )
+            if keywords and any(keyword in cls_name.lower() for keyword in keywords):
+                if conf > best_match:
+                    best_match = conf
+                    matched_label = cls_name
 
         return self._result_from_scores(
             image.id,
@@ -96,6 +207,7 @@ class ObjectDetectionService:
             best_match,
             declared_asset,
             "yolov8",
+            config,
             matched_label,
         )
 
@@ -106,10 +218,14 @@ class ObjectDetectionService:
         match_score: float,
         declared_asset: Optional[str],
         mode: str,
+        config: DetectionConfig,
         matched_label: Optional[str] = None,
     ) -> ObjectDetectionResult:
-        normalized_score = 1.0 if match_score >= self.config.confidence_threshold else 0.0
+        DETECTION_MODES.inc(mode=mode)
+        normalized_score = 1.0 if match_score >= config.confidence_threshold else 0.0
         details = {"mode": mode, "declared_asset": declared_asset}
+        if self.model is not None:
+            details["backend"] = self.backend
         if matched_label:
             details["matched_label"] = matched_label
         return ObjectDetectionResult(
@@ -121,11 +237,13 @@ class ObjectDetectionService:
             details=details,
         )
 
-    def _keywords(self, declared_asset: Optional[str], fallback_asset: Optional[str]) -> List[str]:
+    def _keywords(
+        self, declared_asset: Optional[str], fallback_asset: Optional[str], config: DetectionConfig
+    ) -> List[str]:
         if not declared_asset and not fallback_asset:
             return []
         asset_key = (declared_asset or fallback_asset or "").lower()
-        synonyms = self.config.asset_synonyms.get(asset_key, [])
+        synonyms = config.asset_synonyms.get(asset_key, [])
         return list({asset_key, *[syn.lower() for syn in synonyms]})
 
 
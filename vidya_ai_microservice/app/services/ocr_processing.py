@@ -2,27 +2,65 @@
 
 from __future__ import annotations
 
-import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-try:
-    from google.cloud import vision  # type: ignore
-except Exception:  # pragma: no cover - API optional
-    vision = None
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..config import OCRConfig, settings
 from ..schemas import EvidenceDocument, OCRResult
-from ..utils.media_loader import MediaLoader, MediaLoaderError
+from ..utils.lazy_import import optional_module
+from ..utils.media_context import CaseMediaContext, LoadedMedia
+from ..utils.media_loader import MediaBuffer, MediaLoader, MediaLoaderError
+from ..utils.metrics import ERRORS, FALLBACKS, OCR_STRATEGIES
+from ..utils.result_cache import ResultCache
+from .detection_batcher import MicroBatcher
+from .invoice_parser import parse_invoice, parse_invoice_date
+from .vision_client import MAX_IMAGES_PER_REQUEST, VisionRestClient
+
+vision = optional_module("google.cloud.vision", label="google_cloud_vision")  # API optional
 
 
 class DocumentOCRService:
     """Handles OCR extraction and business-field parsing."""
 
-    def __init__(self, loader: MediaLoader, config: OCRConfig, credentials_path: Optional[str] = None):
+    def __init__(
+        self,
+        loader: MediaLoader,
+        config: OCRConfig,
+        credentials_path: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        rest_client: Optional[VisionRestClient] = None,
+        batch_window_ms: float = 0.0,
+    ):
         self.loader = loader
         self.config = config
-        self.client = self._init_client(credentials_path) if vision else None
+        self.cache = cache
+        self._credentials_path = credentials_path
+        self._client: Any = None
+        self._client_lock = Lock()
+        self._client_ready = False
+        self.rest_client = rest_client if rest_client is not None else self._init_rest_client()
+        # Pages from concurrently scored cases can share one images:annotate call.
+        self.rest_batcher = (
+            MicroBatcher(
+                self.rest_client.annotate,
+                window_ms=batch_window_ms,
+                max_batch=MAX_IMAGES_PER_REQUEST,
+                name="vidya-ocr-batcher",
+            )
+            if self.rest_client is not None and batch_window_ms > 0
+            else None
+        )
+
+    @property
+    def client(self) -> Any:
+        """Vision SDK client, created on first use so startup does not import ``google.cloud.vision``."""
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    self._client = self._init_client(self._credentials_path) if vision else None
+                    self._client_ready = True
+        return self._client
 
     def _init_client(self, credentials_path: Optional[str]):  # pragma: no cover - network
         if not vision:
@@ -34,95 +72,74 @@ class DocumentOCRService:
         except Exception:
             return None
 
+    @staticmethod
+    def _init_rest_client() -> Optional[VisionRestClient]:
+        if not settings.google_api_key:
+            return None
+        return VisionRestClient(
+            api_key=settings.google_api_key,
+            base_url=settings.vision_api_url,
+            timeout_seconds=settings.vision_timeout_seconds,
+            max_concurrency=settings.vision_max_concurrency,
+            max_retries=settings.vision_max_retries,
+        )
+
     def process_documents(
         self,
         documents: List[EvidenceDocument],
         declared_vendor: Optional[str],
         declared_amount: Optional[float],
         declared_date: Optional[datetime],
+        media: Optional[CaseMediaContext] = None,
+        config: Optional[OCRConfig] = None,
     ) -> List[OCRResult]:
-        results: List[OCRResult] = []
-        for doc in documents:
+        media = media or CaseMediaContext(self.loader)
+        config = config or self.config
+        results: List[Optional[OCRResult]] = [None] * len(documents)
+        loaded: Dict[int, LoadedMedia] = {}
+        for idx, doc in enumerate(documents):
             try:
-                payload = self.loader.load_document_bytes(doc)
-                results.append(self._process_single(doc, payload, declared_vendor, declared_amount, declared_date))
+                loaded[idx] = media.get(doc)
             except MediaLoaderError as exc:
-                results.append(
-                    OCRResult(
-                        doc_id=doc.id,
-                        raw_text="",
-                        ocr_confidence=0.0,
-                        parsed_fields={},
-                        crosscheck_results={"error": str(exc)},
-                        penalties={"load_failure": self.config.amount_penalty},
-                        match_score=0.0,
-                    )
+                ERRORS.inc(stage="ocr", kind="media")
+                results[idx] = OCRResult(
+                    doc_id=doc.id,
+                    raw_text="",
+                    ocr_confidence=0.0,
+                    parsed_fields={},
+                    crosscheck_results={"error": str(exc)},
+                    penalties={"load_failure": config.amount_penalty},
+                    match_score=0.0,
                 )
+        # Text for every loadable page is extracted together so REST calls can
+        # be batched across a multi-page invoice.
+        texts = self._extract_texts(list(loaded.values()))
+        for idx, (text, confidence) in zip(loaded, texts):
+            results[idx] = self._process_single(
+                documents[idx], text, confidence, declared_vendor, declared_amount, declared_date, config
+            )
         return results
 
     def _process_single(
         self,
         document: EvidenceDocument,
-        payload: bytes,
+        text: str,
+        confidence: float,
         declared_vendor: Optional[str],
         declared_amount: Optional[float],
         declared_date: Optional[datetime],
+        config: OCRConfig,
     ) -> OCRResult:
-        text = ""
-        confidence = 0.0
-        
-        # Strategy 1: Google Cloud Client (Service Account)
-        if self.client:
-            try:
-                image = vision.Image(content=payload)
-                response = self.client.document_text_detection(image=image)
-                if not response.error.message:
-                    text = response.full_text_annotation.text
-                    confidences = [s.confidence for p in response.full_text_annotation.pages for b in p.blocks for paragraph in b.paragraphs for word in paragraph.words for s in word.symbols]
-                    confidence = float(sum(confidences) / len(confidences)) if confidences else 0.8
-            except Exception:
-                pass
-
-        # Strategy 2: REST API (API Key)
-        if not text and settings.google_api_key:
-            import requests
-            import base64
-            
-            try:
-                api_url = f"https://vision.googleapis.com/v1/images:annotate?key={settings.google_api_key}"
-                print(f"DEBUG: Calling Google Vision API at {api_url[:40]}...")
-                b64_image = base64.b64encode(payload).decode("utf-8")
-                body = {
-                    "requests": [
-                        {
-                            "image": {"content": b64_image},
-                            "features": [{"type": "DOCUMENT_TEXT_DETECTION"}]
-                        }
-                    ]
-                }
-                resp = requests.post(api_url, json=body, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    responses = data.get("responses", [])
-                    if responses and "fullTextAnnotation" in responses[0]:
-                        text = responses[0]["fullTextAnnotation"]["text"]
-                        # Simple confidence approximation since REST response structure is deep
-                        confidence = 0.9 
-            except Exception:
-                pass
-
         # Strategy 3: Fallback
         if not text:
             confidence = 0.5
+            FALLBACKS.inc(component="ocr", reason="no_text")
 
-        parsed_fields = self._parse_fields(text)
-        penalties, crosscheck = self._crosscheck(parsed_fields, declared_vendor, declared_amount, declared_date, confidence)
-        max_penalty = (
-            self.config.vendor_penalty
-            + self.config.amount_penalty
-            + self.config.date_penalty
-            + self.config.low_confidence_penalty
+        parsed_fields = parse_invoice(text)
+        penalties, crosscheck = self._crosscheck(
+            parsed_fields, declared_vendor, declared_amount, declared_date, confidence, config
         )
+        max_penalty = config.vendor_penalty + config.amount_penalty + config.date_penalty + config.low_confidence_penalty
         match_score = max(0.0, 1 - (sum(penalties.values()) / max_penalty)) if max_penalty else 1.0
 
         return OCRResult(
@@ -135,68 +152,97 @@ class DocumentOCRService:
             match_score=round(match_score, 3),
         )
 
-    def _parse_fields(self, text: str) -> Dict[str, Optional[str | float]]:
-        vendor = self._extract_vendor(text)
-        amount = self._extract_amount(text)
-        date = self._extract_date(text)
-        return {
-            "vendor": vendor,
-            "amount": amount,
-            "date": date,
-        }
+    def _extract_texts(self, items: List[LoadedMedia]) -> List[Tuple[str, float]]:
+        texts: List[Optional[Tuple[str, float]]] = [None] * len(items)
+
+        # Extraction depends only on the document bytes, so reuse earlier text
+        # for identical uploads; empty (failed) extractions are not cached.
+        if self.cache is not None:
+            for idx, item in enumerate(items):
+                cached = self.cache.get("ocr_text", item.digest)
+                if cached is not None:
+                    texts[idx] = (cached["text"], cached["confidence"])
+                    OCR_STRATEGIES.inc(strategy="cache")
+        pending = [idx for idx, value in enumerate(texts) if value is None]
+
+        # Strategy 1: Google Cloud Client (Service Account)
+        if self.client:
+            for idx in pending:
+                texts[idx] = self._client_text(items[idx].payload)
+            OCR_STRATEGIES.inc(sum(1 for idx in pending if texts[idx][0]), strategy="client")
+            pending = [idx for idx in pending if not texts[idx][0]]
 
-    def _extract_vendor(self, text: str) -> Optional[str]:
-        match = re.search(r"Vendor\s*:?\s*(.+)", text, re.IGNORECASE)
-        return match.group(1).strip() if match else None
+        # Strategy 2: REST API (API Key), batched through the pooled client
+        if pending and self.rest_client is not None:
+            annotate = self.rest_batcher.submit if self.rest_batcher else self.rest_client.annotate
+            annotated = annotate([items[idx].base64 for idx in pending])
+            for idx, (text, confidence) in zip(pending, annotated):
+                if text:
+                    texts[idx] = (text, confidence)
+                    OCR_STRATEGIES.inc(strategy="rest")
+            pending = [idx for idx in pending if not (texts[idx] and texts[idx][0])]
 
-    def _extract_amount(self, text: str) -> Optional[float]:
-        match = re.search(r"(INR|Rs\.?|₹)\s*([0-9,]+\.?[0-9]*)", text, re.IGNORECASE)
-        if match:
-            return float(match.group(2).replace(",", ""))
-        match = re.search(r"Total\s*:?\s*([0-9,]+\.?[0-9]*)", text, re.IGNORECASE)
-        if match:
-            return float(match.group(1).replace(",", ""))
-        return None
+        for idx in pending:
+            texts[idx] = ("", 0.0)
+        OCR_STRATEGIES.inc(len(pending), strategy="fallback")
+        if self.cache is not None:
+            for idx, (text, confidence) in enumerate(texts):
+                if text:
+                    self.cache.put("ocr_text", items[idx].digest, "", {"text": text, "confidence": confidence})
+        return texts
 
-    def _extract_date(self, text: str) -> Optional[str]:
-        match = re.search(r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})", text)
-        return match.group(1) if match else None
+    def _client_text(self, payload: MediaBuffer) -> Tuple[str, float]:  # pragma: no cover - network
+        try:
+            image = vision.Image(content=bytes(payload))
+            response = self.client.document_text_detection(image=image)
+            if not response.error.message:
+                text = response.full_text_annotation.text
+                confidences = [s.confidence for p in response.full_text_annotation.pages for b in p.blocks for paragraph in b.paragraphs for word in paragraph.words for s in word.symbols]
+                confidence = float(sum(confidences) / len(confidences)) if confidences else 0.8
+                return text, confidence
+        except Exception:
+            pass
+        return "", 0.0
 
     def _crosscheck(
         self,
-        parsed: Dict[str, Optional[str | float]],
+        parsed: Dict[str, Any],
         declared_vendor: Optional[str],
         declared_amount: Optional[float],
         declared_date: Optional[datetime],
         confidence: float,
+        config: Optional[OCRConfig] = None,
     ) -> tuple[Dict[str, float], Dict[str, Any]]:
+        config = config or self.config
         penalties: Dict[str, float] = {}
         vendor_match = False
         parsed_vendor = parsed.get("vendor")
         if parsed_vendor and declared_vendor:
             vendor_match = declared_vendor.lower() in parsed_vendor.lower()
         if declared_vendor and not vendor_match:
-            penalties["vendor_mismatch"] = self.config.vendor_penalty
+            penalties["vendor_mismatch"] = config.vendor_penalty
 
         amount_match = False
         parsed_amount = parsed.get("amount")
         if parsed_amount and declared_amount:
             diff = abs(float(parsed_amount) - declared_amount)
             if declared_amount:
-                amount_match = diff <= self.config.amount_tolerance_pct * declared_amount
+                amount_match = diff <= config.amount_tolerance_pct * declared_amount
         if declared_amount and not amount_match:
-            penalties["amount_mismatch"] = self.config.amount_penalty
+            penalties["amount_mismatch"] = config.amount_penalty
 
         date_match = True
-        parsed_date_value = self._normalize_date(parsed.get("date"))
+        parsed_date_value = parse_invoice_date(parsed.get("date"))
         if declared_date and parsed_date_value:
-            delta_days = abs((parsed_date_value - declared_date).days)
-            date_match = delta_days <= self.config.date_tolerance_days
+            # Invoice dates are calendar dates; an offset on the declared value
+            # (e.g. "2025-01-05T00:00:00Z") must not break the comparison.
+            delta_days = abs((parsed_date_value - declared_date.replace(tzinfo=None)).days)
+            date_match = delta_days <= config.date_tolerance_days
         if declared_date and not date_match:
-            penalties["date_mismatch"] = self.config.date_penalty
+            penalties["date_mismatch"] = config.date_penalty
 
-        if confidence < self.config.provider_confidence_threshold:
-            penalties["low_confidence"] = self.config.low_confidence_penalty
+        if confidence < config.provider_confidence_threshold:
+            penalties["low_confidence"] = config.low_confidence_penalty
 
         crosscheck = {
             "vendor_match": vendor_match,
@@ -209,15 +255,5 @@ class DocumentOCRService:
 
         return penalties, crosscheck
 
-    def _normalize_date(self, value: Optional[str | float]) -> Optional[datetime]:
-        if not value or not isinstance(value, str):
-            return None
-        for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(value, fmt)
-            except ValueError:
-                continue
-        return None
-
 
 __all__ = ["DocumentOCRService"]
@@ -0,0 +1,180 @@
+"""ONNX Runtime CPU backend for exported YOLOv8 detection models."""
+
+from __future__ import annotations
+
+import ast
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.lazy_import import optional_module
+
+cv2 = optional_module("cv2", label="opencv")  # OpenCV may be unavailable in CI
+ort = optional_module("onnxruntime")
+
+Detection = Tuple[str, float, List[float]]  # (label, confidence, xyxy box)
+
+# Same limits ultralytics applies in ``non_max_suppression``.
+_MAX_WH = 7680
+_MAX_NMS = 30000
+_MAX_DET = 300
+_PAD_VALUE = 114
+
+
+def letterbox(frame: np.ndarray, size: Tuple[int, int]) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize ``frame`` into ``size`` (h, w) keeping aspect ratio, padding the rest.
+
+    Mirrors ultralytics' ``LetterBox(auto=False, center=True)`` so boxes map
+    back to the original image exactly as the PyTorch path does.
+    """
+    height, width = frame.shape[:2]
+    target_h, target_w = size
+    gain = min(target_h / height, target_w / width)
+    new_w, new_h = int(round(width * gain)), int(round(height * gain))
+    pad_w, pad_h = (target_w - new_w) / 2, (target_h - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(_PAD_VALUE,) * 3)
+    # Offsets for mapping boxes back use ultralytics' ``scale_boxes`` rounding.
+    unpad_x = int(round((target_w - width * gain) / 2 - 0.1))
+    unpad_y = int(round((target_h - height * gain) / 2 - 0.1))
+    return frame, gain, (unpad_x, unpad_y)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy IoU suppression over xyxy ``boxes``; returns kept indices by score."""
+    order = scores.argsort()[::-1]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep: List[int] = []
+    while order.size:
+        best = order[0]
+        keep.append(int(best))
+        rest = order[1:]
+        x1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def postprocess(
+    output: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float,
+    gain: float,
+    pad: Tuple[int, int],
+    original_shape: Tuple[int, int],
+    names: Dict[int, str],
+) -> List[Detection]:
+    """Decode one ``(4 + classes, anchors)`` YOLOv8 head output into detections."""
+    predictions = output.T
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    confidences = class_scores[np.arange(len(class_ids)), class_ids]
+    mask = confidences > conf_threshold
+    if not mask.any():
+        return []
+    predictions, class_ids, confidences = predictions[mask], class_ids[mask], confidences[mask]
+    if len(confidences) > _MAX_NMS:
+        top = confidences.argsort()[::-1][:_MAX_NMS]
+        predictions, class_ids, confidences = predictions[top], class_ids[top], confidences[top]
+
+    cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    # Offset boxes per class so one NMS pass never suppresses across classes.
+    keep = nms(boxes + (class_ids * _MAX_WH)[:, None], confidences, iou_threshold)[:_MAX_DET]
+
+    boxes = boxes[keep]
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= gain
+    height, width = original_shape
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return [
+        (names.get(int(class_ids[idx]), "object"), float(confidences[idx]), box.tolist())
+        for idx, box in zip(keep, boxes)
+    ]
+
+
+class OnnxYoloDetector:
+    """Runs an exported YOLOv8 ``.onnx`` graph through onnxruntime on CPU.
+
+    Input tensors are preallocated per batch size and bound through
+    ``IOBinding`` so repeated calls reuse the same buffers; NMS runs in NumPy.
+    """
+
+    def __init__(self, model_path: Path | str, intra_op_threads: int = 0):
+        if not ort:
+            raise RuntimeError("onnxruntime is not installed")
+        if not cv2:
+            raise RuntimeError("OpenCV is required for ONNX preprocessing")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+        self.input_size = self._input_size(model_input.shape)
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.names = self._read_names()
+        self._lock = Lock()
+        self._binding = self.session.io_binding()
+        self._buffers: Dict[int, np.ndarray] = {}
+
+    def detect(self, frames: Sequence[np.ndarray], conf: float, iou: float, max_batch: int) -> List[List[Detection]]:
+        step = self.fixed_batch or max(max_batch, 1)
+        outputs: List[List[Detection]] = []
+        for start in range(0, len(frames), step):
+            outputs.extend(self._detect_chunk(frames[start : start + step], conf, iou))
+        return outputs
+
+    def _detect_chunk(self, frames: Sequence[np.ndarray], conf: float, iou: float) -> List[List[Detection]]:
+        batch = self.fixed_batch or len(frames)
+        with self._lock:
+            buffer = self._buffers.get(batch)
+            if buffer is None:
+                buffer = np.zeros((batch, 3, *self.input_size), dtype=np.float32)
+                self._buffers[batch] = buffer
+            transforms = []
+            for slot, frame in enumerate(frames):
+                boxed, gain, pad = letterbox(frame, self.input_size)
+                # BGR HWC uint8 -> RGB CHW float32 in [0, 1], written in place.
+                np.multiply(boxed[:, :, ::-1].transpose(2, 0, 1), 1 / 255.0, out=buffer[slot], casting="unsafe")
+                transforms.append((gain, pad, frame.shape[:2]))
+            self._binding.bind_cpu_input(self.input_name, buffer)
+            self._binding.bind_output(self.output_name)
+            self.session.run_with_iobinding(self._binding)
+            raw = self._binding.copy_outputs_to_cpu()[0]
+
+        return [
+            postprocess(raw[slot], conf, iou, gain, pad, shape, self.names)
+            for slot, (gain, pad, shape) in enumerate(transforms)
+        ]
+
+    def _read_names(self) -> Dict[int, str]:
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        try:
+            return {int(key): str(value) for key, value in ast.literal_eval(metadata.get("names", "{}")).items()}
+        except (ValueError, SyntaxError):
+            return {}
+
+    @staticmethod
+    def _input_size(shape: Sequence[Optional[int | str]]) -> Tuple[int, int]:
+        height, width = shape[2], shape[3]
+        if isinstance(height, int) and isinstance(width, int):
+            return height, width
+        return 640, 640
+
+
+__all__ = ["OnnxYoloDetector", "letterbox", "nms", "postprocess"]
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Dict
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
 
 from ..config import (
     DetectionConfig,
@@ -12,19 +15,56 @@ from ..config import (
     QualityConfig,
     ThresholdConfig,
     WeightConfig,
+    detection_config,
+    duplicate_config,
+    fraud_rule_config,
+    ocr_config,
+    quality_config,
     settings,
+    threshold_config,
+    weight_config,
 )
 from .verification import VerificationService
-from ..schemas import EvidencePackage, ScoreBreakdown, ScoreResponse, VerificationResult
-from ..utils.media_loader import MediaLoader
-from ..utils.state import LocalStateStore
+from .verification_gateway import VerificationGateway
+from .verification_registry import VerificationRegistry
+from ..schemas import (
+    EvidencePackage,
+    ImageQualityResult,
+    ObjectDetectionResult,
+    OCRResult,
+    ScoreBreakdown,
+    ScoreResponse,
+    VerificationResult,
+)
+from ..utils.media_context import CaseMediaContext
+from ..utils.media_loader import MediaBuffer, MediaLoader
+from ..utils.lazy_import import optional_module, warm_up
+from ..utils.metrics import CASE_SECONDS, STAGE_SECONDS
+from ..utils.result_cache import ResultCache, config_fingerprint
+from ..utils.state import CASE_RISK_COMPONENTS, LocalStateStore
 from .aggregation import RiskAggregator
+from .case_state import CaseSnapshot
+from .config_store import ConfigSnapshot, ConfigStore
 from .feature_engineering import FeatureEngineer
 from .fraud_model import FraudScoringService
 from .hashing import DuplicateDetector
+from .invoice_parser import PARSER_VERSION
+from .model_registry import ModelRegistry
 from .object_detection import ObjectDetectionService
 from .ocr_processing import DocumentOCRService
+from .portfolio import RiskPortfolio
 from .quality import ImageQualityAnalyzer
+from .scheduler import Stage, StageScheduler
+
+
+class RuntimeConfig(NamedTuple):
+    """Everything derived from one config version, published as a single object."""
+
+    snapshot: ConfigSnapshot
+    aggregator: RiskAggregator
+    # Config digests folded into each layer's input keys, so a config or
+    # model change invalidates stored case snapshots.
+    layer_configs: Dict[str, str]
 
 
 class VidyaAIPipeline:
@@ -40,98 +80,342 @@ class VidyaAIPipeline:
         duplicate_cfg: DuplicateConfig,
         fraud_rules: FraudRuleConfig,
     ):
-        self.loader = MediaLoader()
-        self.duplicate_state = LocalStateStore(settings.duplicate_state_path)
+        self.loader = MediaLoader(
+            max_bytes=settings.media_max_bytes, spool_threshold=settings.media_spool_threshold_bytes
+        )
+        self.duplicate_state = LocalStateStore(settings.duplicate_state_path, settings.legacy_state_path)
         self.device_state = self.duplicate_state  # reuse same store for simplicity
+        self.result_cache = (
+            ResultCache(max_entries=settings.result_cache_entries, disk_dir=settings.result_cache_dir)
+            if settings.result_cache_entries or settings.result_cache_dir
+            else None
+        )
 
-        self.quality = ImageQualityAnalyzer(loader=self.loader, config=quality_cfg)
+        self.quality = ImageQualityAnalyzer(loader=self.loader, config=quality_cfg, cache=self.result_cache)
         self.detector = ObjectDetectionService(
             loader=self.loader,
             config=detection_cfg,
             model_path=settings.yolo_model_path,
+            batch_window_ms=settings.detection_batch_window_ms,
+            max_batch=settings.detection_max_batch,
+            backend=settings.yolo_backend,
+            onnx_intra_op_threads=settings.onnx_intra_op_threads,
+            cache=self.result_cache,
         )
         self.ocr = DocumentOCRService(
             loader=self.loader,
             config=ocr_cfg,
             credentials_path=settings.google_credentials_path,
+            cache=self.result_cache,
+            batch_window_ms=settings.ocr_batch_window_ms,
         )
         self.duplicates = DuplicateDetector(
             loader=self.loader,
             state_store=self.duplicate_state,
             config=duplicate_cfg,
+            cache=self.result_cache,
         )
         self.features = FeatureEngineer(state_store=self.device_state, rules=fraud_rules)
-        self.fraud = FraudScoringService(model_dir=settings.model_registry_path, rules=fraud_rules)
-        self.aggregator = RiskAggregator(weights, thresholds)
+        self.model_registry = ModelRegistry(
+            settings.model_registry_path,
+            live_version=settings.fraud_model_version,
+            shadow_version=settings.fraud_shadow_version,
+            poll_seconds=settings.model_poll_seconds,
+        )
+        self.model_registry.start()
+        self.fraud = FraudScoringService(
+            model_dir=settings.model_registry_path,
+            rules=fraud_rules,
+            registry=self.model_registry,
+            # At most batch_max_workers cases of one batch request reach the model together.
+            batch_window_ms=settings.fraud_batch_window_ms,
+            max_batch=settings.batch_max_workers,
+        )
+        self.verification_registry = VerificationRegistry(
+            settings.verification_registry_path,
+            cache_entries=settings.verification_cache_entries,
+            poll_seconds=settings.verification_poll_seconds,
+            seed_demo=settings.verification_seed_demo,
+        )
+        self.verification_registry.start()
+        self.verification_gateway: Optional[VerificationGateway] = None
+        if settings.gst_gateway_url or settings.cbs_gateway_url:
+            self.verification_gateway = VerificationGateway(
+                settings.gst_gateway_url,
+                settings.cbs_gateway_url,
+                fallback=self.verification_registry,
+                timeout_seconds=settings.verification_timeout_seconds,
+                max_concurrency=settings.verification_max_concurrency,
+                cache_ttl_seconds=settings.verification_cache_ttl_seconds,
+                cache_entries=settings.verification_cache_entries,
+                failure_threshold=settings.verification_breaker_failures,
+                reset_seconds=settings.verification_breaker_reset_seconds,
+            )
+        self.verification = VerificationService(self.verification_gateway or self.verification_registry)
+        self.portfolio = RiskPortfolio(self.duplicate_state)
+        self.config_store = ConfigStore(
+            settings.runtime_config_path,
+            seed={
+                "weights": weights,
+                "thresholds": thresholds,
+                "quality": quality_cfg,
+                "detection": detection_cfg,
+                "ocr": ocr_cfg,
+                "duplicates": duplicate_cfg,
+                "fraud_rules": fraud_rules,
+            },
+        )
+        self._config_lock = Lock()
+        self._runtime: Optional[RuntimeConfig] = None
+        self._install(self.config_store.current)
+        self.scheduler = StageScheduler(max_workers=settings.pipeline_max_workers)
+
+    def warm_up(self) -> Dict[str, bool]:
+        """Import the backends every case uses (OpenCV, pHash, the Vision SDK client) ahead of the first request."""
+        status = warm_up([optional_module("cv2"), optional_module("imagehash")])
+        status["vision_client"] = self.ocr.client is not None
+        return status
+
+    @property
+    def config(self) -> ConfigSnapshot:
+        """The config version new cases are scored under."""
+        return self._runtime.snapshot
+
+    @property
+    def aggregator(self) -> RiskAggregator:
+        return self._runtime.aggregator
+
+    def update_config(self, source: str = "api", **sections: Any) -> ConfigSnapshot:
+        """Persist a new config version (see :meth:`ConfigStore.update`) and switch to it."""
+        snapshot = self.config_store.update(source, **sections)
+        self.use_config(snapshot)
+        return snapshot
+
+    def use_config(self, snapshot: ConfigSnapshot) -> None:
+        """Switch to ``snapshot`` unless a newer version is already live."""
+        with self._config_lock:
+            if snapshot.version > self._runtime.snapshot.version:
+                self._install(snapshot)
 
-    def update_weights(self, new_weights: WeightConfig) -> None:
-        self.aggregator.update_weights(new_weights)
+    def use_config_version(self, version: int) -> ConfigSnapshot:
+        """Score under exactly ``version`` (pool workers follow the server this way)."""
+        snapshot = self.config_store.get(version)
+        # Check and swap under the same lock as use_config, so a concurrent
+        # update is never replaced by a runtime read before it landed.
+        with self._config_lock:
+            if self._runtime.snapshot.version != version:
+                if snapshot is None:
+                    raise KeyError(f"Unknown config version {version}")
+                self._install(snapshot)
+            return self._runtime.snapshot
+
+    def update_weights(self, new_weights: WeightConfig) -> ConfigSnapshot:
+        return self.update_config(weights=new_weights)
 
     def current_weights(self) -> WeightConfig:
-        return self.aggregator.weights
-
-    def score_case(self, payload: EvidencePackage) -> ScoreResponse:
-        quality_asset = self.quality.analyze_batch(payload.asset_images)
-        quality_docs = self.quality.analyze_batch(payload.doc_images)
-        quality_results = quality_asset + quality_docs
-
-        detection_results = self.detector.analyze(payload.asset_images, payload.metadata.declared_asset_type)
-        
-        # --- NEW: Mock Verification Checks ---
-        # 1. GST Checkmate (Invoice Number)
-        # We try to extract invoice number from OCR results, or use declared metadata if OCR fails/not run yet.
-        # Ideally we pull from OCR, but for simplicity we cross-check the declared_invoice_number if available (or assume extracted matches metadata).
-        # Let's verify the declared invoice number as a proxy for the OCR'd one.
-        # But wait, OCR runs below. Let's run OCR first.
-        
-        ocr_results = self.ocr.process_documents(
-            payload.doc_images,
-            payload.metadata.declared_vendor,
-            payload.metadata.declared_invoice_amount,
-            payload.metadata.declared_invoice_date,
-        )
-
-        # Extract invoice number from metadata (simulating "OCR extracted number")
-        # In a real app, OCRResult would return the specific Invoice # field.
-        # For this hackathon, we assume the 'declared_custom_metadata' or just use a placeholder from metadata if valid.
-        target_invoice = payload.metadata.custom_metadata.get("invoice_number")
-        target_gstin = payload.metadata.custom_metadata.get("gstin")  # Extract GSTIN if provided
-        
-        gst_result = VerificationService.verify_gst_invoice(target_invoice, target_gstin)
-        bank_result = VerificationService.verify_bank_sanction(
-            payload.metadata.applicant_id, 
-            payload.metadata.declared_asset_type
-        )
-        
-        verification_summary = VerificationResult(
-            gst_verified=gst_result["verified"],
-            gst_details=gst_result,
-            bank_match=bank_result["match"],
-            bank_details=bank_result
+        return self._runtime.snapshot.weights
+
+    def simulate_weights(
+        self,
+        weights: WeightConfig,
+        thresholds: Optional[ThresholdConfig] = None,
+        verification_knockout: bool = False,
+    ) -> Dict[str, Any]:
+        """Tier migrations across every scored case if ``weights``/``thresholds`` went live."""
+        return self.portfolio.simulate(self._runtime.aggregator, weights, thresholds, verification_knockout)
+
+    def _install(self, snapshot: ConfigSnapshot) -> None:
+        runtime = RuntimeConfig(
+            snapshot=snapshot,
+            aggregator=RiskAggregator(snapshot.weights, snapshot.thresholds),
+            layer_configs={
+                "quality": config_fingerprint(snapshot.quality),
+                "detection": config_fingerprint(self.detector._cache_key(snapshot.detection), snapshot.detection),
+                "ocr": f"{config_fingerprint(snapshot.ocr)}:parser{PARSER_VERSION}",
+            },
         )
-        
-        # --- End New Checks ---
+        # Cases in flight keep the runtime they pinned; the services' own
+        # configs only serve callers that do not pass one (and the detection
+        # micro-batcher, which merges frames scored under the live config).
+        self.quality.config = snapshot.quality
+        self.detector.config = snapshot.detection
+        self.ocr.config = snapshot.ocr
+        self.duplicates.config = snapshot.duplicates
+        self.features.rules = snapshot.fraud_rules
+        self.fraud.rules = snapshot.fraud_rules
+        self._runtime = runtime
 
-        duplicate_asset = self.duplicates.evaluate_images(payload.asset_images, payload.metadata.applicant_id, payload.case_id)
-        duplicate_docs = self.duplicates.evaluate_documents(payload.doc_images, payload.metadata.applicant_id, payload.case_id)
-        duplicate_results = duplicate_asset + duplicate_docs
+    def score_case(
+        self,
+        payload: EvidencePackage,
+        preloaded: Optional[Mapping[str, MediaBuffer]] = None,
+        previous: Union[ScoreResponse, str, None] = None,
+        batched: bool = False,
+    ) -> ScoreResponse:
+        """Score a case; with ``previous`` (a response or its ``state_id``) only changed inputs rerun.
 
-        feature_vector = self.features.build_feature_vector(
-            package=payload,
-            quality=quality_results,
-            detection=detection_results,
-            ocr_results=ocr_results,
-            duplicates=duplicate_results,
+        Reused layer results always come from the snapshot stored server-side
+        for that state, never from the response object itself. Features,
+        the fraud score and aggregation are rebuilt on every call. ``batched``
+        marks cases of a batch request, whose fraud rows may share one booster
+        call.
+        """
+        # Every layer reads evidence through one context so each item is
+        # fetched and decoded once per case.
+        media = CaseMediaContext(self.loader, preloaded)
+
+        # All state writes for the case (hashes, device usage, timestamps)
+        # are collected and committed together in one short transaction once
+        # scoring is done, so no write lock spans model or remote calls.
+        started = time.perf_counter()
+        with self.duplicate_state.batch():
+            response = self._score_case(payload, media, self._previous_snapshot(payload, previous), batched)
+            commit_started = time.perf_counter()
+        timings = response.timings
+        timings["state_commit"] = round((time.perf_counter() - commit_started) * 1000, 2)
+        for stage, elapsed_ms in timings.items():
+            STAGE_SECONDS.observe(elapsed_ms / 1000, stage=stage)
+        CASE_SECONDS.observe(time.perf_counter() - started)
+        return response
+
+    def _previous_snapshot(
+        self, payload: EvidencePackage, previous: Union[ScoreResponse, str, None]
+    ) -> Optional[CaseSnapshot]:
+        state_id = previous.state_id if isinstance(previous, ScoreResponse) else previous
+        if not state_id:
+            return None
+        stored = self.duplicate_state.load_case_state(state_id)
+        if stored is None:
+            return None
+        snapshot = CaseSnapshot.from_json(stored)
+        return snapshot if snapshot.case_id == payload.case_id else None
+
+    def _score_case(
+        self,
+        payload: EvidencePackage,
+        media: CaseMediaContext,
+        previous: Optional[CaseSnapshot],
+        batched: bool = False,
+    ) -> ScoreResponse:
+        metadata = payload.metadata
+        snapshot = CaseSnapshot(payload.case_id, fingerprint=media.fingerprint)
+        # Read once: every layer of this case uses the same config version,
+        # whatever updates land while it runs.
+        runtime = self._runtime
+        config = runtime.snapshot
+        configs = runtime.layer_configs
+        ocr_context = (
+            configs["ocr"],
+            str(metadata.declared_vendor),
+            str(metadata.declared_invoice_amount),
+            str(metadata.declared_invoice_date),
         )
-        fraud_score = self.fraud.score(feature_vector)
+        # The CBS lookup only needs the applicant, so it starts now and overlaps
+        # quality, detection and OCR. The invoice number is read off the
+        # documents first, so the GSTN lookup starts in the verification
+        # stage, as soon as OCR returns.
+        self.verification.prefetch(None, metadata.applicant_id)
 
-        aggregate = self.aggregator.aggregate(
-            quality=quality_results,
-            detection=detection_results,
-            ocr_results=ocr_results,
-            duplicates=duplicate_results,
-            fraud_score=fraud_score,
+        # Evidence layers only depend on the package, so they run concurrently
+        # and join before feature building.
+        stage_run = self.scheduler.run(
+            [
+                Stage(
+                    "quality",
+                    lambda _: snapshot.run_items(
+                        "quality.assets",
+                        payload.asset_images,
+                        (configs["quality"],),
+                        lambda items: self.quality.analyze_batch(items, media, config.quality),
+                        ImageQualityResult,
+                        previous,
+                    )
+                    + snapshot.run_items(
+                        "quality.docs",
+                        payload.doc_images,
+                        (configs["quality"],),
+                        lambda items: self.quality.analyze_batch(items, media, config.quality),
+                        ImageQualityResult,
+                        previous,
+                    ),
+                ),
+                Stage(
+                    "detection",
+                    lambda _: snapshot.run_items(
+                        "detection.assets",
+                        payload.asset_images,
+                        (configs["detection"], str(metadata.declared_asset_type)),
+                        lambda items: self.detector.analyze(
+                            items, metadata.declared_asset_type, media, config.detection
+                        ),
+                        ObjectDetectionResult,
+                        previous,
+                    ),
+                ),
+                Stage(
+                    "ocr",
+                    lambda _: snapshot.run_items(
+                        "ocr.docs",
+                        payload.doc_images,
+                        ocr_context,
+                        lambda items: self.ocr.process_documents(
+                            items,
+                            metadata.declared_vendor,
+                            metadata.declared_invoice_amount,
+                            metadata.declared_invoice_date,
+                            media,
+                            config.ocr,
+                        ),
+                        OCRResult,
+                        previous,
+                    ),
+                ),
+                Stage(
+                    "verification",
+                    lambda results: self._run_verification(payload, results["ocr"], snapshot, previous),
+                    depends_on=("ocr",),
+                ),
+                # Never reused: matches depend on every other case's hashes,
+                # which change between scorings. The pHash itself comes from
+                # the result cache, so a rerun is only index lookups.
+                Stage(
+                    "duplicates",
+                    lambda _: self.duplicates.evaluate_images(
+                        payload.asset_images, metadata.applicant_id, payload.case_id, media, config.duplicates
+                    )
+                    + self.duplicates.evaluate_documents(
+                        payload.doc_images, metadata.applicant_id, payload.case_id, media, config.duplicates
+                    ),
+                ),
+            ]
         )
+        timings = dict(stage_run.timings)
+        quality_results = stage_run.results["quality"]
+        detection_results = stage_run.results["detection"]
+        ocr_results = stage_run.results["ocr"]
+        verification_summary = stage_run.results["verification"]
+        duplicate_results = stage_run.results["duplicates"]
+
+        with _stopwatch(timings, "features"):
+            feature_row, feature_vector = self.features.build_features(
+                package=payload,
+                quality=quality_results,
+                detection=detection_results,
+                ocr_results=ocr_results,
+                duplicates=duplicate_results,
+                rules=config.fraud_rules,
+            )
+        with _stopwatch(timings, "fraud"):
+            fraud_score = self.fraud.score(feature_vector, config.fraud_rules, row=feature_row, batched=batched)
+
+        with _stopwatch(timings, "aggregation"):
+            aggregate = runtime.aggregator.aggregate(
+                quality=quality_results,
+                detection=detection_results,
+                ocr_results=ocr_results,
+                duplicates=duplicate_results,
+                fraud_score=fraud_score,
+            )
 
         breakdown = ScoreBreakdown(
             image_quality=quality_results,
@@ -154,6 +438,14 @@ class VidyaAIPipeline:
             "verification": verification_summary.model_dump() # And here
         }
 
+        state_id = snapshot.state_id
+        self.duplicate_state.save_case_state(payload.case_id, state_id, snapshot.to_json())
+        self.duplicate_state.record_case_risk(
+            payload.case_id,
+            [aggregate["components"][name] for name in CASE_RISK_COMPONENTS],
+            verification_failed=not (verification_summary.gst_verified and verification_summary.bank_match),
+        )
+
         return ScoreResponse(
             case_id=payload.case_id,
             scores=breakdown,
@@ -161,8 +453,104 @@ class VidyaAIPipeline:
             risk_tier=aggregate["risk_tier"],
             routing_decision=aggregate["routing_decision"],
             full_explanation=explanation,
-            verification_summary=verification_summary # And here
+            verification_summary=verification_summary, # And here
+            timings=timings,
+            state_id=state_id,
+            reused_components=snapshot.reused,
+            config_version=config.version,
         )
 
+    def _run_verification(
+        self,
+        payload: EvidencePackage,
+        ocr_results: List[OCRResult],
+        snapshot: CaseSnapshot,
+        previous: Optional[CaseSnapshot],
+    ) -> VerificationResult:
+        metadata = payload.metadata
+        identifiers, sources = _invoice_identifiers(ocr_results, metadata.custom_metadata)
+        invoice_number, gstin = identifiers["invoice_number"], identifiers["gstin"]
+        context = (
+            str(invoice_number),
+            str(gstin),
+            metadata.applicant_id,
+            str(metadata.declared_asset_type),
+            self.verification.answers_version,
+        )
+        return snapshot.run_case(
+            "verification",
+            context,
+            lambda: self._verify(payload, invoice_number, gstin, sources),
+            VerificationResult,
+            previous,
+            reusable=lambda result: not (
+                result.gst_details.get("gateway_error") or result.bank_details.get("gateway_error")
+            ),
+        )
+
+    def _verify(
+        self,
+        payload: EvidencePackage,
+        target_invoice: Optional[str],
+        target_gstin: Optional[str],
+        sources: Optional[Dict[str, str]] = None,
+    ) -> VerificationResult:
+        gst_result = self.verification.verify_gst_invoice(target_invoice, target_gstin)
+        if sources:
+            gst_result = {**gst_result, "identifier_sources": sources}
+        bank_result = self.verification.verify_bank_sanction(
+            payload.metadata.applicant_id,
+            payload.metadata.declared_asset_type
+        )
+
+        return VerificationResult(
+            gst_verified=gst_result["verified"],
+            gst_details=gst_result,
+            bank_match=bank_result["match"],
+            bank_details=bank_result
+        )
+
+
+def _invoice_identifiers(
+    ocr_results: List[OCRResult], custom_metadata: Mapping[str, Any]
+) -> Tuple[Dict[str, Optional[str]], Dict[str, str]]:
+    """Invoice number and GSTIN read off the documents, each falling back to ``custom_metadata``.
+
+    Returns the values and, for every value found, where it came from (``ocr`` or ``metadata``).
+    """
+    values: Dict[str, Optional[str]] = {"invoice_number": None, "gstin": None}
+    sources: Dict[str, str] = {}
+    for field in values:
+        for result in ocr_results:
+            if result.parsed_fields.get(field):
+                values[field], sources[field] = result.parsed_fields[field], "ocr"
+                break
+        else:
+            if custom_metadata.get(field):
+                values[field], sources[field] = custom_metadata[field], "metadata"
+    return values, sources
+
+
+@contextmanager
+def _stopwatch(timings: Dict[str, float], name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def build_pipeline() -> VidyaAIPipeline:
+    """Pipeline wired with the process-wide configs (the app and pool workers)."""
+    return VidyaAIPipeline(
+        weights=weight_config,
+        thresholds=threshold_config,
+        quality_cfg=quality_config,
+        detection_cfg=detection_config,
+        ocr_cfg=ocr_config,
+        duplicate_cfg=duplicate_config,
+        fraud_rules=fraud_rule_config,
+    )
+
 
-__all__ = ["VidyaAIPipeline"]
+__all__ = ["VidyaAIPipeline", "build_pipeline"]
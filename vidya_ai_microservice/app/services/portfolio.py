@@ -0,0 +1,120 @@
+"""Columnar copy of every scored case's component risks for what-if re-tiering."""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config import ThresholdConfig, WeightConfig
+from ..utils.state import CASE_RISK_COMPONENTS, LocalStateStore
+from .aggregation import RISK_TIERS, RiskAggregator
+
+
+class RiskPortfolio:
+    """The five component risks and verification outcome of each scored case.
+
+    Cases are recorded in the state store's ``case_risk`` table alongside the
+    rest of their state; this class mirrors that table into one contiguous
+    float64 row per component, pulling only rows written since the last sync
+    (by this or any other worker process). A re-scored case overwrites its
+    column slot, so the portfolio holds one entry per case.
+    """
+
+    SYNC_CHUNK_ROWS = 50000
+
+    def __init__(self, state: LocalStateStore, initial_capacity: int = 1024):
+        self.state = state
+        self._lock = Lock()
+        self._last_seq = 0
+        self._size = 0
+        self._slots: Dict[str, int] = {}
+        self._risks = np.zeros((len(CASE_RISK_COMPONENTS), initial_capacity), dtype=np.float64)
+        self._verification_failed = np.zeros(initial_capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def sync(self) -> int:
+        """Pull cases recorded since the last sync; returns how many rows were read."""
+        read = 0
+        with self._lock:
+            while True:
+                rows = self.state.iter_case_risk(self._last_seq, self.SYNC_CHUNK_ROWS)
+                if not rows:
+                    return read
+                self._append(rows)
+                self._last_seq = rows[-1][0]
+                read += len(rows)
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """``(components, verification_failed)`` views over the synced cases."""
+        self.sync()
+        with self._lock:
+            size = self._size
+            return self._risks[:, :size], self._verification_failed[:size]
+
+    def simulate(
+        self,
+        aggregator: RiskAggregator,
+        weights: WeightConfig,
+        thresholds: Optional[ThresholdConfig] = None,
+        verification_knockout: bool = False,
+    ) -> Dict[str, Any]:
+        """Re-tier the whole portfolio under ``weights``/``thresholds`` against the live config.
+
+        ``verification_knockout`` also routes cases that failed GST or bank
+        verification to video verification, which live scoring does not do.
+        """
+        started = time.perf_counter()
+        components, failed = self.columns()
+        baseline_scores, baseline = aggregator.score_columns(components)
+        scores, simulated = aggregator.score_columns(
+            components, failed if verification_knockout else None, weights, thresholds or aggregator.thresholds
+        )
+        tier_count = len(RISK_TIERS)
+        moves = np.bincount(baseline * tier_count + simulated, minlength=tier_count * tier_count)
+        moves = moves.reshape(tier_count, tier_count)
+        return {
+            "cases": int(components.shape[1]),
+            "baseline": dict(zip(RISK_TIERS, moves.sum(axis=1).tolist())),
+            "simulated": dict(zip(RISK_TIERS, moves.sum(axis=0).tolist())),
+            "migrations": {
+                source: {target: int(moves[i, j]) for j, target in enumerate(RISK_TIERS) if i != j and moves[i, j]}
+                for i, source in enumerate(RISK_TIERS)
+            },
+            "mean_score_delta": round(float((scores - baseline_scores).mean()), 4) if len(scores) else 0.0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _append(self, rows: list) -> None:
+        block = np.array([row[2:] for row in rows], dtype=np.float64)
+        slots = np.empty(len(rows), dtype=np.int64)
+        for idx, row in enumerate(rows):
+            slot = self._slots.get(row[1])
+            if slot is None:
+                slot = self._slots[row[1]] = self._size
+                self._size += 1
+            slots[idx] = slot
+        self._reserve(self._size)
+        self._risks[:, slots] = block[:, : len(CASE_RISK_COMPONENTS)].T
+        self._verification_failed[slots] = block[:, len(CASE_RISK_COMPONENTS)] != 0
+
+    def _reserve(self, size: int) -> None:
+        capacity = max(self._risks.shape[1], 1)
+        if size <= self._risks.shape[1]:
+            return
+        while capacity < size:
+            capacity *= 2
+        # Growing copies into new arrays, so a simulation holding views of the
+        # old ones is never left reading a half-copied portfolio.
+        risks = np.zeros((len(CASE_RISK_COMPONENTS), capacity), dtype=np.float64)
+        risks[:, : self._risks.shape[1]] = self._risks
+        failed = np.zeros(capacity, dtype=bool)
+        failed[: len(self._verification_failed)] = self._verification_failed
+        self._risks, self._verification_failed = risks, failed
+
+
+__all__ = ["RiskPortfolio"]
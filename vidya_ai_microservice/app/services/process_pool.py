@@ -0,0 +1,193 @@
+"""Process-pool execution tier so CPU-bound layers scale past the GIL."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..schemas import EvidencePackage, ScoreResponse
+from ..utils.metrics import REGISTRY, MetricsDelta
+
+# evidence id -> (offset, length) inside the case's shared-memory block
+Segments = Dict[str, Tuple[int, int]]
+
+_PIPELINE = None
+
+
+def _init_worker() -> None:
+    """Build and warm the pipeline (YOLO, booster, state store, OpenCV) once per worker process."""
+    global _PIPELINE
+    from .pipeline import build_pipeline
+
+    _PIPELINE = build_pipeline()
+    if settings.warm_up_backends:
+        _PIPELINE.warm_up()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _score_in_worker(
+    package: EvidencePackage,
+    shm_name: Optional[str],
+    segments: Segments,
+    config_version: int,
+    previous: Optional[str] = None,
+) -> Tuple[ScoreResponse, MetricsDelta]:
+    """Score one case; returns the response and the metrics it recorded in this worker."""
+    try:
+        return _score_case(package, shm_name, segments, config_version, previous), REGISTRY.drain()
+    except BaseException:
+        REGISTRY.drain()  # dropped with the failed case rather than leaking into the next one
+        raise
+
+
+def _score_case(
+    package: EvidencePackage,
+    shm_name: Optional[str],
+    segments: Segments,
+    config_version: int,
+    previous: Optional[str],
+) -> ScoreResponse:
+    # Workers share the server's config store file, so any version the
+    # server has recorded can be loaded here by number.
+    _PIPELINE.use_config_version(config_version)
+    if shm_name is None:
+        return _PIPELINE.score_case(package, previous=previous)
+
+    # Spawned workers share the server's resource tracker, so attaching here
+    # does not add a second registration; the server unlinks the block.
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        preloaded = {
+            evidence_id: block.buf[offset : offset + length] for evidence_id, (offset, length) in segments.items()
+        }
+        return _PIPELINE.score_case(package, preloaded, previous)
+    finally:
+        preloaded = None
+        try:
+            block.close()
+        except BufferError:  # pragma: no cover - a view outlived the case; the mapping goes with it
+            pass
+
+
+def pack_package(package: EvidencePackage) -> Tuple[EvidencePackage, Optional[shared_memory.SharedMemory], Segments]:
+    """Move inline base64 payloads into one shared-memory block.
+
+    Returns the package with those payloads stripped, the block (owned by the
+    caller, who must ``close`` and ``unlink`` it), and where each item lives.
+    Items whose id is reused with a different payload stay inline.
+    """
+    payloads: Dict[str, str] = {}
+    conflicts = set()
+    for item in (*package.asset_images, *package.doc_images, *package.videos):
+        if not item.base64_data:
+            continue
+        if payloads.setdefault(item.id, item.base64_data) != item.base64_data:
+            conflicts.add(item.id)
+    for evidence_id in conflicts:
+        payloads.pop(evidence_id)
+    decoded: Dict[str, bytes] = {}
+    for evidence_id, encoded in payloads.items():
+        try:
+            decoded[evidence_id] = base64.b64decode(encoded.encode("utf-8"))
+        except (binascii.Error, ValueError):
+            continue  # left inline so the worker reports the load failure
+    if not decoded:
+        return package, None, {}
+
+    block = shared_memory.SharedMemory(create=True, size=max(sum(len(data) for data in decoded.values()), 1))
+    segments: Segments = {}
+    offset = 0
+    for evidence_id, data in decoded.items():
+        block.buf[offset : offset + len(data)] = data
+        segments[evidence_id] = (offset, len(data))
+        offset += len(data)
+
+    def strip(items: List[Any]) -> List[Any]:
+        return [item.model_copy(update={"base64_data": None}) if item.id in segments else item for item in items]
+
+    stripped = package.model_copy(
+        update={
+            "asset_images": strip(package.asset_images),
+            "doc_images": strip(package.doc_images),
+            "videos": strip(package.videos),
+        }
+    )
+    return stripped, block, segments
+
+
+class ProcessPoolScorer:
+    """Scores whole cases in a pool of worker processes.
+
+    Workers are started with ``spawn`` so no threads or SQLite handles leak in
+    from the server process, and each builds its own pipeline once in the pool
+    initializer. Decoded evidence travels through ``multiprocessing.shared_memory``;
+    only the stripped package metadata and the result are pickled. The server
+    pipeline's config version is forwarded with every case, and the
+    metrics each worker records come back with the result and are merged
+    into the server's registry.
+    """
+
+    def __init__(self, pipeline, max_workers: int = 0):
+        self.pipeline = pipeline
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def start(self) -> List[int]:
+        """Spawn every worker up front so model loading happens at startup."""
+        futures = [self.executor.submit(_ping) for _ in range(self.max_workers)]
+        wait(futures)
+        return sorted({future.result() for future in futures})
+
+    def submit(self, package: EvidencePackage, previous: Optional[str] = None) -> Future:
+        stripped, block, segments = pack_package(package)
+        config_version = self.pipeline.config.version
+        try:
+            inner = self.executor.submit(
+                _score_in_worker, stripped, block.name if block else None, segments, config_version, previous
+            )
+        except Exception:
+            _release(block)
+            raise
+        future: Future = Future()
+
+        def finish(done: Future) -> None:
+            _release(block)
+            try:
+                response, delta = done.result()
+            except BaseException as exc:
+                future.set_exception(exc)
+                return
+            REGISTRY.merge(delta)
+            future.set_result(response)
+
+        inner.add_done_callback(finish)
+        return future
+
+    def score_case(self, package: EvidencePackage, previous: Optional[str] = None) -> ScoreResponse:
+        return self.submit(package, previous).result()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _release(block: Optional[shared_memory.SharedMemory]) -> None:
+    if block is None:
+        return
+    block.close()
+    block.unlink()
+
+
+__all__ = ["ProcessPoolScorer", "pack_package"]
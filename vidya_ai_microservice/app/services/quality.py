@@ -3,34 +3,59 @@
 from __future__ import annotations
 
 from statistics import mean
-from typing import List
+from typing import List, Optional, Tuple
 
 import numpy as np
 
-try:
-    import cv2  # type: ignore
-except Exception:  # pragma: no cover - OpenCV may be unavailable in CI
-    cv2 = None
-
 from ..config import QualityConfig
 from ..schemas import EvidenceImage, ImageQualityResult
+from ..utils.lazy_import import optional_module
+from ..utils.media_context import CaseMediaContext, LoadedMedia
 from ..utils.media_loader import MediaLoader, MediaLoaderError
+from ..utils.metrics import ERRORS, FALLBACKS, ITEM_SECONDS
+from ..utils.result_cache import ResultCache, config_fingerprint
+
+cv2 = optional_module("cv2", label="opencv")  # OpenCV may be unavailable in CI
+
+
+def luma_statistics(gray: np.ndarray) -> Tuple[float, float, float]:
+    """Laplacian variance, mean and standard deviation of an 8-bit luma plane.
+
+    The Laplacian of uint8 input is bounded by +-1020, so a 16-bit response is
+    exact; ``meanStdDev`` then yields each pair of moments in a single pass.
+    """
+    _, lap_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+    mean_value, std_value = cv2.meanStdDev(gray)
+    return float(lap_std[0, 0]) ** 2, float(mean_value[0, 0]), float(std_value[0, 0])
 
 
 class ImageQualityAnalyzer:
-    """Evaluates blur, lighting, and resolution for evidence images."""
+    """Evaluates blur, lighting, and resolution for evidence images.
+
+    Metrics come from the luma plane decoded directly from the payload, so the
+    full-resolution BGR frame is never needed for quality checks.
+    """
 
-    def __init__(self, loader: MediaLoader, config: QualityConfig) -> None:
+    def __init__(self, loader: MediaLoader, config: QualityConfig, cache: Optional[ResultCache] = None) -> None:
         self.loader = loader
         self.config = config
-
-    def analyze_batch(self, images: List[EvidenceImage]) -> List[ImageQualityResult]:
+        self.cache = cache
+
+    def analyze_batch(
+        self,
+        images: List[EvidenceImage],
+        media: Optional[CaseMediaContext] = None,
+        config: Optional[QualityConfig] = None,
+    ) -> List[ImageQualityResult]:
+        media = media or CaseMediaContext(self.loader)
+        config = config or self.config
         results: List[ImageQualityResult] = []
         for image in images:
             try:
-                payload = self.loader.load_image_bytes(image)
-                results.append(self._analyze_single(image, payload))
+                with ITEM_SECONDS.time(layer="quality"):
+                    results.append(self._analyze_cached(image, media.get(image), config))
             except MediaLoaderError as exc:
+                ERRORS.inc(stage="quality", kind="media")
                 results.append(
                     ImageQualityResult(
                         image_id=image.id,
@@ -44,9 +69,21 @@ class ImageQualityAnalyzer:
                 )
         return results
 
-    def _analyze_single(self, evidence: EvidenceImage, payload: bytes) -> ImageQualityResult:
+    def _analyze_cached(self, evidence: EvidenceImage, media: LoadedMedia, config: QualityConfig) -> ImageQualityResult:
+        if self.cache is None or not cv2:
+            return self._analyze_single(evidence, media, config)
+        config_key = config_fingerprint(config)
+        cached = self.cache.get("quality", media.digest, config_key)
+        if cached is not None:
+            return ImageQualityResult(image_id=evidence.id, **cached)
+        result = self._analyze_single(evidence, media, config)
+        self.cache.put("quality", media.digest, config_key, result.model_dump(exclude={"image_id"}))
+        return result
+
+    def _analyze_single(self, evidence: EvidenceImage, media: LoadedMedia, config: QualityConfig) -> ImageQualityResult:
         if not cv2:
             # Basic fallback when OpenCV is missing
+            FALLBACKS.inc(component="quality", reason="opencv_missing")
             return ImageQualityResult(
                 image_id=evidence.id,
                 quality_score=0.5,
@@ -59,30 +96,23 @@ class ImageQualityAnalyzer:
                 reason_if_fail="OpenCV not installed; defaulting to neutral score",
             )
 
-        array = np.frombuffer(payload, dtype=np.uint8)
-        frame = cv2.imdecode(array, cv2.IMREAD_COLOR)
-        if frame is None:
-            raise MediaLoaderError(f"Failed to decode image {evidence.id}")
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blur_variance = float(cv2.Laplacian(gray, cv2.CV_64F).var())
-        brightness = float(np.mean(gray))
-        contrast_value = float(np.std(gray))
+        gray = media.luma
+        blur_variance, brightness, contrast_value = luma_statistics(gray)
         height, width = gray.shape
-        resolution_ok = width >= self.config.min_width and height >= self.config.min_height
+        resolution_ok = width >= config.min_width and height >= config.min_height
 
         flags: List[str] = []
 
         blur_score = 1.0
-        if blur_variance < self.config.blur_variance_threshold:
-            blur_score = max(0.0, blur_variance / self.config.blur_variance_threshold)
+        if blur_variance < config.blur_variance_threshold:
+            blur_score = max(0.0, blur_variance / config.blur_variance_threshold)
             flags.append("blurry")
 
-        brightness_score = self._normalize_brightness(brightness, flags)
+        brightness_score = self._normalize_brightness(brightness, flags, config)
 
         contrast_score = 1.0
-        if contrast_value < self.config.contrast_threshold:
-            contrast_score = max(0.0, contrast_value / self.config.contrast_threshold)
+        if contrast_value < config.contrast_threshold:
+            contrast_score = max(0.0, contrast_value / config.contrast_threshold)
             flags.append("low_contrast")
 
         resolution_score = 1.0 if resolution_ok else 0.0
@@ -90,7 +120,7 @@ class ImageQualityAnalyzer:
             flags.append("low_resolution")
 
         quality_score = mean([blur_score, brightness_score, contrast_score, resolution_score])
-        officer_flag = quality_score < self.config.officer_review_quality_threshold
+        officer_flag = quality_score < config.officer_review_quality_threshold
         reason = ", ".join(flags) if flags else None
 
         return ImageQualityResult(
@@ -105,9 +135,9 @@ class ImageQualityAnalyzer:
             reason_if_fail=reason,
         )
 
-    def _normalize_brightness(self, brightness: float, flags: List[str]) -> float:
-        low = self.config.brightness_dark_threshold
-        high = self.config.brightness_bright_threshold
+    def _normalize_brightness(self, brightness: float, flags: List[str], config: QualityConfig) -> float:
+        low = config.brightness_dark_threshold
+        high = config.brightness_bright_threshold
         if brightness <= low:
             flags.append("too_dark")
             return max(0.0, brightness / max(low, 1.0))
@@ -117,4 +147,4 @@ class ImageQualityAnalyzer:
         return 1.0
 
 
-__all__ = ["ImageQualityAnalyzer"]
+__all__ = ["ImageQualityAnalyzer", "luma_statistics"]
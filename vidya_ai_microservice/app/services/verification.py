@@ -1,19 +1,40 @@
-"""Mock Verification Services for Jury Defense (Simulating Ext. APIs)."""
+"""GST and core-banking verification against the verification registry or gateway."""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Optional, Union
+
+from .verification_gateway import GatewayUnavailable, VerificationGateway
+from .verification_registry import VerificationRegistry
+
+# Valid State Codes (2025 List subset)
+STATE_CODES = {
+    "36": "Telangana",
+    "37": "Andhra Pradesh",
+    "29": "Karnataka",
+    "27": "Maharashtra",
+    "33": "Tamil Nadu",
+    "07": "Delhi",
+    "09": "Uttar Pradesh",
+    "19": "West Bengal",
+    "32": "Kerala",
+    "08": "Rajasthan",
+    "24": "Gujarat",
+    "03": "Punjab",
+    "06": "Haryana",
+}
 
-from typing import Dict, Optional
-from app.services.mock_data import STATE_CODES, VALID_GST_INVOICES, SANCTIONED_LOANS
 
 class VerificationService:
     """
-    Simulates Government GST and Core Banking connections.
-    In a real production system, these would be REST/gRPC calls to external gateways.
-    For the Hackathon, we check against a local 'Source of Truth'.
+    Checks invoices against GSTN records and applicants against CBS sanctions.
+    Records come from a :class:`VerificationRegistry` (nightly extracts in an
+    indexed on-disk file) or, when the live APIs are configured, a
+    :class:`VerificationGateway`. An unreachable gateway fails the check with
+    ``gateway_error`` set instead of raising.
     """
 
-    # --- MOCK DATABASES ---
-    
-    import re
-
     # Regex for India GSTIN (15 chars)
     # 2 digits + 5 letters + 4 digits + 1 letter + 1 char + Z + 1 char
     GST_REGEX = re.compile(r"^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$")
@@ -21,42 +42,48 @@ class VerificationService:
     # Valid State Codes (2025 List subset)
     STATE_CODES = STATE_CODES
 
-    # 1. GST Portal Mock (Valid Invoices)
-    # Updated with Valid GSTINs
-    VALID_GST_INVOICES = VALID_GST_INVOICES
+    def __init__(self, registry: Union[VerificationRegistry, VerificationGateway]):
+        self.registry = registry
+
+    @property
+    def answers_version(self) -> str:
+        """Changes whenever a stored verification result must be looked up again (feeds the reuse key)."""
+        version = getattr(self.registry, "answers_version", None)
+        return str(self.registry.version if version is None else version)
 
-    # 2. Bank Core System Mock (Sanctioned Loans)
-    # Maps Applicant ID -> Asset Type they are allowed to buy
-    SANCTIONED_LOANS = SANCTIONED_LOANS
+    def prefetch(self, invoice_number: Optional[str], applicant_id: Optional[str]) -> None:
+        """Start the GSTN and CBS lookups early so they overlap the rest of the case."""
+        prefetch = getattr(self.registry, "prefetch", None)
+        if prefetch is not None:
+            prefetch(invoice_number.strip().upper() if invoice_number else None, applicant_id)
 
     @classmethod
     def validate_gstin_structure(cls, gstin: str) -> Dict[str, object]:
         """Checks Regex, Length, and State Code."""
         if not gstin or len(gstin) != 15:
             return {"valid": False, "error": "Invalid Length (Must be 15 chars)"}
-        
+
         # 1. Regex Check (Structure)
         if not cls.GST_REGEX.match(gstin):
             return {"valid": False, "error": "Invalid Format (Regex mismatch)"}
-            
+
         # 2. State Code Check
         state_code = gstin[:2]
         if state_code not in cls.STATE_CODES:
             return {"valid": False, "error": f"Invalid State Code '{state_code}'"}
-            
+
         return {"valid": True, "state": cls.STATE_CODES[state_code]}
 
-    @classmethod
-    def verify_gst_invoice(cls, invoice_number: Optional[str], declared_gstin: Optional[str] = None) -> Dict[str, object]:
+    def verify_gst_invoice(self, invoice_number: Optional[str], declared_gstin: Optional[str] = None) -> Dict[str, object]:
         """
-        Simulates calling GSTN API.
-        Now validates the GSTIN structure too.
+        Looks the invoice up in the GSTN extract.
+        Validates the GSTIN structure too.
         """
         validation = {"gstin_valid": False, "structure_error": None}
-        
+
         # If a GSTIN is provided, validate it first
         if declared_gstin:
-            struct_check = cls.validate_gstin_structure(declared_gstin)
+            struct_check = self.validate_gstin_structure(declared_gstin)
             if not struct_check["valid"]:
                 return {
                     "verified": False,
@@ -67,18 +94,21 @@ class VerificationService:
 
         if not invoice_number:
             return {"verified": False, "reason": "No Invoice Number extracted"}
-        
+
         inv_key = invoice_number.strip().upper()
-        
-        if inv_key in cls.VALID_GST_INVOICES:
-            record = cls.VALID_GST_INVOICES[inv_key]
+        try:
+            record = self.registry.gst_invoice(inv_key)
+        except GatewayUnavailable as exc:
+            return {"verified": False, "reason": f"GSTN gateway unavailable: {exc}", "gateway_error": True}
+
+        if record is not None:
             # If validated GSTIN provided, check if it matches the record
             if declared_gstin and declared_gstin != record["gstin"]:
-                 return {
-                    "verified": False, 
+                return {
+                    "verified": False,
                     "reason": f"Invoice found but GSTIN mismatch! Expected {record['gstin']}",
                     "registered_data": record
-                 }
+                }
 
             return {
                 "verified": True,
@@ -86,25 +116,27 @@ class VerificationService:
                 "gstin_validation": validation,
                 "registered_data": record
             }
-        
+
         return {
             "verified": False,
             "reason": f"Invoice {inv_key} NOT found in GST Government DB"
         }
 
-    @classmethod
-    def verify_bank_sanction(cls, applicant_id: str, declared_asset: str) -> Dict[str, object]:
+    def verify_bank_sanction(self, applicant_id: str, declared_asset: str) -> Dict[str, object]:
         """
-        Simulates calling Bank Core Banking System (CBS).
+        Looks the applicant up in the Core Banking System (CBS) extract.
         Check if this applicant is actually approved for this asset.
         """
-        if applicant_id not in cls.SANCTIONED_LOANS:
+        try:
+            loan_record = self.registry.sanction(applicant_id)
+        except GatewayUnavailable as exc:
+            return {"match": False, "reason": f"CBS gateway unavailable: {exc}", "gateway_error": True}
+        if loan_record is None:
             return {
                 "match": False,
                 "reason": "Applicant has no active loan sanctions"
             }
-        
-        loan_record = cls.SANCTIONED_LOANS[applicant_id]
+
         expected_asset = loan_record["allowed_asset"].lower()
         actual_asset = (declared_asset or "").lower()
 
@@ -115,8 +147,8 @@ class VerificationService:
                 "reason": "Matches Sanction Advice",
                 "sanction_details": loan_record
             }
-        
+
         return {
             "match": False,
             "reason": f"Sanction Deviation: Approved for '{expected_asset}', but bought '{actual_asset}'"
-        }
\ No newline at end of file
+        }
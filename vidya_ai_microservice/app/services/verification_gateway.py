@@ -0,0 +1,264 @@
+"""Async client for the external GSTN and CBS verification gateways."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from ..utils.lazy_import import optional_module
+from ..utils.metrics import CACHE_REQUESTS, CALL_SECONDS, ERRORS, FALLBACKS
+
+httpx = optional_module("httpx")
+
+GST = "gst"
+CBS = "cbs"
+# endpoint -> path template under its base URL
+PATHS = {GST: "/invoices/{key}", CBS: "/sanctions/{key}"}
+
+
+class GatewayUnavailable(Exception):
+    """The gateway gave no usable answer (timeout, connection error, 5xx, a malformed body or an open circuit)."""
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive failures.
+
+    Once open, calls are refused until ``reset_seconds`` have passed; then a
+    single trial call is let through (half-open) and its outcome closes or
+    re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._clock() - self._opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_running = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+
+class _Endpoint:
+    def __init__(self, name: str, base_url: str, max_concurrency: int, breaker: CircuitBreaker):
+        self.name = name
+        self.template = base_url.rstrip("/") + PATHS[name]
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker
+        self.slots: Optional[asyncio.Semaphore] = None  # created on the gateway loop
+
+    def url(self, key: str) -> str:
+        return self.template.format(key=quote(key, safe=""))
+
+
+class VerificationGateway:
+    """GSTN invoice and CBS sanction lookups over HTTP, off the scoring threads.
+
+    Requests run on a private asyncio loop with one pooled ``httpx`` client.
+    Each endpoint has its own concurrency limit, timeout and
+    :class:`CircuitBreaker`. Answers, including "not found", are cached for
+    ``cache_ttl_seconds`` per invoice number or applicant id, and concurrent
+    lookups of the same key share one request. :meth:`prefetch` starts lookups
+    without waiting, so a case can fire them before OCR and detection and
+    collect the answers later. Exposes the same ``gst_invoice``/``sanction``
+    interface as :class:`VerificationRegistry`; an endpoint without a URL is
+    answered by ``fallback`` instead.
+    """
+
+    def __init__(
+        self,
+        gst_url: Optional[str] = None,
+        cbs_url: Optional[str] = None,
+        fallback: Optional[Any] = None,
+        timeout_seconds: float = 2.0,
+        max_concurrency: int = 16,
+        cache_ttl_seconds: float = 300.0,
+        cache_entries: int = 65536,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+    ):
+        if not httpx:
+            raise ImportError("httpx is required for the verification gateway")
+        self.fallback = fallback
+        self.timeout_seconds = timeout_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_entries = cache_entries
+        self.endpoints: Dict[str, _Endpoint] = {
+            name: _Endpoint(name, url, max_concurrency, CircuitBreaker(failure_threshold, reset_seconds))
+            for name, url in ((GST, gst_url), (CBS, cbs_url))
+            if url
+        }
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="vidya-verification-gateway", daemon=True)
+        self._thread.start()
+        self._client = asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+
+    @property
+    def version(self) -> str:
+        """Label for what answered lookups."""
+        local = getattr(self.fallback, "version", None)
+        return "gateway" if local is None or len(self.endpoints) == 2 else f"gateway+{local}"
+
+    @property
+    def answers_version(self) -> str:
+        """``version`` plus the current cache-TTL window.
+
+        Stored verification results are reused for no longer than a cached
+        answer would be (and never when caching is off).
+        """
+        if self.cache_ttl_seconds <= 0:
+            return f"{self.version}@{time.time_ns()}"
+        return f"{self.version}@{int(time.time() // self.cache_ttl_seconds)}"
+
+    def gst_invoice(self, invoice_number: str) -> Optional[Dict[str, Any]]:
+        return self._lookup(GST, invoice_number)
+
+    def sanction(self, applicant_id: str) -> Optional[Dict[str, Any]]:
+        return self._lookup(CBS, applicant_id)
+
+    def prefetch(self, invoice_number: Optional[str], applicant_id: Optional[str]) -> None:
+        """Start both lookups now; a later ``gst_invoice``/``sanction`` call picks up the answer."""
+        for name, key in ((GST, invoice_number), (CBS, applicant_id)):
+            if key and name in self.endpoints and self._cached(name, key) is _MISS:
+                future = self.submit(name, key)
+                future.add_done_callback(_consume_exception)
+
+    def submit(self, name: str, key: str) -> "concurrent.futures.Future[Optional[Dict[str, Any]]]":
+        """Schedule a lookup on the gateway loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(self.fetch(name, key), self._loop)
+
+    async def fetch(self, name: str, key: str) -> Optional[Dict[str, Any]]:
+        cached = self._cached(name, key)
+        if cached is not _MISS:
+            return cached
+        task = self._inflight.get((name, key))
+        if task is None:
+            task = self._loop.create_task(self._request(name, key))
+            self._inflight[(name, key)] = task
+            task.add_done_callback(lambda _: self._inflight.pop((name, key), None))
+        return await asyncio.shield(task)
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def _lookup(self, name: str, key: str) -> Optional[Dict[str, Any]]:
+        if name not in self.endpoints:
+            if self.fallback is None:
+                return None
+            return self.fallback.gst_invoice(key) if name == GST else self.fallback.sanction(key)
+        cached = self._cached(name, key)
+        if cached is not _MISS:
+            return cached
+        try:
+            # The httpx timeout bounds the request; the margin covers waiting for a slot.
+            return self.submit(name, key).result(timeout=self.timeout_seconds * 2 + 1)
+        except concurrent.futures.TimeoutError as exc:
+            raise GatewayUnavailable(f"{name} gateway timed out") from exc
+
+    async def _open(self) -> Any:
+        for endpoint in self.endpoints.values():
+            endpoint.slots = asyncio.Semaphore(endpoint.max_concurrency)
+        pool = sum(endpoint.max_concurrency for endpoint in self.endpoints.values()) or 1
+        return httpx.AsyncClient(
+            timeout=self.timeout_seconds,
+            limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+        )
+
+    async def _request(self, name: str, key: str) -> Optional[Dict[str, Any]]:
+        endpoint = self.endpoints[name]
+        if not endpoint.breaker.allow():
+            FALLBACKS.inc(component="verification", reason=f"{name}_circuit_open")
+            raise GatewayUnavailable(f"{name} gateway circuit open")
+        try:
+            value = await self._get(endpoint, key)
+        except BaseException:
+            # Every failed exit, including cancellation, settles the breaker
+            # so a half-open trial never stays marked as running.
+            endpoint.breaker.record_failure()
+            ERRORS.inc(stage="verification", kind=f"{name}_gateway")
+            raise
+        endpoint.breaker.record_success()
+        self._remember(name, key, value)
+        return value
+
+    async def _get(self, endpoint: _Endpoint, key: str) -> Optional[Dict[str, Any]]:
+        name = endpoint.name
+        async with endpoint.slots:
+            try:
+                with CALL_SECONDS.time(backend=f"{name}_gateway"):
+                    response = await self._client.get(endpoint.url(key))
+            except httpx.HTTPError as exc:
+                raise GatewayUnavailable(f"{name} gateway: {type(exc).__name__}") from exc
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise GatewayUnavailable(f"{name} gateway: HTTP {response.status_code}")
+        try:
+            value = response.json()
+        except ValueError as exc:  # e.g. a proxy's HTML error page served as 200
+            raise GatewayUnavailable(f"{name} gateway: response is not JSON") from exc
+        if not isinstance(value, dict):
+            raise GatewayUnavailable(f"{name} gateway: expected a JSON object, got {type(value).__name__}")
+        return value
+
+    def _cached(self, name: str, key: str) -> Any:
+        with self._cache_lock:
+            entry = self._cache.get((name, key))
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end((name, key))
+                CACHE_REQUESTS.inc(layer=f"gateway.{name}", result="hit")
+                return entry[1]
+        CACHE_REQUESTS.inc(layer=f"gateway.{name}", result="miss")
+        return _MISS
+
+    def _remember(self, name: str, key: str, value: Optional[Dict[str, Any]]) -> None:
+        if self.cache_ttl_seconds <= 0 or self.cache_entries <= 0:
+            return
+        with self._cache_lock:
+            self._cache[(name, key)] = (time.monotonic() + self.cache_ttl_seconds, value)
+            self._cache.move_to_end((name, key))
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+
+_MISS = object()
+
+
+def _consume_exception(future: concurrent.futures.Future) -> None:
+    future.exception()  # a failed prefetch is retried (or reported) by the real lookup
+
+
+__all__ = ["CircuitBreaker", "GatewayUnavailable", "VerificationGateway"]
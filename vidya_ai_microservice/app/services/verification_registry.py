@@ -0,0 +1,271 @@
+"""GSTN invoice and CBS sanction lookups from an on-disk SQLite registry.
+
+Nightly extracts are bulk-imported (``scripts/import_verification_registry.py``)
+into a fresh file that atomically replaces the live one; running services
+pick it up on their next poll.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from ..utils.metrics import CACHE_REQUESTS
+
+GST_TABLE = "gst_invoices"
+SANCTION_TABLE = "sanctions"
+# table -> (key column, value columns); values come back as a dict in this order
+TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    GST_TABLE: ("invoice_number", ("vendor", "amount", "date", "gstin")),
+    SANCTION_TABLE: ("applicant_id", ("allowed_asset", "max_amount")),
+}
+
+_SCHEMA = """
+CREATE TABLE gst_invoices (
+    invoice_number TEXT PRIMARY KEY,
+    vendor TEXT,
+    amount REAL,
+    date TEXT,
+    gstin TEXT
+) WITHOUT ROWID;
+CREATE TABLE sanctions (
+    applicant_id TEXT PRIMARY KEY,
+    allowed_asset TEXT NOT NULL,
+    max_amount REAL
+) WITHOUT ROWID;
+CREATE TABLE registry_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+"""
+
+_MISSING = object()
+
+# (inode, mtime_ns, size) of the registry file
+Signature = Tuple[int, int, int]
+
+
+class RegistrySnapshot:
+    """One published registry file, read-only, with a bounded hot-key LRU.
+
+    The file is opened once, ``immutable`` (imports never modify a published
+    file; they replace it), so the snapshot keeps reading the file it was
+    created from even after a newer one is renamed over the path. A retired
+    snapshot's connection closes when the last request holding it lets go.
+    """
+
+    def __init__(self, path: Path, signature: Signature, cache_entries: int = 65536):
+        self.path = path
+        self.signature = signature
+        self.cache_entries = cache_entries
+        self._conn = sqlite3.connect(f"file:{quote(str(path))}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Optional[Dict[str, Any]]]" = OrderedDict()
+        meta = dict(self._conn.execute("SELECT key, value FROM registry_meta").fetchall())
+        self.version = meta.get("version", "unversioned")
+        self.counts = {table: int(meta.get(f"{table}_rows", 0)) for table in TABLES}
+
+    def lookup(self, table: str, key: str) -> Optional[Dict[str, Any]]:
+        """Row for ``key`` as a dict of the table's value columns, or ``None``."""
+        cache_key = (table, key)
+        with self._lock:
+            value = self._cache.get(cache_key, _MISSING)
+            if value is not _MISSING:
+                self._cache.move_to_end(cache_key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.inc(layer=f"verification.{table}", result="hit")
+            return value
+        CACHE_REQUESTS.inc(layer=f"verification.{table}", result="miss")
+        key_column, columns = TABLES[table]
+        query = f"SELECT {', '.join(columns)} FROM {table} WHERE {key_column} = ?"
+        with self._lock:  # point lookups are microseconds; one connection is enough
+            row = self._conn.execute(query, (key,)).fetchone()
+            value = dict(zip(columns, row)) if row is not None else None
+            if self.cache_entries > 0:
+                self._cache[cache_key] = value
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return value
+
+
+class VerificationRegistry:
+    """Serves the current :class:`RegistrySnapshot` of the registry at ``path``.
+
+    :meth:`refresh` opens a changed file off to the side and publishes it with
+    a single attribute assignment, so a lookup never mixes two imports. A file
+    that cannot be opened leaves the current snapshot serving and is retried
+    on the next poll. With ``seed_demo`` a missing registry is built from the
+    sample records in ``mock_data.py``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        cache_entries: int = 65536,
+        poll_seconds: float = 0.0,
+        seed_demo: bool = False,
+    ):
+        self.path = Path(path)
+        self.cache_entries = cache_entries
+        self.poll_seconds = poll_seconds
+        self.snapshot: Optional[RegistrySnapshot] = None
+        self.load_error: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if seed_demo and not self.path.exists():
+            import_registry(self.path, *demo_rows(), version="demo")
+        self.refresh()
+
+    @property
+    def version(self) -> Optional[str]:
+        snapshot = self.snapshot
+        return snapshot.version if snapshot else None
+
+    def gst_invoice(self, invoice_number: str) -> Optional[Dict[str, Any]]:
+        snapshot = self.snapshot
+        return snapshot.lookup(GST_TABLE, invoice_number) if snapshot else None
+
+    def sanction(self, applicant_id: str) -> Optional[Dict[str, Any]]:
+        snapshot = self.snapshot
+        return snapshot.lookup(SANCTION_TABLE, applicant_id) if snapshot else None
+
+    def refresh(self) -> bool:
+        """Reopen the registry if the file was replaced; returns whether a new snapshot was published."""
+        with self._refresh_lock:
+            try:
+                stat = self.path.stat()
+            except OSError:
+                return False
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if self.snapshot is not None and self.snapshot.signature == signature:
+                return False
+            try:
+                snapshot = RegistrySnapshot(self.path, signature, self.cache_entries)
+            except sqlite3.Error as exc:
+                self.load_error = str(exc)
+                return False
+            self.load_error = None
+            self.snapshot = snapshot
+            return True
+
+    def start(self) -> None:
+        """Poll for a replaced registry file every ``poll_seconds`` in a daemon thread."""
+        if self.poll_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._poll, name="vidya-verification-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception:  # pragma: no cover - keep polling after unexpected errors
+                continue
+
+
+def import_registry(
+    path: Path,
+    gst_rows: Optional[Iterable[Mapping[str, Any]]] = None,
+    sanction_rows: Optional[Iterable[Mapping[str, Any]]] = None,
+    version: Optional[str] = None,
+) -> Dict[str, int]:
+    """Build a new registry file and atomically swap it in at ``path``.
+
+    Rows stream straight into SQLite, so extracts of any size import in
+    constant memory. A table whose rows are ``None`` is copied from the
+    current file. Returns the row count of each table.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    staging.unlink(missing_ok=True)
+    conn = sqlite3.connect(str(staging))
+    try:
+        # The staging file is discarded on failure, so it needs no journal.
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(_SCHEMA)
+        counts: Dict[str, int] = {}
+        for table, rows in ((GST_TABLE, gst_rows), (SANCTION_TABLE, sanction_rows)):
+            key_column, columns = TABLES[table]
+            names = (key_column, *columns)
+            if rows is None:
+                counts[table] = _copy_table(conn, path, table, names)
+                continue
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                _normalized(table, rows),
+            )
+            counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        meta = {"version": version or time.strftime("%Y%m%dT%H%M%S"), "imported_at": str(time.time())}
+        meta.update({f"{table}_rows": str(count) for table, count in counts.items()})
+        conn.executemany("INSERT INTO registry_meta (key, value) VALUES (?, ?)", meta.items())
+        conn.commit()
+    except BaseException:
+        conn.close()
+        staging.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(staging, path)
+    return counts
+
+
+def read_extract(path: Path) -> Iterator[Dict[str, Any]]:
+    """Rows of a CSV (with header) or JSON-lines extract."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
+
+
+def demo_rows() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """GST and sanction rows from the bundled sample data."""
+    from .mock_data import SANCTIONED_LOANS, VALID_GST_INVOICES
+
+    gst = [{"invoice_number": key, **record} for key, record in VALID_GST_INVOICES.items()]
+    sanctions = [{"applicant_id": key, **record} for key, record in SANCTIONED_LOANS.items()]
+    return gst, sanctions
+
+
+def _normalized(table: str, rows: Iterable[Mapping[str, Any]]) -> Iterator[Tuple[Any, ...]]:
+    key_column, columns = TABLES[table]
+    for row in rows:
+        key = str(row[key_column]).strip()
+        if table == GST_TABLE:
+            key = key.upper()  # lookups use the upper-cased invoice number
+        values = [row.get(column) for column in columns]
+        for idx, column in enumerate(columns):
+            if column in ("amount", "max_amount") and values[idx] not in (None, ""):
+                values[idx] = float(values[idx])
+        yield (key, *values)
+
+
+def _copy_table(conn: sqlite3.Connection, current: Path, table: str, names: Sequence[str]) -> int:
+    if not current.exists():
+        return 0
+    conn.commit()  # ATTACH is not allowed inside a transaction
+    conn.execute("ATTACH DATABASE ? AS current", (f"file:{quote(str(current))}?mode=ro",))
+    try:
+        columns = ", ".join(names)
+        conn.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM current.{table}")
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE current")
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+__all__ = ["RegistrySnapshot", "VerificationRegistry", "demo_rows", "import_registry", "read_extract"]
+
@@ -0,0 +1,112 @@
+"""Pooled Google Vision REST client batching documents into ``images:annotate`` calls."""
+
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..utils.metrics import CALL_SECONDS, ERRORS
+
+# images:annotate accepts at most 16 images per request.
+MAX_IMAGES_PER_REQUEST = 16
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# The REST payload nests symbol confidences deeply; this fixed approximation
+# stands in for them (the OCR low-confidence penalty is calibrated on it).
+DEFAULT_REST_CONFIDENCE = 0.9
+
+
+class VisionRestClient:
+    """Keeps one pooled HTTP session and sends documents in batches.
+
+    ``annotate`` splits its input into chunks of ``batch_size`` images, posts
+    the chunks concurrently (at most ``max_concurrency`` in flight), and
+    retries 429/5xx responses and connection errors with exponential backoff.
+    Images that still fail come back as ``("", 0.0)`` so callers fall through
+    to their own fallback.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://vision.googleapis.com/v1",
+        timeout_seconds: float = 10.0,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        batch_size: int = MAX_IMAGES_PER_REQUEST,
+    ):
+        self.api_key = api_key
+        self.endpoint = f"{base_url.rstrip('/')}/images:annotate"
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.batch_size = max(1, min(batch_size, MAX_IMAGES_PER_REQUEST))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="vision-rest")
+
+    def annotate(self, contents: Sequence[str]) -> List[Tuple[str, float]]:
+        """Return ``(text, confidence)`` for each base64-encoded image, in order."""
+        chunks = [list(contents[start : start + self.batch_size]) for start in range(0, len(contents), self.batch_size)]
+        if len(chunks) == 1:
+            return self._annotate_chunk(chunks[0])
+        results: List[Tuple[str, float]] = []
+        for chunk_result in self._executor.map(self._annotate_chunk, chunks):
+            results.extend(chunk_result)
+        return results
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _annotate_chunk(self, chunk: List[str]) -> List[Tuple[str, float]]:
+        body = {
+            "requests": [
+                {"image": {"content": content}, "features": [{"type": "DOCUMENT_TEXT_DETECTION"}]} for content in chunk
+            ]
+        }
+        with CALL_SECONDS.time(backend="vision_rest"):
+            data = self._post(body)
+        if data is None:
+            ERRORS.inc(stage="ocr", kind="vision_rest")
+            return [("", 0.0)] * len(chunk)
+        responses = data.get("responses", [])
+        return [self._parse_response(responses[idx] if idx < len(responses) else {}) for idx in range(len(chunk))]
+
+    def _post(self, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._slots:
+                    resp = self.session.post(
+                        self.endpoint, params={"key": self.api_key}, json=body, timeout=self.timeout_seconds
+                    )
+                if resp.status_code == 200:
+                    return resp.json()
+                if resp.status_code not in RETRY_STATUSES:
+                    return None
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            except (requests.RequestException, ValueError):
+                return None
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_seconds * (2**attempt) * (0.5 + random.random() / 2))
+        return None
+
+    @staticmethod
+    def _parse_response(response: Dict[str, Any]) -> Tuple[str, float]:
+        annotation = response.get("fullTextAnnotation")
+        if response.get("error") or not annotation:
+            return "", 0.0
+        return annotation.get("text", ""), DEFAULT_REST_CONFIDENCE
+
+
+__all__ = ["MAX_IMAGES_PER_REQUEST", "VisionRestClient"]
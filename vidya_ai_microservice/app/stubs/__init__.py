@@ -0,0 +1,6 @@
+"""Local stand-ins for external services, used by tests and load tests."""
+
+from .verification_stub import VerificationStubServer
+from .vision_stub import VisionStubServer
+
+__all__ = ["VerificationStubServer", "VisionStubServer"]
@@ -0,0 +1,150 @@
+"""Local stand-in for the GSTN invoice and CBS sanction lookup APIs.
+
+Run standalone for load tests:
+    python -m app.stubs.verification_stub --port 9200 --latency-ms 80
+then point the service at it with
+``GST_GATEWAY_URL=http://127.0.0.1:9200/gst/v1`` and
+``CBS_GATEWAY_URL=http://127.0.0.1:9200/cbs/v1``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import unquote
+
+
+class VerificationStubServer:
+    """Threaded HTTP server replaying the sample records in ``mock_data.py``.
+
+    ``GET /gst/v1/invoices/<invoice_number>`` and
+    ``GET /cbs/v1/sanctions/<applicant_id>`` return the record as JSON, or 404
+    when it is unknown. ``fail_first`` makes the first N requests return
+    ``fail_status`` with a JSON error, or with ``fail_body`` as the raw body;
+    ``max_in_flight`` records the most requests served at once.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        fail_first: int = 0,
+        fail_status: int = 503,
+        fail_body: Optional[bytes] = None,
+        invoices: Optional[Mapping[str, Dict[str, Any]]] = None,
+        sanctions: Optional[Mapping[str, Dict[str, Any]]] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.fail_body = fail_body
+        if invoices is None or sanctions is None:
+            # Imported here: ``app.services`` builds the settings from the
+            # environment, which load tests set after importing the stubs.
+            from ..services.mock_data import SANCTIONED_LOANS, VALID_GST_INVOICES
+
+            invoices = VALID_GST_INVOICES if invoices is None else invoices
+            sanctions = SANCTIONED_LOANS if sanctions is None else sanctions
+        self.invoices = dict(invoices)
+        self.sanctions = dict(sanctions)
+        self.request_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def gst_url(self) -> str:
+        return f"{self.base_url}/gst/v1"
+
+    @property
+    def cbs_url(self) -> str:
+        return f"{self.base_url}/cbs/v1"
+
+    def start(self) -> "VerificationStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="verification-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "VerificationStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler(self):
+        stub = self
+        routes = {"/gst/v1/invoices/": stub.invoices, "/cbs/v1/sanctions/": stub.sanctions}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                with stub._lock:
+                    stub.request_count += 1
+                    failing = stub.request_count <= stub.fail_first
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if stub.latency_ms:
+                        time.sleep(stub.latency_ms / 1000.0)
+                    if failing:
+                        self._reply(stub.fail_status, {"error": "stub failure"}, stub.fail_body)
+                        return
+                    path = self.path.split("?")[0]
+                    for prefix, records in routes.items():
+                        if path.startswith(prefix):
+                            record = records.get(unquote(path[len(prefix):]))
+                            if record is not None:
+                                self._reply(200, record)
+                                return
+                            break
+                    self._reply(404, {"error": "not found"})
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _reply(self, status: int, payload: dict, raw: Optional[bytes] = None) -> None:
+                data = json.dumps(payload).encode("utf-8") if raw is None else raw
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json" if raw is None else "text/html")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):  # the client timed out and hung up
+                    return
+
+            def log_message(self, format: str, *args) -> None:  # noqa: A002 - keep test output quiet
+                return
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local GSTN/CBS verification stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server = VerificationStubServer(args.host, args.port, latency_ms=args.latency_ms)
+    print(f"Verification stub listening on {server.gst_url} and {server.cbs_url}")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Local stand-in for the Google Vision ``images:annotate`` REST endpoint.
+
+Run standalone for load tests:
+    python -m app.stubs.vision_stub --port 9100 --latency-ms 150
+then point the service at it with ``VISION_API_URL=http://127.0.0.1:9100/v1``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+DEFAULT_TEXT = "Vendor: Agri Supplies\nInvoice No: INV-2025-001\nDate: 05/01/2025\nTotal: INR 245,000.00\n"
+
+
+class VisionStubServer:
+    """Threaded HTTP server answering ``POST /v1/images:annotate``.
+
+    Every image in a request gets ``text_for(content)`` back as its
+    ``fullTextAnnotation``. ``fail_first`` makes the first N requests return
+    ``fail_status`` so retry paths can be exercised; ``batch_sizes`` records
+    how many images each request carried.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        text_for: Optional[Callable[[str], str]] = None,
+        fail_first: int = 0,
+        fail_status: int = 503,
+    ):
+        self.latency_ms = latency_ms
+        self.text_for = text_for or (lambda _content: DEFAULT_TEXT)
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.batch_sizes: List[int] = []
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "VisionStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="vision-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "VisionStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                if not self.path.split("?")[0].endswith("/images:annotate"):
+                    self._reply(404, {"error": {"message": "not found"}})
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                requests = body.get("requests", [])
+                with stub._lock:
+                    stub.request_count += 1
+                    failing = stub.request_count <= stub.fail_first
+                    if not failing:
+                        stub.batch_sizes.append(len(requests))
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000.0)
+                if failing:
+                    self._reply(stub.fail_status, {"error": {"message": "stub failure"}})
+                    return
+                responses = [
+                    {"fullTextAnnotation": {"text": stub.text_for(item.get("image", {}).get("content", ""))}}
+                    for item in requests
+                ]
+                self._reply(200, {"responses": responses})
+
+            def _reply(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args) -> None:  # noqa: A002 - keep test output quiet
+                return
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Google Vision REST stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server = VisionStubServer(args.host, args.port, latency_ms=args.latency_ms)
+    print(f"Vision stub listening on {server.base_url}")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
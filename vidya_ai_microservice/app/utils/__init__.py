@@ -1,13 +1,29 @@
 """Utility exports for VIDYA AI."""
 
-from .media_loader import MediaLoader, MediaLoaderError
+from .media_loader import MediaBuffer, MediaLoader, MediaLoaderError
+from .media_context import CaseMediaContext, LoadedMedia
 from .state import LocalStateStore
+from .hash_index import HammingIndex, HashRecord
+from .result_cache import ResultCache, config_fingerprint
+from .metrics import REGISTRY, MetricsRegistry
+from .lazy_import import LazyModule, optional_module
 from .geospatial import gps_deviation, haversine_distance_km
 
 __all__ = [
+    "MediaBuffer",
     "MediaLoader",
     "MediaLoaderError",
+    "CaseMediaContext",
+    "LoadedMedia",
     "LocalStateStore",
+    "HammingIndex",
+    "HashRecord",
+    "ResultCache",
+    "config_fingerprint",
+    "MetricsRegistry",
+    "REGISTRY",
+    "LazyModule",
+    "optional_module",
     "gps_deviation",
     "haversine_distance_km",
 ]
@@ -0,0 +1,110 @@
+"""In-memory Hamming-distance index over 64-bit perceptual hashes."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Dict, List, Optional, Tuple
+
+HashKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class HashRecord:
+    """One stored evidence hash and where it came from."""
+
+    applicant_id: str
+    evidence_id: str
+    case_id: str
+    hash_value: int
+
+    @property
+    def key(self) -> HashKey:
+        return (self.applicant_id, self.evidence_id)
+
+
+@dataclass
+class _Node:
+    hash_value: int
+    records: Dict[HashKey, HashRecord] = field(default_factory=dict)
+    children: Dict[int, "_Node"] = field(default_factory=dict)
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    return (hash_a ^ hash_b).bit_count()
+
+
+def parse_hash(hex_value: str) -> Optional[int]:
+    """Parse an ``imagehash`` hex string into an int, or ``None`` if malformed."""
+    try:
+        return int(hex_value, 16) if hex_value else None
+    except ValueError:
+        return None
+
+
+class HammingIndex:
+    """BK-tree answering "every hash within distance N" across all applicants.
+
+    Identical hashes share a node, and the triangle inequality prunes every
+    subtree whose edge distance falls outside ``[d - N, d + N]``, so small-radius
+    lookups touch a small fraction of the portfolio instead of scanning it.
+    Re-recording an ``(applicant_id, evidence_id)`` pair replaces its previous
+    hash, mirroring the state store.
+    """
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[int, _Node] = {}
+        self._records: Dict[HashKey, HashRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: HashRecord) -> None:
+        with self._lock:
+            self._discard(record.key)
+            node = self._nodes.get(record.hash_value)
+            if node is None:
+                node = self._insert_node(record.hash_value)
+            node.records[record.key] = record
+            self._records[record.key] = record
+
+    def query(self, hash_value: int, max_distance: int) -> List[Tuple[int, HashRecord]]:
+        """Return ``(distance, record)`` pairs within ``max_distance``, closest first."""
+        matches: List[Tuple[int, HashRecord]] = []
+        with self._lock:
+            stack = [self._root] if self._root else []
+            while stack:
+                node = stack.pop()
+                distance = hamming_distance(hash_value, node.hash_value)
+                if distance <= max_distance:
+                    matches.extend((distance, record) for record in node.records.values())
+                low, high = distance - max_distance, distance + max_distance
+                stack.extend(child for edge, child in node.children.items() if low <= edge <= high)
+        matches.sort(key=lambda item: item[0])
+        return matches
+
+    def _discard(self, key: HashKey) -> None:
+        previous = self._records.pop(key, None)
+        if previous is not None:
+            # BK-tree nodes stay in place; an emptied node simply matches nothing.
+            self._nodes[previous.hash_value].records.pop(key, None)
+
+    def _insert_node(self, hash_value: int) -> _Node:
+        node = _Node(hash_value)
+        self._nodes[hash_value] = node
+        if self._root is None:
+            self._root = node
+            return node
+        current = self._root
+        while True:
+            distance = hamming_distance(hash_value, current.hash_value)
+            child = current.children.get(distance)
+            if child is None:
+                current.children[distance] = node
+                return node
+            current = child
+
+
+__all__ = ["HammingIndex", "HashRecord", "hamming_distance", "parse_hash"]
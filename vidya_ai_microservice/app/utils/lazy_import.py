@@ -0,0 +1,123 @@
+"""Deferred imports for heavy optional backends (OpenCV, Ultralytics, XGBoost, ...)."""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+_UNSET = object()
+
+
+class LazyModule:
+    """Stand-in for an optional module that is imported on first use.
+
+    Services keep their ``if not cv2:`` / ``cv2.imdecode(...)`` call sites: truth
+    testing, attribute access and calls import the target once, and a missing
+    or broken install behaves like the old ``cv2 = None`` fallback (falsy, and
+    ``ImportError`` on use). ``attribute`` picks a name from the module, for
+    ``from ultralytics import YOLO`` style imports. Availability and import
+    time are recorded so ``/health`` can report them without importing.
+    """
+
+    def __init__(self, name: str, attribute: Optional[str] = None, label: Optional[str] = None):
+        self._name = name
+        self._attribute = attribute
+        self.label = label or name
+        self._value: Any = _UNSET
+        self._lock = threading.Lock()
+        self._installed: Optional[bool] = None
+        self.import_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _UNSET
+
+    def load(self) -> Optional[Any]:
+        """Import the target once; ``None`` when it is missing or fails to import."""
+        value = self._value
+        if value is not _UNSET:
+            return value
+        with self._lock:
+            if self._value is _UNSET:
+                started = time.perf_counter()
+                try:
+                    module = importlib.import_module(self._name)
+                    value = getattr(module, self._attribute) if self._attribute else module
+                except Exception as exc:  # mirrors the old module-level ``except Exception``
+                    value = None
+                    self.error = f"{type(exc).__name__}: {exc}"
+                self.import_seconds = time.perf_counter() - started
+                self._value = value
+            return self._value
+
+    def available(self) -> bool:
+        """Whether the backend can be used, without importing it if it has not been loaded yet."""
+        if self._value is not _UNSET:
+            return self._value is not None
+        if self._installed is None:
+            try:
+                self._installed = importlib.util.find_spec(self._name) is not None
+            except Exception:  # a missing parent package raises instead of returning None
+                self._installed = False
+        return self._installed
+
+    def __bool__(self) -> bool:
+        return self.load() is not None
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith("__"):
+            raise AttributeError(item)
+        return getattr(self._require(), item)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._require()(*args, **kwargs)
+
+    def _require(self) -> Any:
+        value = self.load()
+        if value is None:
+            raise ImportError(f"optional dependency {self.label!r} is unavailable: {self.error}")
+        return value
+
+    def __repr__(self) -> str:
+        state = "unloaded" if not self.loaded else ("missing" if self._value is None else "loaded")
+        return f"<LazyModule {self._name}{'.' + self._attribute if self._attribute else ''} ({state})>"
+
+
+_MODULES: Dict[str, LazyModule] = {}
+_MODULES_LOCK = threading.Lock()
+
+
+def optional_module(name: str, attribute: Optional[str] = None, label: Optional[str] = None) -> LazyModule:
+    """Shared :class:`LazyModule` for ``name`` (one import and one timing per process)."""
+    key = f"{name}:{attribute or ''}"
+    with _MODULES_LOCK:
+        module = _MODULES.get(key)
+        if module is None:
+            module = _MODULES[key] = LazyModule(name, attribute, label)
+        return module
+
+
+def dependency_status() -> Dict[str, bool]:
+    """Availability of every registered backend; never triggers an import."""
+    with _MODULES_LOCK:
+        modules = list(_MODULES.values())
+    return {module.label: module.available() for module in modules}
+
+
+def import_timings() -> Dict[str, float]:
+    """Seconds spent importing each backend that has been loaded so far."""
+    with _MODULES_LOCK:
+        modules = list(_MODULES.values())
+    return {module.label: module.import_seconds for module in modules if module.import_seconds is not None}
+
+
+def warm_up(modules: Iterable[LazyModule]) -> Dict[str, bool]:
+    """Import ``modules`` now (e.g. on a background thread) so the first request does not pay for it."""
+    return {module.label: module.load() is not None for module in modules}
+
+
+__all__ = ["LazyModule", "dependency_status", "import_timings", "optional_module", "warm_up"]
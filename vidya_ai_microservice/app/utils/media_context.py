@@ -0,0 +1,191 @@
+"""Per-case media cache so every layer shares one decode of each evidence item."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+from io import BytesIO
+from threading import Lock
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+from ..schemas import EvidenceDocument, EvidenceImage, EvidenceVideo
+from .lazy_import import optional_module
+from .media_loader import MediaBuffer, MediaLoader, MediaLoaderError
+
+cv2 = optional_module("cv2", label="opencv")  # OpenCV may be unavailable in CI
+
+Evidence = EvidenceImage | EvidenceDocument | EvidenceVideo
+
+
+class LoadedMedia:
+    """Raw payload of one evidence item plus lazily decoded pixel views."""
+
+    def __init__(self, evidence_id: str, payload: MediaBuffer, source_base64: Optional[str] = None):
+        self.evidence_id = evidence_id
+        self.payload = payload
+        self._base64 = source_base64
+        self._lock = Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_error: Optional[MediaLoaderError] = None
+        self._luma: Optional[np.ndarray] = None
+        self._luma_error: Optional[MediaLoaderError] = None
+        self._image: Optional[Image.Image] = None
+        self._digest: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the raw payload, used to address cached layer results."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.payload).hexdigest()
+        return self._digest
+
+    @property
+    def base64(self) -> str:
+        """Base64 form of the payload, reusing the string the caller uploaded."""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.payload).decode("ascii")
+        return self._base64
+
+    @property
+    def frame(self) -> Optional[np.ndarray]:
+        """BGR pixel array decoded by OpenCV, or ``None`` when OpenCV is missing."""
+        if not cv2:
+            return None
+        with self._lock:
+            if self._frame is None and self._frame_error is None:
+                array = np.frombuffer(self.payload, dtype=np.uint8)
+                frame = cv2.imdecode(array, cv2.IMREAD_COLOR)
+                if frame is None:
+                    self._frame_error = MediaLoaderError(f"Failed to decode image {self.evidence_id}")
+                else:
+                    self._frame = frame
+            if self._frame_error is not None:
+                raise self._frame_error
+            return self._frame
+
+    @property
+    def luma(self) -> Optional[np.ndarray]:
+        """Single-channel array decoded straight from the payload, or ``None`` when OpenCV is missing.
+
+        Decoded on its own rather than converted from :attr:`frame`, so the
+        values do not depend on whether another layer decoded colour first.
+        """
+        if not cv2:
+            return None
+        with self._lock:
+            if self._luma is None and self._luma_error is None:
+                array = np.frombuffer(self.payload, dtype=np.uint8)
+                luma = cv2.imdecode(array, cv2.IMREAD_GRAYSCALE)
+                if luma is None:
+                    self._luma_error = MediaLoaderError(f"Failed to decode image {self.evidence_id}")
+                else:
+                    self._luma = luma
+            if self._luma_error is not None:
+                raise self._luma_error
+            return self._luma
+
+    @property
+    def image(self) -> Image.Image:
+        """PIL decode of the raw payload.
+
+        Deliberately not derived from :attr:`frame`: OpenCV applies EXIF
+        orientation and uses another JPEG decoder, and perceptual hashes must
+        stay comparable with those already stored (and imported from the
+        legacy duplicates file), which were computed from ``Image.open``.
+        """
+        with self._lock:
+            if self._image is None:
+                try:
+                    image = Image.open(BytesIO(self.payload))
+                    image.load()
+                except Exception as exc:
+                    raise MediaLoaderError(f"Failed to decode image {self.evidence_id}") from exc
+                self._image = image
+            return self._image
+
+
+class CaseMediaContext:
+    """Resolves each evidence item through ``MediaLoader`` at most once per case.
+
+    Layers receive the same ``LoadedMedia`` instance for a given item, so base64
+    decoding, downloads, and pixel decoding happen once no matter how many
+    layers inspect the image. Load failures are cached and re-raised as well.
+    ``preloaded`` maps evidence ids to payloads already in memory (e.g. handed
+    over through shared memory by the process pool) so they skip the loader.
+    """
+
+    def __init__(self, loader: MediaLoader, preloaded: Optional[Mapping[str, MediaBuffer]] = None):
+        self.loader = loader
+        self.preloaded = preloaded or {}
+        self._lock = Lock()
+        self._entries: Dict[Hashable, Tuple[Lock, list]] = {}
+        self._fingerprints: Dict[Hashable, str] = {}
+
+    def get(self, evidence: Evidence) -> LoadedMedia:
+        key = self._key(evidence)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = (Lock(), [])
+                self._entries[key] = entry
+        entry_lock, slot = entry
+        with entry_lock:
+            if not slot:
+                try:
+                    slot.append(LoadedMedia(evidence.id, self._load(evidence), evidence.base64_data))
+                except MediaLoaderError as exc:
+                    slot.append(exc)
+        result = slot[0]
+        if isinstance(result, MediaLoaderError):
+            raise result
+        return result
+
+    def fingerprint(self, evidence: Evidence) -> str:
+        """Digest of the item's fields and of the content they stand for.
+
+        Inline items are covered by their fields. Preloaded bytes are folded in
+        directly. ``url`` and ``file_path`` items are loaded (through this
+        context, so the layers reuse the load) and their payload digest is
+        folded in, so changed content behind the same reference is never
+        treated as unchanged.
+        """
+        key = self._key(evidence)
+        cached = self._fingerprints.get(key)
+        if cached is None:
+            digest = hashlib.sha256(evidence.model_dump_json().encode("utf-8"))
+            if self._uses_preloaded(evidence):
+                digest.update(self.preloaded[evidence.id])
+            elif not evidence.base64_data:
+                try:
+                    digest.update(self.get(evidence).digest.encode("ascii"))
+                except MediaLoaderError as exc:
+                    # Never matches a state recorded while the item loaded.
+                    digest.update(f"unloadable:{exc}".encode("utf-8"))
+            cached = self._fingerprints[key] = digest.hexdigest()
+        return cached
+
+    def _uses_preloaded(self, evidence: Evidence) -> bool:
+        return evidence.id in self.preloaded and not (evidence.base64_data or evidence.file_path or evidence.url)
+
+    def _load(self, evidence: Evidence) -> MediaBuffer:
+        if self._uses_preloaded(evidence):
+            return self.preloaded[evidence.id]
+        if isinstance(evidence, EvidenceDocument):
+            return self.loader.load_document_bytes(evidence)
+        if isinstance(evidence, EvidenceVideo):
+            return self.loader.load_video_bytes(evidence)
+        return self.loader.load_image_bytes(evidence)
+
+    @staticmethod
+    def _key(evidence: Evidence) -> Hashable:
+        # Ids are expected to be unique per package, but include the source so a
+        # reused id never hands one layer another item's pixels.
+        url = str(evidence.url) if evidence.url else None
+        return (evidence.id, evidence.base64_data, evidence.file_path, url)
+
+
+__all__ = ["CaseMediaContext", "LoadedMedia"]
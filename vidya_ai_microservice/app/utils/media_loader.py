@@ -3,49 +3,134 @@
 from __future__ import annotations
 
 import base64
+import binascii
+import mmap
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import IO, Iterable, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..schemas import EvidenceDocument, EvidenceImage, EvidenceVideo
 
+# Small payloads come back as ``bytes``; anything over the spool threshold is a
+# read-only ``memoryview`` over an mmap, so large media never sits in the heap.
+MediaBuffer = bytes | memoryview
+
+_CHUNK_SIZE = 256 * 1024
+# Multiple of 4 so every base64 slice decodes on its own.
+_BASE64_CHUNK = 4 * 64 * 1024
+
 
 class MediaLoaderError(RuntimeError):
     """Raised when media cannot be loaded."""
 
 
 class MediaLoader:
-    """Helper to fetch media bytes from URLs, disk, or embedded payloads."""
-
-    def __init__(self, timeout_seconds: int = 10):
+    """Helper to fetch media bytes from URLs, disk, or embedded payloads.
+
+    Downloads are streamed through a pooled session and aborted once they pass
+    ``max_bytes``. Payloads larger than ``spool_threshold`` are spooled to an
+    anonymous temp file and handed out as an mmap-backed ``memoryview``.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: int = 10,
+        max_bytes: int = 100 * 1024 * 1024,
+        spool_threshold: int = 8 * 1024 * 1024,
+        pool_size: int = 10,
+    ):
         self.timeout_seconds = timeout_seconds
-
-    def _load_from_base64(self, encoded: str) -> bytes:
-        return base64.b64decode(encoded.encode("utf-8"))
-
-    def _load_from_file(self, file_path: str) -> bytes:
+        self.max_bytes = max_bytes
+        self.spool_threshold = spool_threshold
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _load_from_base64(self, encoded: str) -> MediaBuffer:
+        estimated = (len(encoded) // 4) * 3
+        if estimated > self.max_bytes:
+            raise MediaLoaderError(f"Embedded payload exceeds {self.max_bytes} bytes")
+        try:
+            if estimated <= self.spool_threshold:
+                return base64.b64decode(encoded.encode("utf-8"))
+            if any(char.isspace() for char in encoded[:_BASE64_CHUNK]):
+                encoded = "".join(encoded.split())
+            chunks = (
+                base64.b64decode(encoded[start : start + _BASE64_CHUNK])
+                for start in range(0, len(encoded), _BASE64_CHUNK)
+            )
+            return self._spool(chunks, already_spooling=True)
+        except (binascii.Error, ValueError) as exc:
+            raise MediaLoaderError("Invalid base64 payload") from exc
+
+    def _load_from_file(self, file_path: str) -> MediaBuffer:
         path = Path(file_path)
         if not path.exists():
             raise MediaLoaderError(f"File not found: {file_path}")
-        return path.read_bytes()
-
-    def _load_from_url(self, url: str) -> bytes:
-        response = requests.get(url, timeout=self.timeout_seconds)
-        if not response.ok:
-            raise MediaLoaderError(f"Failed to download media: {url}")
-        return response.content
-
-    def load_image_bytes(self, evidence: EvidenceImage) -> bytes:
+        size = path.stat().st_size
+        if size > self.max_bytes:
+            raise MediaLoaderError(f"File exceeds {self.max_bytes} bytes: {file_path}")
+        if size <= self.spool_threshold:
+            return path.read_bytes()
+        with path.open("rb") as handle:
+            return memoryview(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _load_from_url(self, url: str) -> MediaBuffer:
+        try:
+            with self.session.get(url, timeout=self.timeout_seconds, stream=True) as response:
+                if not response.ok:
+                    raise MediaLoaderError(f"Failed to download media: {url}")
+                declared = response.headers.get("Content-Length")
+                if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                    raise MediaLoaderError(f"Media exceeds {self.max_bytes} bytes: {url}")
+                spool_now = bool(declared and declared.isdigit() and int(declared) > self.spool_threshold)
+                return self._spool(response.iter_content(_CHUNK_SIZE), already_spooling=spool_now, source=url)
+        except requests.RequestException as exc:
+            raise MediaLoaderError(f"Failed to download media: {url}") from exc
+
+    def _spool(self, chunks: Iterable[bytes], already_spooling: bool = False, source: str = "payload") -> MediaBuffer:
+        buffer = bytearray()
+        spool: Optional[IO[bytes]] = tempfile.TemporaryFile() if already_spooling else None
+        total = 0
+        try:
+            for chunk in chunks:
+                total += len(chunk)
+                if total > self.max_bytes:
+                    raise MediaLoaderError(f"Media exceeds {self.max_bytes} bytes: {source}")
+                if spool is None and total > self.spool_threshold:
+                    spool = tempfile.TemporaryFile()
+                    spool.write(buffer)
+                    buffer = bytearray()
+                if spool is not None:
+                    spool.write(chunk)
+                else:
+                    buffer += chunk
+            if spool is None:
+                return bytes(buffer)
+            if total == 0:
+                return b""
+            spool.flush()
+            # The mapping outlives the file object; the anonymous temp file is
+            # reclaimed once the last view is released.
+            return memoryview(mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ))
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def load_image_bytes(self, evidence: EvidenceImage) -> MediaBuffer:
         return self._resolve_payload(evidence)
 
-    def load_document_bytes(self, evidence: EvidenceDocument) -> bytes:
+    def load_document_bytes(self, evidence: EvidenceDocument) -> MediaBuffer:
         return self._resolve_payload(evidence)
 
-    def load_video_bytes(self, evidence: EvidenceVideo) -> bytes:
+    def load_video_bytes(self, evidence: EvidenceVideo) -> MediaBuffer:
         return self._resolve_payload(evidence)
 
-    def _resolve_payload(self, evidence: EvidenceImage | EvidenceDocument | EvidenceVideo) -> bytes:
+    def _resolve_payload(self, evidence: EvidenceImage | EvidenceDocument | EvidenceVideo) -> MediaBuffer:
         if evidence.base64_data:
             return self._load_from_base64(evidence.base64_data)
         if evidence.file_path:
@@ -55,4 +140,4 @@ class MediaLoader:
         raise MediaLoaderError(f"No media payload available for {evidence.id}")
 
 
-__all__ = ["MediaLoader", "MediaLoaderError"]
+__all__ = ["MediaBuffer", "MediaLoader", "MediaLoaderError"]
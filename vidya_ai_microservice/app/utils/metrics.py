@@ -0,0 +1,223 @@
+"""In-process counters and histograms with Prometheus text exposition."""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; spans cache hits (sub-millisecond) to slow Vision/YOLO calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+# name -> label values -> counter value, or (bucket counts, sum) for histograms
+MetricsDelta = Dict[str, Dict[LabelValues, object]]
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _drain(self) -> Dict[LabelValues, object]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return dict(values)
+
+    def _merge(self, values: Dict[LabelValues, object]) -> None:
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0.0) + amount  # type: ignore[operator]
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        # label values -> ([count per bucket ..., overflow], sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[slot] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+        return sum(entry[0]) if entry else 0
+
+    def _drain(self) -> Dict[LabelValues, object]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return dict(values)
+
+    def _merge(self, values: Dict[LabelValues, object]) -> None:
+        with self._lock:
+            for key, (counts, total) in values.items():  # type: ignore[misc]
+                current, current_total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+                self._values[key] = ([a + b for a, b in zip(current, counts)], current_total + total)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines: List[str] = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels((*self.labelnames, 'le'), (*key, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Owns every metric of the process and renders them for ``/metrics``.
+
+    Worker processes :meth:`drain` what they recorded and hand the delta back
+    with each result; the server :meth:`merge` s it, so ``/metrics`` covers
+    every process without a shared backend.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def drain(self) -> MetricsDelta:
+        """Return everything recorded since the last drain and reset it."""
+        delta = {name: metric._drain() for name, metric in self._metrics.items()}
+        return {name: values for name, values in delta.items() if values}
+
+    def merge(self, delta: MetricsDelta) -> None:
+        for name, values in delta.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric._merge(values)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric._samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+CASE_SECONDS = REGISTRY.histogram("vidya_case_seconds", "End-to-end time to score one case")
+STAGE_SECONDS = REGISTRY.histogram("vidya_stage_seconds", "Time spent in each pipeline stage per case", ("stage",))
+ITEM_SECONDS = REGISTRY.histogram("vidya_item_seconds", "Time spent on one evidence item in a layer", ("layer",))
+CALL_SECONDS = REGISTRY.histogram(
+    "vidya_batched_call_seconds", "Time of one batched backend call (YOLO predict, Vision REST)", ("backend",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "vidya_cache_requests_total", "Result-cache lookups by layer and outcome", ("layer", "result")
+)
+DETECTION_MODES = REGISTRY.counter(
+    "vidya_detection_results_total", "Detection results by how they were produced", ("mode",)
+)
+OCR_STRATEGIES = REGISTRY.counter("vidya_ocr_documents_total", "OCR documents by text source", ("strategy",))
+FALLBACKS = REGISTRY.counter(
+    "vidya_fallbacks_total", "Results produced by a degraded path", ("component", "reason")
+)
+ERRORS = REGISTRY.counter("vidya_errors_total", "Errors by stage and kind", ("stage", "kind"))
+
+
+__all__ = [
+    "CACHE_REQUESTS",
+    "CALL_SECONDS",
+    "CASE_SECONDS",
+    "Counter",
+    "DETECTION_MODES",
+    "ERRORS",
+    "FALLBACKS",
+    "Histogram",
+    "ITEM_SECONDS",
+    "MetricsRegistry",
+    "OCR_STRATEGIES",
+    "REGISTRY",
+    "STAGE_SECONDS",
+]
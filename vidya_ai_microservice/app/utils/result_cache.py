@@ -0,0 +1,128 @@
+"""Content-addressed cache of per-item layer results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from .metrics import CACHE_REQUESTS
+
+
+def config_fingerprint(*parts: BaseModel | str | None) -> str:
+    """Short stable digest of the config objects a cached result depends on."""
+    digest = hashlib.sha256()
+    for part in parts:
+        text = part.model_dump_json() if isinstance(part, BaseModel) else str(part)
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """LRU of JSON-serialisable layer results keyed by media SHA-256 and config.
+
+    Entries live in memory up to ``max_entries``; with ``disk_dir`` set, every
+    entry is also written there (bounded by ``max_disk_entries``) so results
+    survive restarts and are shared between workers on the same host.
+    """
+
+    def __init__(self, max_entries: int = 4096, disk_dir: Optional[Path] = None, max_disk_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._disk_count = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_count = sum(1 for _ in self.disk_dir.glob("*.json"))
+
+    def get(self, layer: str, digest: str, config_key: str = "") -> Optional[Any]:
+        key = self._key(layer, digest, config_key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._count(self.hits, layer)
+                CACHE_REQUESTS.inc(layer=layer, result="hit")
+                return self._entries[key]
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._count(self.misses, layer)
+                CACHE_REQUESTS.inc(layer=layer, result="miss")
+                return None
+            self._count(self.hits, layer)
+            CACHE_REQUESTS.inc(layer=layer, result="hit")
+            self._remember(key, value)
+        return value
+
+    def put(self, layer: str, digest: str, config_key: str, value: Any) -> None:
+        key = self._key(layer, digest, config_key)
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        existed = path.exists()
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(value), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            if not existed:
+                self._disk_count += 1
+            over = self._disk_count > self.max_disk_entries
+        if over:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files = sorted(self.disk_dir.glob("*.json"), key=lambda item: item.stat().st_mtime)
+        # Drop the oldest tenth so pruning is not repeated on every write.
+        excess = len(files) - self.max_disk_entries + self.max_disk_entries // 10
+        for path in files[: max(excess, 0)]:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_count = len(files) - max(excess, 0)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def _key(layer: str, digest: str, config_key: str) -> str:
+        return f"{layer}:{config_key}:{digest}"
+
+    @staticmethod
+    def _count(counter: Dict[str, int], layer: str) -> None:
+        counter[layer] = counter.get(layer, 0) + 1
+
+
+__all__ = ["ResultCache", "config_fingerprint"]
@@ -1,72 +1,360 @@
-"""Simple JSON-backed state tracking for duplicates and device usage."""
+"""SQLite-backed state tracking for duplicates and device usage."""
 
 from __future__ import annotations
 
 import json
-from datetime import datetime, timedelta
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
-from threading import Lock
-from typing import Any, Dict, List, Optional
+from threading import RLock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# (sql, params) writes collected by an open ``batch``.
+PendingWrites = List[Tuple[str, Sequence[Any]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    applicant_id TEXT NOT NULL,
+    evidence_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    UNIQUE (applicant_id, evidence_id)
+);
+CREATE TABLE IF NOT EXISTS device_buckets (
+    device_id TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (device_id, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS applicant_velocity (
+    applicant_id TEXT PRIMARY KEY,
+    last_ts REAL NOT NULL,
+    intervals INTEGER NOT NULL,
+    rapid INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS case_states (
+    case_id TEXT PRIMARY KEY,
+    state_id TEXT NOT NULL,
+    snapshot TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_case_states ON case_states (state_id);
+CREATE TABLE IF NOT EXISTS case_risk (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id TEXT NOT NULL UNIQUE,
+    image_quality REAL NOT NULL,
+    asset_match REAL NOT NULL,
+    ocr REAL NOT NULL,
+    duplicates REAL NOT NULL,
+    fraud REAL NOT NULL,
+    verification_failed INTEGER NOT NULL
+);
+"""
+
+# Device events are counted in hourly buckets; a window of N hours sums at
+# most N rows, however long the device has been active.
+DEVICE_BUCKET_SECONDS = 3600
+VELOCITY_WINDOWS = {"cases_1h": 1, "cases_24h": 24, "cases_7d": 7 * 24}
+DEVICE_RETENTION_BUCKETS = max(VELOCITY_WINDOWS.values())
+
+# Submission timestamps come from the client; ones dated further ahead of
+# the server clock than this are recorded as arriving now.
+MAX_FUTURE_SKEW_SECONDS = 300
+
+# Consecutive submissions closer than this count as rapid.
+RAPID_SUBMISSION_SECONDS = 2 * 3600
+
+# How long a write waits for another connection (e.g. a pool worker's case
+# commit) to release the write lock before failing.
+BUSY_TIMEOUT_SECONDS = 30.0
+
+# Component risk columns of ``case_risk``, in RiskAggregator weight order.
+CASE_RISK_COMPONENTS = ("image_quality", "asset_match", "ocr", "duplicates", "fraud")
+
+_RECORD_DEVICE_EVENT = (
+    "INSERT INTO device_buckets (device_id, bucket, count) VALUES (?, ?, ?) "
+    "ON CONFLICT (device_id, bucket) DO UPDATE SET count = count + excluded.count"
+)
 
 
 class LocalStateStore:
-    """Thread-safe helper persisting lightweight state to JSON files."""
+    """Thread-safe state store backed by SQLite in WAL mode.
+
+    Every ``record_*`` call is a single indexed insert instead of a rewrite of
+    the whole state file. Wrap a case in :meth:`batch` to collect its writes
+    and commit them together in one short transaction when the case ends, so
+    no write lock is held while the case waits on models or remote calls.
+    State from the previous JSON store is imported once when
+    ``legacy_json_path`` points at an existing file.
 
-    def __init__(self, path: Path):
+    Velocity state is bounded: devices keep one counter per active hour for
+    the last week, and applicants keep a single row of running interval
+    counters, so both queries cost the same for old and new keys.
+    """
+
+    def __init__(
+        self, path: Path, legacy_json_path: Optional[Path] = None, clock: Callable[[], float] = time.time
+    ):
         self.path = path
-        self._lock = Lock()
-        self._state: Dict[str, Any] = {}
-        self._load()
+        self._clock = clock
+        self._lock = RLock()
+        # Per case rather than per thread: the stage scheduler runs each
+        # stage in a copy of the case's context, which shares this list.
+        self._pending: ContextVar[Optional[PendingWrites]] = ContextVar(f"state_writes_{id(self)}", default=None)
+        self._pruned_bucket = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT_SECONDS * 1000)}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_event_tables()
+        if legacy_json_path is not None:
+            self._import_legacy_json(legacy_json_path)
+        self._conn.commit()
 
-    def _load(self) -> None:
-        if self.path.exists():
-            try:
-                self._state = json.loads(self.path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError:
-                self._state = {}
-        else:
-            self.path.parent.mkdir(parents=True, exist_ok=True)
-            self.path.write_text("{}", encoding="utf-8")
+    @contextmanager
+    def batch(self) -> Iterator["LocalStateStore"]:
+        """Collect writes made in this context and commit them together on exit.
 
-    def _persist(self) -> None:
-        self.path.write_text(json.dumps(self._state, indent=2), encoding="utf-8")
+        Nested blocks join the outermost one. Reads inside the block do not
+        see its pending writes.
+        """
+        if self._pending.get() is not None:
+            yield self
+            return
+        pending: PendingWrites = []
+        token = self._pending.set(pending)
+        try:
+            yield self
+        finally:
+            self._pending.reset(token)
+            self._flush(pending)
 
-    def _applicants(self) -> Dict[str, Any]:
-        return self._state.setdefault("applicants", {})
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
 
-    def record_hash(self, applicant_id: str, evidence_id: str, hash_value: str, case_id: str) -> None:
+    def _write(self, sql: str, params: Sequence[Any]) -> None:
+        pending = self._pending.get()
+        if pending is not None:
+            pending.append((sql, params))
+            return
         with self._lock:
-            applicant = self._applicants().setdefault(applicant_id, {})
-            hashes = applicant.setdefault("hashes", {})
-            hashes[evidence_id] = {"hash": hash_value, "case_id": case_id}
-            self._persist()
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _flush(self, pending: PendingWrites) -> None:
+        if not pending:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def record_hash(self, applicant_id: str, evidence_id: str, hash_value: str, case_id: str) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO hashes (applicant_id, evidence_id, hash, case_id) VALUES (?, ?, ?, ?)",
+            (applicant_id, evidence_id, hash_value, case_id),
+        )
 
     def list_hashes(self, applicant_id: str) -> Dict[str, Dict[str, str]]:
-        applicant = self._applicants().get(applicant_id, {})
-        return applicant.get("hashes", {})  # type: ignore[return-value]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT evidence_id, hash, case_id FROM hashes WHERE applicant_id = ?",
+                (applicant_id,),
+            ).fetchall()
+        return {evidence_id: {"hash": hash_value, "case_id": case_id} for evidence_id, hash_value, case_id in rows}
+
+    def iter_hashes(self, after_seq: int = 0) -> List[Tuple[int, str, str, str, str]]:
+        """Return ``(seq, applicant_id, evidence_id, hash, case_id)`` rows newer than ``after_seq``.
+
+        Replacing a hash assigns a fresh, never-reused ``seq``, so callers that
+        track the highest value they have seen pick up both new and re-recorded
+        hashes, including those written by other processes.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, applicant_id, evidence_id, hash, case_id FROM hashes WHERE seq > ? ORDER BY seq",
+                (after_seq,),
+            ).fetchall()
+
+    def record_device_usage(self, device_id: Optional[str], timestamp: datetime) -> int:
+        """Record a submission from ``device_id`` and return its 7-day count."""
+        return self.record_device_velocity(device_id, timestamp)["cases_7d"]
+
+    def record_device_velocity(self, device_id: Optional[str], timestamp: datetime) -> Dict[str, int]:
+        """Record a submission and return counts for every ``VELOCITY_WINDOWS`` entry.
 
-    def record_device_usage(self, device_id: Optional[str], timestamp: datetime, window_days: int = 7) -> int:
+        Windows are whole hourly buckets ending at the submission's bucket, and
+        later buckets are included so out-of-order submissions still see them.
+        The counts include this submission even when its write is still
+        pending in a batch.
+        """
         if not device_id:
-            return 0
+            return {name: 0 for name in VELOCITY_WINDOWS}
+        bucket = int(self._event_ts(timestamp) // DEVICE_BUCKET_SECONDS)
+        names = list(VELOCITY_WINDOWS)
+        sums = ", ".join("COALESCE(SUM(CASE WHEN bucket > ? THEN count END), 0)" for _ in names)
         with self._lock:
-            devices = self._state.setdefault("devices", {})
-            device_state = devices.setdefault(device_id, {"events": []})
-            events: List[str] = device_state.setdefault("events", [])
-            events.append(timestamp.isoformat())
-            cutoff = timestamp - timedelta(days=window_days)
-            device_state["events"] = [
-                event for event in events if datetime.fromisoformat(event) >= cutoff
-            ]
-            self._persist()
-            return len(device_state["events"])
+            counts = self._conn.execute(
+                f"SELECT {sums} FROM device_buckets WHERE device_id = ? AND bucket > ?",
+                (
+                    *(bucket - VELOCITY_WINDOWS[name] for name in names),
+                    device_id,
+                    bucket - DEVICE_RETENTION_BUCKETS,
+                ),
+            ).fetchone()
+        self._write(_RECORD_DEVICE_EVENT, (device_id, bucket, 1))
+        self._prune_device_buckets()
+        return {name: int(count) + 1 for name, count in zip(names, counts)}
+
+    def record_submission(self, applicant_id: str, timestamp: datetime) -> float:
+        """Record an applicant submission and return the rapid-submission ratio.
 
-    def record_case_timestamp(self, applicant_id: str, timestamp: str) -> List[str]:
+        The ratio is the share of gaps between consecutive submissions shorter
+        than ``RAPID_SUBMISSION_SECONDS``. Submissions normally arrive in
+        order; a late one is measured against the newest submission.
+        """
+        ts = self._event_ts(timestamp)
         with self._lock:
-            applicant = self._applicants().setdefault(applicant_id, {})
-            history = applicant.setdefault("timestamps", [])
-            history.append(timestamp)
-            self._persist()
-            return history
+            row = self._conn.execute(
+                "SELECT last_ts, intervals, rapid FROM applicant_velocity WHERE applicant_id = ?", (applicant_id,)
+            ).fetchone()
+        # The stored counters are incremented in SQL, so concurrent cases of
+        # one applicant never overwrite each other's submissions.
+        self._write(
+            "INSERT INTO applicant_velocity (applicant_id, last_ts, intervals, rapid) VALUES (?, ?, 0, 0) "
+            "ON CONFLICT (applicant_id) DO UPDATE SET intervals = intervals + 1, "
+            "rapid = rapid + (abs(excluded.last_ts - last_ts) < ?), last_ts = max(last_ts, excluded.last_ts)",
+            (applicant_id, ts, RAPID_SUBMISSION_SECONDS),
+        )
+        if row is None:
+            return 0.0
+        last_ts, intervals, rapid = row
+        return (rapid + (abs(ts - last_ts) < RAPID_SUBMISSION_SECONDS)) / (intervals + 1)
+
+    def save_case_state(self, case_id: str, state_id: str, snapshot: str) -> None:
+        """Keep the latest layer snapshot of a case (older states are replaced)."""
+        self._write(
+            "INSERT OR REPLACE INTO case_states (case_id, state_id, snapshot) VALUES (?, ?, ?)",
+            (case_id, state_id, snapshot),
+        )
+
+    def load_case_state(self, state_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT snapshot FROM case_states WHERE state_id = ?", (state_id,)).fetchone()
+        return row[0] if row else None
+
+    def record_case_risk(self, case_id: str, components: Sequence[float], verification_failed: bool) -> None:
+        """Keep the latest component risks of a case (``CASE_RISK_COMPONENTS`` order) for portfolio what-ifs."""
+        self._write(
+            "INSERT OR REPLACE INTO case_risk "
+            f"(case_id, {', '.join(CASE_RISK_COMPONENTS)}, verification_failed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (case_id, *components, int(verification_failed)),
+        )
+
+    def iter_case_risk(self, after_seq: int = 0, limit: int = 50000) -> List[Tuple[Any, ...]]:
+        """Return up to ``limit`` ``(seq, case_id, *components, verification_failed)`` rows newer than ``after_seq``.
+
+        Like :meth:`iter_hashes`, a re-scored case gets a fresh ``seq``.
+        """
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT seq, case_id, {', '.join(CASE_RISK_COMPONENTS)}, verification_failed FROM case_risk "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after_seq, limit),
+            ).fetchall()
+
+    def _event_ts(self, timestamp: datetime) -> float:
+        now = self._clock()
+        ts = timestamp.timestamp()
+        return now if ts > now + MAX_FUTURE_SKEW_SECONDS else ts
+
+    def _prune_device_buckets(self) -> None:
+        # Drop buckets that fell out of every window once per hour, so devices
+        # that stop submitting do not keep their counters forever. The cutoff
+        # follows the server clock, never a submitted timestamp.
+        bucket = int(self._clock() // DEVICE_BUCKET_SECONDS)
+        with self._lock:
+            if bucket <= self._pruned_bucket:
+                return
+            self._pruned_bucket = bucket
+        self._write("DELETE FROM device_buckets WHERE bucket <= ?", (bucket - DEVICE_RETENTION_BUCKETS,))
+
+    def _import_device_events(self, events: Sequence[Tuple[str, float]]) -> None:
+        buckets: Dict[Tuple[str, int], int] = {}
+        for device_id, ts in events:
+            key = (device_id, int(ts // DEVICE_BUCKET_SECONDS))
+            buckets[key] = buckets.get(key, 0) + 1
+        self._conn.executemany(_RECORD_DEVICE_EVENT, [(*key, count) for key, count in buckets.items()])
+
+    def _import_submissions(self, applicant_id: str, timestamps: Sequence[float]) -> None:
+        ordered = sorted(timestamps)
+        if not ordered:
+            return
+        gaps = [later - earlier for earlier, later in zip(ordered, ordered[1:])]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO applicant_velocity (applicant_id, last_ts, intervals, rapid) VALUES (?, ?, ?, ?)",
+            (applicant_id, ordered[-1], len(gaps), sum(gap < RAPID_SUBMISSION_SECONDS for gap in gaps)),
+        )
+
+    def _migrate_event_tables(self) -> None:
+        """Fold per-event tables written by earlier versions into the counters."""
+        tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "device_events" in tables:
+            self._import_device_events(self._conn.execute("SELECT device_id, ts FROM device_events").fetchall())
+            self._conn.execute("DROP TABLE device_events")
+        if "case_timestamps" in tables:
+            per_applicant: Dict[str, List[float]] = {}
+            for applicant_id, ts in self._conn.execute("SELECT applicant_id, ts FROM case_timestamps"):
+                per_applicant.setdefault(applicant_id, []).append(datetime.fromisoformat(ts).timestamp())
+            for applicant_id, timestamps in per_applicant.items():
+                self._import_submissions(applicant_id, timestamps)
+            self._conn.execute("DROP TABLE case_timestamps")
+
+    def _import_legacy_json(self, legacy_path: Path) -> None:
+        imported = self._conn.execute("SELECT value FROM meta WHERE key = 'legacy_json_imported'").fetchone()
+        if imported or not legacy_path.exists():
+            return
+        try:
+            state = json.loads(legacy_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            state = {}
+
+        for applicant_id, applicant in state.get("applicants", {}).items():
+            for evidence_id, record in applicant.get("hashes", {}).items():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hashes (applicant_id, evidence_id, hash, case_id) VALUES (?, ?, ?, ?)",
+                    (applicant_id, evidence_id, record.get("hash", ""), record.get("case_id", "")),
+                )
+            self._import_submissions(
+                applicant_id, [datetime.fromisoformat(ts).timestamp() for ts in applicant.get("timestamps", [])]
+            )
+        self._import_device_events(
+            [
+                (device_id, datetime.fromisoformat(event).timestamp())
+                for device_id, device in state.get("devices", {}).items()
+                for event in device.get("events", [])
+            ]
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+            (str(legacy_path),),
+        )
 
 
-__all__ = ["LocalStateStore"]
+__all__ = ["CASE_RISK_COMPONENTS", "LocalStateStore"]
@@ -0,0 +1,99 @@
+"""Compare the ultralytics and ONNX Runtime detection backends.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/bench_detection.py --pt models/yolov8n.pt --onnx models/yolov8n.onnx
+    python scripts/bench_detection.py --pt models/yolov8n.pt --onnx models/yolov8n.onnx --images data/media/*.jpg --runs 20
+
+Export the ONNX graph with ``yolo export model=yolov8n.pt format=onnx dynamic=True``.
+"""
+
+import argparse
+import base64
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.config import detection_config  # noqa: E402
+from app.schemas import EvidenceImage  # noqa: E402
+from app.services.object_detection import ObjectDetectionService  # noqa: E402
+from app.utils.media_context import CaseMediaContext  # noqa: E402
+from app.utils.media_loader import MediaLoader  # noqa: E402
+
+
+def _box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union else 0.0
+
+
+def _time_backend(service, images, declared_asset, runs):
+    loader = MediaLoader()
+    # Warm-up run pays one-off session/graph initialisation.
+    service.analyze(images, declared_asset, CaseMediaContext(loader))
+    samples = []
+    results = None
+    for _ in range(runs):
+        media = CaseMediaContext(loader)
+        for image in images:
+            media.get(image).frame  # decode outside the timed region
+        started = time.perf_counter()
+        results = service.analyze(images, declared_asset, media)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pt", type=Path, required=True, help="ultralytics .pt weights")
+    parser.add_argument("--onnx", type=Path, required=True, help="exported .onnx graph")
+    parser.add_argument("--images", nargs="+", type=Path, default=sorted((ROOT / "data" / "media").glob("*.jpg")))
+    parser.add_argument("--declared-asset", default="tractor")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads")
+    args = parser.parse_args()
+
+    images = [
+        EvidenceImage(id=path.name, base64_data=base64.b64encode(path.read_bytes()).decode("utf-8"))
+        for path in args.images
+    ]
+    backends = {
+        "ultralytics": ObjectDetectionService(MediaLoader(), detection_config, model_path=args.pt, backend="ultralytics"),
+        "onnx": ObjectDetectionService(
+            MediaLoader(), detection_config, model_path=args.onnx, backend="onnx", onnx_intra_op_threads=args.threads
+        ),
+    }
+    outputs = {}
+    print(f"{len(images)} images x {args.runs} runs")
+    print(f"{'backend':<12} {'p50 ms':>9} {'mean ms':>9} {'min ms':>9}")
+    for name, service in backends.items():
+        if service.model is None:
+            print(f"{name:<12} model failed to load")
+            continue
+        samples, outputs[name] = _time_backend(service, images, args.declared_asset, args.runs)
+        print(f"{name:<12} {statistics.median(samples):9.2f} {statistics.mean(samples):9.2f} {min(samples):9.2f}")
+
+    if len(outputs) < 2:
+        return
+    print("\nParity (ultralytics vs onnx):")
+    for reference, candidate in zip(outputs["ultralytics"], outputs["onnx"]):
+        ref_objects, cand_objects = reference.detected_objects, candidate.detected_objects
+        labels_equal = [obj["label"] for obj in ref_objects] == [obj["label"] for obj in cand_objects]
+        conf_delta = max(
+            (abs(a["confidence"] - b["confidence"]) for a, b in zip(ref_objects, cand_objects)), default=0.0
+        )
+        min_iou = min((_box_iou(a["bbox"], b["bbox"]) for a, b in zip(ref_objects, cand_objects)), default=1.0)
+        print(
+            f"  {reference.image_id}: objects {len(ref_objects)}/{len(cand_objects)}, labels_equal={labels_equal}, "
+            f"max_conf_delta={conf_delta:.3f}, min_box_iou={min_iou:.3f}, "
+            f"asset_match {reference.asset_match}/{candidate.asset_match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Compare the fixed-schema feature engineer with the previous pandas path.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/bench_features.py
+    python scripts/bench_features.py --images 12 --docs 4 --runs 5000
+
+Times the evidence-derived features (quality, detection, OCR, duplicates) for
+one synthetic case with both implementations, then the full
+``build_feature_vector`` call including the state-store lookups.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.config import fraud_rule_config  # noqa: E402
+from app.schemas import (  # noqa: E402
+    DuplicateResult,
+    EvidencePackage,
+    ImageQualityResult,
+    ObjectDetectionResult,
+    OCRResult,
+)
+from app.services.feature_engineering import FEATURE_NAMES, FeatureEngineer  # noqa: E402
+from app.utils.state import LocalStateStore  # noqa: E402
+
+
+def legacy_features(quality, detection, ocr_results, duplicates, metadata):
+    """The per-section dict building the engineer used before the fixed schema."""
+    features = {}
+    df = pd.DataFrame([r.model_dump() for r in quality])
+    features.update(
+        {
+            "avg_quality_score": float(df["quality_score"].mean()),
+            "low_quality_ratio": float((df["quality_score"] < 0.5).mean()),
+        }
+    )
+    features.update(
+        {
+            "asset_match_rate": float(np.mean([r.match_score for r in detection])),
+            "asset_declared": 1.0 if metadata.declared_asset_type else 0.0,
+        }
+    )
+    features.update(
+        {
+            "avg_ocr_confidence": float(mean([r.ocr_confidence for r in ocr_results])),
+            "vendor_match_rate": float(np.mean([r.crosscheck_results.get("vendor_match", False) for r in ocr_results])),
+            "amount_match_rate": float(np.mean([r.crosscheck_results.get("amount_match", False) for r in ocr_results])),
+        }
+    )
+    features.update({"duplicate_ratio": float(np.mean([r.duplicate_found for r in duplicates]))})
+    return features
+
+
+def current_features(quality, detection, ocr_results, duplicates, metadata):
+    row = np.full(len(FEATURE_NAMES), np.nan)
+    FeatureEngineer._quality_features(row, quality)
+    FeatureEngineer._detection_features(row, detection, metadata)
+    FeatureEngineer._ocr_features(row, ocr_results)
+    FeatureEngineer._duplicate_features(row, duplicates)
+    return row
+
+
+def synthetic_case(images, docs):
+    rng = np.random.default_rng(7)
+    quality = [
+        ImageQualityResult(
+            image_id=f"img-{idx}",
+            quality_score=float(rng.random()),
+            blur_variance=150.0,
+            brightness=120.0,
+            contrast=40.0,
+            resolution_ok=True,
+        )
+        for idx in range(images)
+    ]
+    detection = [
+        ObjectDetectionResult(
+            image_id=f"img-{idx}",
+            detected_objects=[],
+            asset_match=True,
+            asset_match_score=1.0,
+            match_score=float(rng.random()),
+        )
+        for idx in range(images)
+    ]
+    ocr_results = [
+        OCRResult(
+            doc_id=f"doc-{idx}",
+            raw_text="",
+            parsed_fields={},
+            ocr_confidence=float(rng.random()),
+            crosscheck_results={"vendor_match": bool(idx % 2), "amount_match": True},
+        )
+        for idx in range(docs)
+    ]
+    duplicates = [
+        DuplicateResult(evidence_id=f"img-{idx}", duplicate_found=idx == 0, hash_distance=0)
+        for idx in range(images)
+    ]
+    package = EvidencePackage.model_validate(
+        {
+            "case_id": "BENCH-1",
+            "metadata": {
+                "case_id": "BENCH-1",
+                "applicant_id": "APP-BENCH",
+                "declared_loan_amount": 100000,
+                "declared_asset_type": "tractor",
+                "submission_device_id": "dev-bench",
+            },
+        }
+    )
+    return package, quality, detection, ocr_results, duplicates
+
+
+def measure(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--docs", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    package, quality, detection, ocr_results, duplicates = synthetic_case(args.images, args.docs)
+    metadata = package.metadata
+    evidence = (quality, detection, ocr_results, duplicates, metadata)
+
+    legacy = legacy_features(*evidence)
+    row = current_features(*evidence)
+    for name, value in legacy.items():
+        assert np.isclose(row[FEATURE_NAMES.index(name)], value), name
+
+    print(f"{'path':<36} {'p50 us':>10}")
+    print(f"{'evidence features (pandas)':<36} {measure(lambda: legacy_features(*evidence), args.runs):10.1f}")
+    print(f"{'evidence features (fixed schema)':<36} {measure(lambda: current_features(*evidence), args.runs):10.1f}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = LocalStateStore(Path(folder) / "state.db")
+        engineer = FeatureEngineer(store, fraud_rule_config)
+        with store.batch():
+            full = measure(
+                lambda: engineer.build_feature_vector(package, quality, detection, ocr_results, duplicates), args.runs
+            )
+        store.close()
+    print(f"{'build_feature_vector (incl. state)':<36} {full:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare the anchored invoice parser with the previous per-field regex searches.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/bench_invoice_parser.py
+    python scripts/bench_invoice_parser.py --kb 64 --runs 500
+
+Builds a synthetic invoice page of roughly ``--kb`` kilobytes with the header
+fields near the top (the common case) and, separately, with no currency-marked
+amount so both paths have to read to the end. Checks that both parsers agree
+on vendor, amount and date before timing them.
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.invoice_parser import parse_invoice, parse_invoice_date  # noqa: E402
+
+
+def legacy_parse(text):
+    """The three inline ``re.search`` calls and sequential ``strptime`` used before."""
+    match = re.search(r"Vendor\s*:?\s*(.+)", text, re.IGNORECASE)
+    vendor = match.group(1).strip() if match else None
+    amount = None
+    match = re.search(r"(INR|Rs\.?|₹)\s*([0-9,]+\.?[0-9]*)", text, re.IGNORECASE)
+    if match:
+        amount = float(match.group(2).replace(",", ""))
+    else:
+        match = re.search(r"Total\s*:?\s*([0-9,]+\.?[0-9]*)", text, re.IGNORECASE)
+        if match:
+            amount = float(match.group(1).replace(",", ""))
+    match = re.search(r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})", text)
+    date = match.group(1) if match else None
+    parsed_date = None
+    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            parsed_date = datetime.strptime(date or "", fmt)
+            break
+        except ValueError:
+            continue
+    return {"vendor": vendor, "amount": amount, "date": date, "parsed_date": parsed_date}
+
+
+def current_parse(text):
+    fields = parse_invoice(text)
+    fields["parsed_date"] = parse_invoice_date(fields["date"])
+    return fields
+
+
+def synthetic_invoice(kb, currency=True):
+    header = [
+        "TAX INVOICE",
+        "Vendor: Green Fields Agro Equipments Pvt Ltd",
+        "GSTIN: 29BFBRJ8715S1ZE",
+        "Invoice No: INV-2025-001",
+        "Date: 05/01/2025",
+    ]
+    body = []
+    line = 0
+    while sum(len(row) + 1 for row in body) < kb * 1024:
+        line += 1
+        body.append(f"{line:04d} Spare part assembly item {line} qty 2 unit 1,250.00 amount 2,500.00")
+    footer = ["Grand Total: 4,85,000.00"] + (["Amount payable INR 4,85,000.00"] if currency else [])
+    return "\n".join(header + body + footer)
+
+
+def measure(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kb", type=int, default=32)
+    parser.add_argument("--runs", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<28} {'legacy p50 us':>14} {'anchored p50 us':>17}")
+    for label, currency in (("currency amount", True), ("total only (full scan)", False)):
+        text = synthetic_invoice(args.kb, currency)
+        legacy, current = legacy_parse(text), current_parse(text)
+        for field in ("vendor", "amount", "date", "parsed_date"):
+            assert legacy[field] == current[field], (field, legacy[field], current[field])
+        print(
+            f"{label:<28} {measure(lambda: legacy_parse(text), args.runs):14.1f} "
+            f"{measure(lambda: current_parse(text), args.runs):17.1f}"
+        )
+    print("anchored parser also returns:", {k: current[k] for k in ("invoice_number", "gstin", "line_hints")})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Time a portfolio-wide what-if re-tiering on synthetic cases.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/bench_portfolio.py
+    python scripts/bench_portfolio.py --cases 2000000 --runs 10
+
+Fills a scratch state store with ``--cases`` random component risks, syncs
+them into a RiskPortfolio and reports the sync time and the median latency of
+``simulate`` with a heavier fraud weight.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.config import WeightConfig, threshold_config, weight_config  # noqa: E402
+from app.services.aggregation import RiskAggregator  # noqa: E402
+from app.services.portfolio import RiskPortfolio  # noqa: E402
+from app.utils.state import CASE_RISK_COMPONENTS, LocalStateStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    risks = np.round(rng.uniform(0, 100, (args.cases, len(CASE_RISK_COMPONENTS))), 2).tolist()
+    failed = (rng.random(args.cases) < 0.05).tolist()
+    with tempfile.TemporaryDirectory(prefix="vidya-portfolio-") as scratch:
+        store = LocalStateStore(Path(scratch) / "state.db")
+        with store.batch():
+            for idx in range(args.cases):
+                store.record_case_risk(f"case-{idx}", risks[idx], failed[idx])
+
+        portfolio = RiskPortfolio(store)
+        started = time.perf_counter()
+        portfolio.sync()
+        print(f"synced {len(portfolio)} cases in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        aggregator = RiskAggregator(weight_config, threshold_config)
+        candidate = WeightConfig(**{**weight_config.model_dump(), "fraud_score_weight": 0.5})
+        samples = [portfolio.simulate(aggregator, candidate)["elapsed_ms"] for _ in range(args.runs)]
+        result = portfolio.simulate(aggregator, candidate)
+        print(f"simulate p50 {statistics.median(samples):.1f} ms")
+        print("migrations:", result["migrations"])
+
+
+if __name__ == "__main__":
+    main()
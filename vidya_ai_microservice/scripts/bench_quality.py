@@ -0,0 +1,92 @@
+"""Compare the luma quality kernel with the previous BGR path.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/bench_quality.py
+    python scripts/bench_quality.py --images debug_*.jpg --runs 20 --reduced
+
+Reports per-image wall time and peak allocation (tracemalloc sees NumPy/OpenCV
+arrays) for both paths and checks that the metrics agree. ``--reduced`` also
+shows what IMREAD_REDUCED_GRAYSCALE_* decodes would cost and how far their
+Laplacian variance drifts from the full-resolution value.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.quality import luma_statistics  # noqa: E402
+
+REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def legacy_metrics(payload):
+    frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var()), float(np.mean(gray)), float(np.std(gray))
+
+
+def luma_metrics(payload):
+    gray = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    return luma_statistics(gray)
+
+
+def reduced_metrics(payload, flag):
+    gray = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), flag)
+    return luma_statistics(gray)
+
+
+def measure(fn, payload, runs):
+    fn(payload)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    result = fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(samples), peak / 2**20, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", nargs="+", type=Path, default=sorted((ROOT / "data" / "media").glob("*.jpg")))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--reduced", action="store_true", help="also report reduced-resolution decodes")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    print(f"{'image':<28} {'path':<10} {'p50 ms':>8} {'peak MiB':>9} {'blur var':>10} {'mean':>7} {'std':>7}")
+    for path in args.images:
+        payload = path.read_bytes()
+        paths = {"legacy": legacy_metrics, "luma": luma_metrics}
+        if args.reduced:
+            for factor, flag in REDUCED_FLAGS.items():
+                paths[f"reduced/{factor}"] = lambda data, flag=flag: reduced_metrics(data, flag)
+        baseline = None
+        for name, fn in paths.items():
+            p50, peak, (blur, brightness, contrast) = measure(fn, payload, args.runs)
+            baseline = baseline or blur
+            drift = f"  (blur x{blur / baseline:.2f})" if name.startswith("reduced") and baseline else ""
+            print(
+                f"{path.name[:28]:<28} {name:<10} {p50:8.1f} {peak:9.1f} {blur:10.1f} {brightness:7.1f} "
+                f"{contrast:7.1f}{drift}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""Load-test ``POST /cases/score`` and keep the results per commit.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/bench_scoring.py
+    python scripts/bench_scoring.py --mode http --concurrency 8 --requests 400 --assets 4 --docs 2
+    python scripts/bench_scoring.py --unique-media --vision-latency-ms 150
+    python scripts/bench_scoring.py --verification-latency-ms 80
+    python scripts/bench_scoring.py --compare HEAD~1
+
+Synthetic packages are built from samples/sample_request.json with the
+data/media images inlined as base64 (``--assets``/``--docs`` per case). OCR
+goes to a local Vision stub (app.stubs.VisionStubServer), so no credentials
+or network are needed. ``--verification-latency-ms`` also sends GSTN/CBS
+lookups through the async gateway to a local stub
+(app.stubs.VerificationStubServer) instead of the on-disk registry. ``inprocess`` drives the ASGI app through
+TestClient; ``http`` starts uvicorn on a free port (or uses ``--url``).
+
+Each scenario reports throughput, client latency percentiles, per-stage
+percentiles from the response ``timings`` and peak RSS, and is appended to
+``--results`` together with the git commit. Peak RSS is reported per process
+(server and, in process mode, workers), not per stage: stages of one case run
+concurrently on a shared thread pool, and cases overlap, so memory cannot be
+attributed to a single stage. ``--compare REF`` prints the
+deltas against the newest stored run of the same scenario at REF and exits
+non-zero when latency or throughput regressed by more than
+``--max-regression``.
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import cv2
+import numpy as np
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.stubs import VerificationStubServer, VisionStubServer  # noqa: E402
+
+DEFAULT_RESULTS = ROOT / "benchmarks" / "results.jsonl"
+# Metrics compared by --compare; True means larger is better.
+COMPARED = {"throughput_rps": True, "latency_ms.p50": False, "latency_ms.p99": False}
+
+
+def build_packages(count, assets, docs, unique_media, seed=7):
+    """Deterministic synthetic cases; ``unique_media`` perturbs every image."""
+    template = json.loads((ROOT / "samples" / "sample_request.json").read_text(encoding="utf-8"))
+    asset_frame = cv2.imread(str(ROOT / "data" / "media" / "tractor.jpg"))
+    doc_frame = cv2.imread(str(ROOT / "data" / "media" / "invoice.jpg"))
+    rng = np.random.default_rng(seed)
+
+    def encode(frame):
+        if unique_media:
+            frame = frame.copy()
+            y, x = rng.integers(0, frame.shape[0]), rng.integers(0, frame.shape[1])
+            frame[y : y + 8, x : x + 8] = rng.integers(0, 255, 3, dtype=np.uint8)
+        return base64.b64encode(cv2.imencode(".jpg", frame)[1]).decode("utf-8")
+
+    shared_asset, shared_doc = encode(asset_frame), encode(doc_frame)
+    packages = []
+    for idx in range(count):
+        case_id = f"BENCH-{idx:06d}"
+        package = json.loads(json.dumps(template))
+        package["case_id"] = case_id
+        package["asset_images"] = [
+            {
+                "id": f"asset-{n}",
+                "base64_data": encode(asset_frame) if unique_media else shared_asset,
+                "declared_asset_type": "tractor",
+            }
+            for n in range(assets)
+        ]
+        package["doc_images"] = [
+            {
+                "id": f"doc-{n}",
+                "base64_data": encode(doc_frame) if unique_media else shared_doc,
+                "document_type": "invoice",
+            }
+            for n in range(docs)
+        ]
+        metadata = package["metadata"]
+        metadata["case_id"] = case_id
+        metadata["applicant_id"] = f"BENCH-APP-{idx % 50:03d}"
+        metadata["submission_device_id"] = f"bench-device-{idx % 20:02d}"
+        packages.append(package)
+    return packages
+
+
+def run_load(post, packages, concurrency, warmup):
+    """Send every package through ``post`` with ``concurrency`` workers."""
+    for package in packages[:warmup]:
+        post(package)
+    measured = packages[warmup:]
+
+    def timed(package):
+        started = time.perf_counter()
+        status, body = post(package)
+        return status, body, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, measured))
+    wall = time.perf_counter() - started
+
+    ok = [(body, latency) for status, body, latency in outcomes if status == 200]
+    stages = {}
+    for body, _ in ok:
+        for stage, elapsed in (body.get("timings") or {}).items():
+            stages.setdefault(stage, []).append(elapsed)
+    return {
+        "requests": len(measured),
+        "errors": len(measured) - len(ok),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "latency_ms": percentiles([latency for _, latency in ok]),
+        "stages_ms": {stage: percentiles(values) for stage, values in sorted(stages.items())},
+    }
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 2),
+        "mean": round(statistics.fmean(ordered), 2),
+    }
+
+
+def bench_inprocess(packages, args):
+    # Settings are read at import time, so the app is imported after the
+    # environment has been pointed at the stub and a scratch state store.
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    with TestClient(create_app()) as client:
+
+        def post(package):
+            response = client.post("/cases/score", params={"timings": "true"}, json=package)
+            return response.status_code, response.json() if response.status_code == 200 else None
+
+        result = run_load(post, packages, args.concurrency, args.warmup)
+    result["peak_rss_mib"] = {"server": _rusage_mib(resource.RUSAGE_SELF)}
+    if os.environ.get("EXECUTION_MODE") == "process":
+        # Largest worker process once the pool has been shut down and reaped.
+        result["peak_rss_mib"]["workers"] = _rusage_mib(resource.RUSAGE_CHILDREN)
+    return result
+
+
+def bench_http(packages, args):
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT,
+            env=os.environ.copy(),
+        )
+        _wait_for(f"{url}/health", server)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+
+    def post(package):
+        response = session.post(f"{url}/cases/score", params={"timings": "true"}, json=package, timeout=300)
+        return response.status_code, response.json() if response.status_code == 200 else None
+
+    try:
+        result = run_load(post, packages, args.concurrency, args.warmup)
+        if server is not None:
+            result["peak_rss_mib"] = _process_tree_hwm_mib(server.pid)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    return result
+
+
+def _rusage_mib(who):
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _process_tree_hwm_mib(pid):
+    """VmHWM of the server and its worker processes (Linux /proc only)."""
+    peaks = {}
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+            children = Path(f"/proc/{current}/task/{current}/children").read_text().split()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmHWM:"):
+                peaks[current] = int(line.split()[1]) / 1024
+        pending.extend(int(child) for child in children)
+    if not peaks:
+        return {}
+    return {"server": round(peaks.get(pid, 0.0), 1), "workers": round(sum(peaks.values()) - peaks.get(pid, 0.0), 1)}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with status {process.returncode}")
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"server at {url} did not become healthy")
+
+
+def git_commit(ref="HEAD"):
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", ref], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--", "."], cwd=ROOT, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return sha, dirty
+
+
+def scenario_key(record):
+    scenario = record["scenario"]
+    return tuple(sorted((key, scenario[key]) for key in scenario))
+
+
+def compare(records, current, ref, max_regression):
+    sha, _ = git_commit(ref)
+    baseline = next(
+        (
+            record
+            for record in reversed(records)
+            if record.get("commit") == sha and scenario_key(record) == scenario_key(current)
+        ),
+        None,
+    )
+    if baseline is None:
+        print(f"no stored {current['scenario']['mode']} run for {ref} ({sha}) with the same scenario")
+        return True
+    ok = True
+    print(f"\n{'metric':<18} {ref[:12]:>12} {'current':>12} {'change':>9}")
+    for metric, higher_is_better in COMPARED.items():
+        before, after = _lookup(baseline, metric), _lookup(current, metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        regressed = -change > max_regression if higher_is_better else change > max_regression
+        ok &= not regressed
+        print(f"{metric:<18} {before:12.2f} {after:12.2f} {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def _lookup(record, dotted):
+    value = record
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def report(record):
+    scenario = record["scenario"]
+    print(
+        f"\n[{scenario['mode']}] {record['requests']} requests, concurrency {scenario['concurrency']}, "
+        f"{scenario['assets']} assets + {scenario['docs']} docs per case, {record['errors']} errors"
+    )
+    latency = record["latency_ms"]
+    print(
+        f"throughput {record['throughput_rps']} req/s  latency ms p50 {latency.get('p50')} "
+        f"p90 {latency.get('p90')} p99 {latency.get('p99')} max {latency.get('max')}"
+    )
+    print(f"peak RSS MiB {record.get('peak_rss_mib')}")
+    print(f"{'stage':<14} {'p50':>9} {'p90':>9} {'p99':>9}")
+    for stage, values in record["stages_ms"].items():
+        print(f"{stage:<14} {values['p50']:9.2f} {values['p90']:9.2f} {values['p99']:9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inprocess", "http", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--assets", type=int, default=2, help="asset images per case")
+    parser.add_argument("--docs", type=int, default=1, help="invoice images per case")
+    parser.add_argument("--unique-media", action="store_true", help="perturb every image so caches never hit")
+    parser.add_argument("--vision-latency-ms", type=float, default=100.0, help="simulated Vision API latency")
+    parser.add_argument(
+        "--verification-latency-ms", type=float, help="route GSTN/CBS lookups to a stub with this latency"
+    )
+    parser.add_argument("--url", help="benchmark an already running server instead of starting uvicorn")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", metavar="REF", help="git ref whose stored results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    args = parser.parse_args()
+
+    stub = VisionStubServer(latency_ms=args.vision_latency_ms).start()
+    scratch = tempfile.TemporaryDirectory(prefix="vidya-bench-")
+    os.environ.update(
+        {
+            "GOOGLE_API_KEY": "bench",
+            "VISION_API_URL": stub.base_url,
+            "DUPLICATE_STATE_PATH": str(Path(scratch.name) / "state.db"),
+            "LEGACY_STATE_PATH": str(Path(scratch.name) / "missing.json"),
+            # A scratch config store seeds from the config files, so weights
+            # PATCHed into a local data/runtime_config.db never skew a run.
+            "RUNTIME_CONFIG_PATH": str(Path(scratch.name) / "runtime_config.db"),
+            "VERIFICATION_REGISTRY_PATH": str(Path(scratch.name) / "verification_registry.db"),
+            "VERIFICATION_SEED_DEMO": "true",
+        }
+    )
+    os.environ.pop("RESULT_CACHE_DIR", None)
+    verification_stub = None
+    if args.verification_latency_ms is not None:
+        # The gateway URLs must be in the environment before anything builds
+        # the app settings, so the stub's port is picked first.
+        verification_port = _free_port()
+        base_url = f"http://127.0.0.1:{verification_port}"
+        os.environ.update({"GST_GATEWAY_URL": f"{base_url}/gst/v1", "CBS_GATEWAY_URL": f"{base_url}/cbs/v1"})
+        verification_stub = VerificationStubServer(
+            port=verification_port, latency_ms=args.verification_latency_ms
+        ).start()
+
+    packages = build_packages(args.requests + args.warmup, args.assets, args.docs, args.unique_media)
+    modes = ["inprocess", "http"] if args.mode == "both" else [args.mode]
+    commit, dirty = git_commit()
+    records = []
+    if args.results.exists():
+        records = [json.loads(line) for line in args.results.read_text(encoding="utf-8").splitlines() if line]
+
+    ok = True
+    try:
+        for mode in modes:
+            result = bench_inprocess(packages, args) if mode == "inprocess" else bench_http(packages, args)
+            record = {
+                "commit": commit,
+                "dirty": dirty,
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "scenario": {
+                    "mode": mode,
+                    "concurrency": args.concurrency,
+                    "assets": args.assets,
+                    "docs": args.docs,
+                    "unique_media": args.unique_media,
+                    "vision_latency_ms": args.vision_latency_ms,
+                    "execution_mode": os.environ.get("EXECUTION_MODE", "thread"),
+                },
+                **result,
+            }
+            if args.verification_latency_ms is not None:
+                record["scenario"]["verification_latency_ms"] = args.verification_latency_ms
+            report(record)
+            if args.compare:
+                ok &= compare(records, record, args.compare, args.max_regression)
+            if not args.no_save:
+                args.results.parent.mkdir(parents=True, exist_ok=True)
+                with args.results.open("a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(record) + "\n")
+    finally:
+        stub.stop()
+        if verification_stub is not None:
+            verification_stub.stop()
+        scratch.cleanup()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Bulk-import nightly GSTN and CBS extracts into the verification registry.
+
+Usage (from vidya_ai_microservice/):
+    python scripts/import_verification_registry.py --gst gstn.csv --sanctions cbs.csv
+    python scripts/import_verification_registry.py --demo
+
+Extracts are CSV with a header row, or JSON lines (``.jsonl``/``.ndjson``).
+GST rows carry ``invoice_number, gstin, vendor, amount, date``; sanction rows
+carry ``applicant_id, allowed_asset, max_amount``. Rows stream into a new
+file that replaces ``VERIFICATION_REGISTRY_PATH`` atomically; running
+services switch to it on their next poll. An extract that is not given is
+carried over from the current registry. ``--demo`` loads the sample records
+in ``app/services/mock_data.py``.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.config import settings  # noqa: E402
+from app.services.verification_registry import demo_rows, import_registry, read_extract  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registry", type=Path, default=settings.verification_registry_path)
+    parser.add_argument("--gst", type=Path, help="GSTN invoice extract (CSV or JSON lines)")
+    parser.add_argument("--sanctions", type=Path, help="CBS sanction extract (CSV or JSON lines)")
+    parser.add_argument("--demo", action="store_true", help="Load the sample records from mock_data.py")
+    parser.add_argument("--version", help="Version label stored in the registry (default: import timestamp)")
+    args = parser.parse_args()
+    if args.demo:
+        gst_rows, sanction_rows = demo_rows()
+    elif args.gst or args.sanctions:
+        gst_rows = read_extract(args.gst) if args.gst else None
+        sanction_rows = read_extract(args.sanctions) if args.sanctions else None
+    else:
+        parser.error("give --gst and/or --sanctions, or --demo")
+    started = time.perf_counter()
+    counts = import_registry(args.registry, gst_rows, sanction_rows, version=args.version)
+    elapsed = time.perf_counter() - started
+    summary = ", ".join(f"{table}={count}" for table, count in counts.items())
+    print(f"{args.registry}: {summary} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
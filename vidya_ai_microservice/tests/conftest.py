@@ -7,7 +7,7 @@ from typing import Dict, List
 
 import pytest
 
-from app.config import threshold_config, weight_config
+from app.config import settings, threshold_config, weight_config
 from app.schemas import (
     DuplicateResult,
     FraudScoreResult,
@@ -16,6 +16,7 @@ from app.schemas import (
     OCRResult,
 )
 from app.services.aggregation import RiskAggregator
+from app.services.pipeline import VidyaAIPipeline, build_pipeline
 
 
 @pytest.fixture(scope="session")
@@ -25,6 +26,20 @@ def aggregator() -> RiskAggregator:
     return RiskAggregator(weight_config, threshold_config)
 
 
+@pytest.fixture
+def scratch_pipeline(tmp_path, monkeypatch) -> VidyaAIPipeline:
+    """A full pipeline whose state, config and verification stores live in ``tmp_path``."""
+
+    monkeypatch.setattr(settings, "duplicate_state_path", tmp_path / "state.db")
+    monkeypatch.setattr(settings, "legacy_state_path", tmp_path / "missing.json")
+    monkeypatch.setattr(settings, "runtime_config_path", tmp_path / "runtime_config.db")
+    monkeypatch.setattr(settings, "verification_registry_path", tmp_path / "verification_registry.db")
+    monkeypatch.setattr(settings, "verification_seed_demo", True)
+    monkeypatch.setattr(settings, "result_cache_entries", 0)
+    monkeypatch.setattr(settings, "result_cache_dir", None)
+    return build_pipeline()
+
+
 def _quality(result_id: str, score: float) -> ImageQualityResult:
     return ImageQualityResult(
         image_id=result_id,
@@ -112,4 +127,3 @@ def high_risk_case() -> Dict[str, List]:
         "duplicates": [_duplicate("dup-high", 100.0)],
         "fraud_score": _fraud(100.0, {"gps_deviation": 15.0, "history_flags": 10.0}),
     }
-*** End of File**
\ No newline at end of file
@@ -52,4 +52,3 @@ def test_risk_aggregation_balances_components(aggregator: RiskAggregator) -> Non
 
     assert 0 <= result["final_risk_score"] <= 100
     assert result["risk_tier"] in {"auto-approve", "officer-review", "video-verify"}
-*** End of File**
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""Tests for streaming batch scoring."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from pydantic import BaseModel
+
+from app.schemas import EvidencePackage
+from app.services.batch_scoring import BatchScorer, iter_items, iter_ndjson
+
+
+class _Scored(BaseModel):
+    case_id: str
+
+
+def _package(case_id: str) -> Dict[str, Any]:
+    return {
+        "case_id": case_id,
+        "metadata": {"case_id": case_id, "applicant_id": "APP-1", "declared_loan_amount": 100000},
+    }
+
+
+def _collect(scorer: BatchScorer, items: AsyncIterator) -> List[Dict[str, Any]]:
+    async def run() -> List[Dict[str, Any]]:
+        return [json.loads(line) async for line in scorer.stream(items)]
+
+    return asyncio.run(run())
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+def test_results_stream_in_completion_order() -> None:
+    def score(package: EvidencePackage) -> _Scored:
+        time.sleep(0.2 if package.case_id == "slow" else 0.0)
+        return _Scored(case_id=package.case_id)
+
+    lines = _collect(BatchScorer(score, max_workers=2), iter_items([_package("slow"), _package("fast")]))
+
+    assert [line["case_id"] for line in lines] == ["fast", "slow"]
+
+
+def test_failures_are_reported_per_line() -> None:
+    def score(package: EvidencePackage) -> _Scored:
+        if package.case_id == "boom":
+            raise RuntimeError("model exploded")
+        return _Scored(case_id=package.case_id)
+
+    body = json.dumps(_package("ok")).encode() + b"\n{not json"
+    items = iter_ndjson(_chunks(body, b"\n{}\n", json.dumps(_package("boom")).encode()))
+    lines = sorted(_collect(BatchScorer(score), items), key=lambda line: line.get("index", -1))
+
+    assert lines[0] == {"case_id": "ok"}
+    assert lines[1]["index"] == 1 and lines[1]["error"].startswith("Invalid JSON")
+    assert lines[2]["index"] == 2 and lines[2]["error"] == "Invalid evidence package"
+    assert lines[3] == {"index": 3, "case_id": "boom", "error": "model exploded"}
+
+
+def test_in_flight_cases_are_bounded() -> None:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def score(package: EvidencePackage) -> _Scored:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return _Scored(case_id=package.case_id)
+
+    scorer = BatchScorer(score, max_workers=8, max_in_flight=3)
+    lines = _collect(scorer, iter_items([_package(f"c{idx}") for idx in range(12)]))
+
+    assert len(lines) == 12
+    assert peak <= 3
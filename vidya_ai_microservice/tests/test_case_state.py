@@ -0,0 +1,114 @@
+"""Tests for incremental rescoring from stored case snapshots."""
+
+from __future__ import annotations
+
+import base64
+
+import cv2
+import numpy as np
+
+from app.schemas import EvidencePackage, ImageQualityResult
+from app.services.case_state import CaseSnapshot
+
+
+def _image_base64(seed: int) -> str:
+    frame = np.random.default_rng(seed).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buffer).decode("utf-8")
+
+
+def _package(docs, case_id: str = "INC-1") -> EvidencePackage:
+    return EvidencePackage.model_validate(
+        {
+            "case_id": case_id,
+            "asset_images": [{"id": "a1", "base64_data": _image_base64(1)}],
+            "doc_images": docs,
+            "metadata": {"case_id": case_id, "applicant_id": "APP-INC", "declared_loan_amount": 100000},
+        }
+    )
+
+
+def _quality(item, score: float = 0.9) -> ImageQualityResult:
+    return ImageQualityResult(
+        image_id=item.id, quality_score=score, blur_variance=1.0, brightness=1.0, contrast=1.0, resolution_ok=True
+    )
+
+
+def test_snapshot_reruns_only_changed_items() -> None:
+    first = _package([{"id": "d1", "base64_data": _image_base64(2)}])
+    previous = CaseSnapshot("INC-1")
+    previous.run_items(
+        "quality.docs", first.doc_images, ("cfg",), lambda items: [_quality(i) for i in items], ImageQualityResult, None
+    )
+
+    second = _package([{"id": "d1", "base64_data": _image_base64(2)}, {"id": "d2", "base64_data": _image_base64(3)}])
+    seen = []
+    snapshot = CaseSnapshot("INC-1")
+    results = snapshot.run_items(
+        "quality.docs",
+        second.doc_images,
+        ("cfg",),
+        lambda items: seen.extend(item.id for item in items) or [_quality(i, 0.1) for i in items],
+        ImageQualityResult,
+        previous,
+    )
+
+    assert seen == ["d2"]
+    assert [result.quality_score for result in results] == [0.9, 0.1]
+    assert snapshot.reused == ["quality:d1"]
+    assert CaseSnapshot.from_json(snapshot.to_json()).state_id == snapshot.state_id
+
+
+def test_rescore_reuses_unchanged_evidence(scratch_pipeline) -> None:
+    first = scratch_pipeline.score_case(_package([{"id": "d1", "base64_data": _image_base64(2)}]))
+    assert first.state_id and first.reused_components == []
+
+    updated = _package([{"id": "d1", "base64_data": _image_base64(2)}, {"id": "d2", "base64_data": _image_base64(3)}])
+    second = scratch_pipeline.score_case(updated, previous=first.state_id)
+
+    assert {"quality:a1", "quality:d1", "detection:a1", "ocr:d1", "verification"} <= set(second.reused_components)
+    assert not any(component.endswith(":d2") for component in second.reused_components)
+    assert [result.image_id for result in second.scores.image_quality] == ["a1", "d1", "d2"]
+    assert second.scores.image_quality[0] == first.scores.image_quality[0]
+
+
+def test_changed_payload_or_foreign_state_is_recomputed(scratch_pipeline) -> None:
+    first = scratch_pipeline.score_case(_package([{"id": "d1", "base64_data": _image_base64(2)}]))
+
+    replaced = scratch_pipeline.score_case(_package([{"id": "d1", "base64_data": _image_base64(4)}]), previous=first)
+    other_case = scratch_pipeline.score_case(_package([], case_id="INC-2"), previous=replaced.state_id)
+
+    assert "quality:a1" in replaced.reused_components
+    assert "quality:d1" not in replaced.reused_components
+    assert other_case.reused_components == []
+
+
+def test_changed_file_behind_the_same_path_is_recomputed(scratch_pipeline, tmp_path) -> None:
+    path = tmp_path / "invoice.jpg"
+    path.write_bytes(base64.b64decode(_image_base64(2)))
+    package = _package([{"id": "d1", "file_path": str(path)}])
+    first = scratch_pipeline.score_case(package)
+
+    unchanged = scratch_pipeline.score_case(package, previous=first)
+    path.write_bytes(base64.b64decode(_image_base64(4)))
+    rewritten = scratch_pipeline.score_case(package, previous=unchanged)
+
+    assert "quality:d1" in unchanged.reused_components
+    assert "quality:a1" in rewritten.reused_components
+    assert "quality:d1" not in rewritten.reused_components
+
+
+def test_rescore_sees_duplicates_recorded_since(scratch_pipeline) -> None:
+    first = scratch_pipeline.score_case(_package([]))
+    assert not first.scores.duplicates[0].duplicate_found
+
+    # Another applicant submits the same asset photo after the first scoring.
+    other = _package([], case_id="INC-OTHER").model_copy(deep=True)
+    other.metadata.applicant_id = "APP-OTHER"
+    scratch_pipeline.score_case(other)
+    rescored = scratch_pipeline.score_case(_package([]), previous=first)
+
+    assert "quality:a1" in rescored.reused_components
+    assert not any(component.startswith("duplicates:") for component in rescored.reused_components)
+    assert rescored.scores.duplicates[0].duplicate_found
+    assert rescored.scores.duplicates[0].reference_case_id == "INC-OTHER"
@@ -0,0 +1,83 @@
+"""Tests for the versioned runtime config store and per-case config pinning."""
+
+from __future__ import annotations
+
+import base64
+
+import cv2
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.config import QualityConfig, WeightConfig
+from app.schemas import EvidencePackage
+from app.services.config_store import ConfigStore
+
+SEED = {"weights": WeightConfig(), "quality": QualityConfig()}
+
+
+def test_updates_survive_restart_until_the_seed_file_changes(tmp_path) -> None:
+    path = tmp_path / "runtime_config.db"
+    store = ConfigStore(path, SEED)
+    assert (store.version, store.current.source) == (1, "file")
+    store.update(weights=WeightConfig(fraud_score_weight=0.6))
+
+    restarted = ConfigStore(path, SEED)
+    assert restarted.version == 2
+    assert restarted.current.weights.fraud_score_weight == 0.6
+
+    # Editing the seed file is itself a new version and wins over the API change.
+    edited = ConfigStore(path, {**SEED, "quality": QualityConfig(min_width=320)})
+    assert (edited.version, edited.current.source) == (3, "file")
+    assert edited.current.quality.min_width == 320
+    assert edited.current.weights.fraud_score_weight == WeightConfig().fraud_score_weight
+    assert [entry["version"] for entry in edited.history()] == [3, 2, 1]
+
+
+def test_partial_updates_merge_and_bad_ones_change_nothing(tmp_path) -> None:
+    store = ConfigStore(tmp_path / "runtime_config.db", SEED)
+    first = store.current
+
+    second = store.update(quality={"min_width": 800}, thresholds={"auto_approve_threshold": 50})
+    assert second.quality.min_width == 800
+    assert second.quality.min_height == first.quality.min_height
+    assert second.thresholds.auto_approve_threshold == 50
+    assert second.weights is first.weights  # untouched sections are shared, not copied
+
+    with pytest.raises(ValidationError):
+        store.update(weights={"fraud_score_weight": -1})
+    with pytest.raises(KeyError):
+        store.update(unknown={"value": 1})
+    with pytest.raises(ValidationError):
+        second.quality.min_width = 10  # snapshots are immutable
+    assert store.current is second
+    assert store.get(first.version) is first
+    assert ConfigStore(tmp_path / "runtime_config.db", SEED).get(first.version).quality == first.quality
+
+
+def test_case_scores_under_the_version_it_started_with(scratch_pipeline, monkeypatch) -> None:
+    pipeline = scratch_pipeline
+    _, buffer = cv2.imencode(".jpg", np.random.default_rng(1).integers(0, 255, (240, 320, 3), dtype=np.uint8))
+    package = EvidencePackage.model_validate(
+        {
+            "case_id": "CFG-1",
+            "asset_images": [{"id": "a1", "base64_data": base64.b64encode(buffer).decode("utf-8")}],
+            "metadata": {"case_id": "CFG-1", "applicant_id": "APP-CFG", "declared_loan_amount": 100000},
+        }
+    )
+    started = pipeline.config.version
+    score = pipeline.fraud.score
+
+    def score_then_update(feature_vector, rules=None, row=None, batched=False):
+        # An operator changes the weights while this case is between layers.
+        pipeline.update_weights(WeightConfig(fraud_score_weight=5.0))
+        return score(feature_vector, rules, row, batched)
+
+    monkeypatch.setattr(pipeline.fraud, "score", score_then_update)
+    during = pipeline.score_case(package)
+    monkeypatch.setattr(pipeline.fraud, "score", score)
+    after = pipeline.score_case(package)
+
+    assert during.config_version == started
+    assert after.config_version == pipeline.config.version == started + 1
+    assert during.final_risk_score != after.final_risk_score
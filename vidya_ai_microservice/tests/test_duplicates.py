@@ -5,11 +5,14 @@ from __future__ import annotations
 import base64
 from io import BytesIO
 
+import imagehash
+import numpy as np
 from PIL import Image
 
 from app.config import duplicate_config
 from app.schemas import EvidenceImage
 from app.services.hashing import DuplicateDetector
+from app.utils.media_context import CaseMediaContext
 from app.utils.media_loader import MediaLoader
 from app.utils.state import LocalStateStore
 
@@ -34,4 +37,58 @@ def test_duplicate_detection_flags_reused_image(tmp_path) -> None:
     second_result = detector.evaluate_images([img_b], applicant_id="app-1", case_id="case-2")[0]
     assert second_result.duplicate_found is True
     assert second_result.penalty_points == duplicate_config.duplicate_penalty_points
-*** End of File**
\ No newline at end of file
+
+
+def test_duplicate_detection_matches_across_applicants(tmp_path) -> None:
+    state = LocalStateStore(tmp_path / "duplicates.db")
+    detector = DuplicateDetector(MediaLoader(), state, duplicate_config)
+
+    detector.evaluate_images([EvidenceImage(id="tractor-a", base64_data=_make_base64_image(90))], "app-1", "case-1")
+    result = detector.evaluate_images(
+        [EvidenceImage(id="tractor-b", base64_data=_make_base64_image(90))], "app-2", "case-2"
+    )[0]
+
+    assert result.duplicate_found is True
+    assert result.cross_applicant is True
+    assert result.reference_case_id == "case-1"
+    assert result.reference_applicant_id == "app-1"
+    assert result.matches[0].evidence_id == "tractor-a"
+
+
+def test_rescoring_same_case_does_not_flag_itself(tmp_path) -> None:
+    state = LocalStateStore(tmp_path / "duplicates.db")
+    detector = DuplicateDetector(MediaLoader(), state, duplicate_config)
+    image = EvidenceImage(id="img-a", base64_data=_make_base64_image(60))
+
+    detector.evaluate_images([image], "app-1", "case-1")
+    rescored = detector.evaluate_images([image], "app-1", "case-1")[0]
+
+    assert rescored.duplicate_found is False
+
+
+def test_index_is_rebuilt_from_persisted_hashes(tmp_path) -> None:
+    path = tmp_path / "duplicates.db"
+    first = DuplicateDetector(MediaLoader(), LocalStateStore(path), duplicate_config)
+    first.evaluate_images([EvidenceImage(id="img-a", base64_data=_make_base64_image(200))], "app-1", "case-1")
+    first.state.close()
+
+    restarted = DuplicateDetector(MediaLoader(), LocalStateStore(path), duplicate_config)
+
+    assert len(restarted.index) == 1
+
+
+def test_hash_of_exif_rotated_photo_matches_stored_hashes(tmp_path) -> None:
+    # A portrait phone photo: landscape pixels plus EXIF "rotate 90 CW".
+    pixels = np.random.default_rng(5).integers(0, 255, (120, 200, 3), dtype=np.uint8)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", exif=exif.tobytes())
+    payload = buffer.getvalue()
+    photo = EvidenceImage(id="rotated", base64_data=base64.b64encode(payload).decode("utf-8"))
+    detector = DuplicateDetector(MediaLoader(), LocalStateStore(tmp_path / "duplicates.db"), duplicate_config)
+
+    loaded = CaseMediaContext(detector.loader).get(photo)
+
+    assert loaded.frame.shape[:2] == (200, 120)  # OpenCV applied the orientation
+    assert detector._hash_media(loaded) == str(imagehash.phash(Image.open(BytesIO(payload))))
@@ -0,0 +1,82 @@
+"""Tests for the fixed-schema feature engineer."""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from pathlib import Path
+
+import xgboost as xgb
+
+from app.config import fraud_rule_config
+from app.schemas import EvidencePackage, ImageQualityResult
+from app.services.feature_engineering import FEATURE_NAMES, FeatureEngineer
+from app.utils.state import LocalStateStore
+
+BASELINE = Path(__file__).resolve().parents[1] / "models" / "baseline.json"
+
+
+def _package(**extra) -> EvidencePackage:
+    return EvidencePackage.model_validate(
+        {
+            "case_id": "FE-1",
+            "metadata": {
+                "case_id": "FE-1",
+                "applicant_id": "APP-FE",
+                "declared_loan_amount": 100000,
+                "submission_device_id": "dev-1",
+                "submission_timestamp": datetime(2025, 6, 1, 23, 0).isoformat(),
+                "applicant_history": {"previous_rejections": 2, "submitted_cases": 5},
+            },
+            **extra,
+        }
+    )
+
+
+def _quality(image_id: str, score: float) -> ImageQualityResult:
+    return ImageQualityResult(
+        image_id=image_id,
+        quality_score=score,
+        blur_variance=150.0,
+        brightness=120.0,
+        contrast=40.0,
+        resolution_ok=True,
+    )
+
+
+def test_schema_matches_the_trained_booster() -> None:
+    booster = xgb.Booster()
+    booster.load_model(str(BASELINE))
+
+    assert tuple(booster.feature_names) == FEATURE_NAMES
+
+
+def test_feature_values(tmp_path) -> None:
+    engineer = FeatureEngineer(LocalStateStore(tmp_path / "state.db"), fraud_rule_config)
+    package = _package(timestamps=[datetime(2025, 6, 1, 9), datetime(2025, 6, 1, 13)])
+
+    vector = engineer.build_feature_vector(package, [_quality("a", 0.9), _quality("b", 0.3)], [], [], [])
+    features = vector.features
+
+    assert math.isclose(features["avg_quality_score"], 0.6)
+    assert features["low_quality_ratio"] == 0.5
+    assert features["asset_match_rate"] == 0.5
+    assert features["duplicate_ratio"] == 0.0
+    assert features["submission_hour_std"] == 2.0
+    assert features["off_hours_flag"] == 1.0
+    assert features["submission_hour"] == 23.0
+    assert features["device_usage_count"] == 1.0
+    assert features["historical_rejections"] == 2.0
+    assert features["total_cases"] == 5.0
+    assert vector.explanation_fields["quality_summary"] == features["avg_quality_score"]
+
+
+def test_features_without_evidence_are_left_missing(tmp_path) -> None:
+    engineer = FeatureEngineer(LocalStateStore(tmp_path / "state.db"), fraud_rule_config)
+
+    row, vector = engineer.build_features(_package(), [], [], [], [])
+
+    missing = {name for name, value in zip(FEATURE_NAMES, row) if math.isnan(value)}
+    assert missing == {"low_quality_ratio", "asset_declared"}
+    assert set(vector.features) == set(FEATURE_NAMES) - missing
+    assert engineer.build_feature_array(_package(), [], [], [], []).shape == (len(FEATURE_NAMES),)
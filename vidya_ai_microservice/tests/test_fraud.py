@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 
+import numpy as np
+import xgboost as xgb
+
 from app.config import fraud_rule_config
 from app.schemas import FraudFeatureVector
+from app.services.feature_engineering import FEATURE_NAMES
 from app.services.fraud_model import FraudScoringService
+from app.services.model_registry import column_map
 
 
 def test_fraud_rules_apply_penalties(tmp_path) -> None:
@@ -26,4 +33,93 @@ def test_fraud_rules_apply_penalties(tmp_path) -> None:
     assert "gps_deviation" in result.rule_penalties
     assert "device_reuse" in result.rule_penalties
     assert "history_flags" in result.rule_penalties
-*** End of File**
\ No newline at end of file
+
+
+def _model_service(tmp_path: Path) -> FraudScoringService:
+    model_path = Path(__file__).resolve().parents[1] / "models" / "baseline.json"
+    (tmp_path / "baseline.json").write_bytes(model_path.read_bytes())
+    return FraudScoringService(model_dir=tmp_path, rules=fraud_rule_config)
+
+
+def _vector(case_id: str, seed: int, names) -> FraudFeatureVector:
+    values = np.random.default_rng(seed).random(len(names)) * 10
+    return FraudFeatureVector(case_id=case_id, features=dict(zip(names, values.tolist())), explanation_fields={})
+
+
+def test_model_columns_follow_booster_schema_not_dict_order(tmp_path) -> None:
+    service = _model_service(tmp_path)
+    vector = _vector("case-order", 1, service.feature_names)
+    shuffled = FraudFeatureVector(
+        case_id="case-order", features=dict(reversed(list(vector.features.items()))), explanation_fields={}
+    )
+
+    expected = float(
+        service.model.predict(
+            xgb.DMatrix(
+                np.array([[vector.features[name] for name in service.feature_names]], dtype=np.float32),
+                feature_names=list(service.feature_names),
+            )
+        )[0]
+    )
+
+    result = service.score(vector)
+    assert service.score(shuffled).fraud_score == result.fraud_score
+    assert result.model_version == "baseline"
+    expected_points = min(100.0, expected * 100 + sum(result.rule_penalties.values()))
+    assert abs(result.fraud_score - round(expected_points, 2)) < 1e-3
+
+
+def test_missing_features_are_scored_as_missing(tmp_path) -> None:
+    service = _model_service(tmp_path)
+    vector = FraudFeatureVector(case_id="case-sparse", features={"avg_quality_score": 0.9}, explanation_fields={})
+
+    result = service.score(vector)
+
+    assert 0.0 <= result.fraud_score <= 100.0
+    assert set(result.feature_importance) == set(service.feature_names)
+
+
+def test_feature_rows_score_like_their_vectors(tmp_path) -> None:
+    service = _model_service(tmp_path)
+    vector = _vector("case-row", 3, FEATURE_NAMES)
+    row = np.array([vector.features[name] for name in FEATURE_NAMES])
+
+    assert service.score(vector, row=row) == service.score(vector)
+
+    # A booster trained on another column order (or on a column the engineer
+    # does not produce) is filled through its precomputed column map.
+    names = tuple(reversed(FEATURE_NAMES[1:])) + ("unknown_feature",)
+    index, missing = column_map(names)
+    target = np.empty(len(names), dtype=np.float32)
+    reordered = replace(service.loaded, feature_names=names, column_index=index, missing_columns=missing)
+    FraudScoringService._fill(target, vector, row, reordered)
+    assert target[:-1].tolist() == np.float32([vector.features[name] for name in names[:-1]]).tolist()
+    assert np.isnan(target[-1])
+
+
+def test_score_batch_matches_single_scoring(tmp_path) -> None:
+    service = _model_service(tmp_path)
+    vectors = [_vector(f"case-{idx}", idx, FEATURE_NAMES) for idx in range(5)]
+    rows = np.array([[vector.features[name] for name in FEATURE_NAMES] for vector in vectors])
+
+    singles = [service.score(vector).fraud_score for vector in vectors]
+
+    assert [result.fraud_score for result in service.score_batch(vectors)] == singles
+    assert [result.fraud_score for result in service.score_batch(vectors, rows=rows)] == singles
+
+
+def test_batched_cases_share_one_booster_call(tmp_path) -> None:
+    service = _model_service(tmp_path)
+    batched = FraudScoringService(
+        model_dir=tmp_path, rules=fraud_rule_config, registry=service.registry, batch_window_ms=500, max_batch=3
+    )
+    calls = []
+    predict = batched.batcher.predict_fn
+    batched.batcher.predict_fn = lambda items: calls.append(len(items)) or predict(items)
+    vectors = [_vector(f"case-{idx}", idx, FEATURE_NAMES) for idx in range(3)]
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda vector: batched.score(vector, batched=True), vectors))
+
+    assert calls == [3]
+    assert results == [service.score(vector) for vector in vectors]
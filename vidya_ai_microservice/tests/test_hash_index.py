@@ -0,0 +1,36 @@
+"""Tests for the BK-tree Hamming-distance index."""
+
+from __future__ import annotations
+
+import random
+
+from app.utils.hash_index import HammingIndex, HashRecord, hamming_distance
+
+
+def test_query_matches_linear_scan() -> None:
+    rng = random.Random(11)
+    base = [rng.getrandbits(64) for _ in range(50)]
+    hashes = base + [value ^ (1 << rng.randrange(64)) for value in base]
+    index = HammingIndex()
+    records = [HashRecord(f"app-{i % 7}", f"ev-{i}", f"case-{i}", value) for i, value in enumerate(hashes)]
+    for record in records:
+        index.add(record)
+
+    probe = hashes[3] ^ 0b101
+    expected = sorted(
+        (hamming_distance(probe, record.hash_value), record.evidence_id)
+        for record in records
+        if hamming_distance(probe, record.hash_value) <= 5
+    )
+
+    assert sorted((distance, record.evidence_id) for distance, record in index.query(probe, 5)) == expected
+
+
+def test_re_recording_replaces_previous_hash() -> None:
+    index = HammingIndex()
+    index.add(HashRecord("app-1", "ev-1", "case-1", 0))
+    index.add(HashRecord("app-1", "ev-1", "case-2", (1 << 64) - 1))
+
+    assert index.query(0, 3) == []
+    assert [record.case_id for _, record in index.query((1 << 64) - 1, 0)] == ["case-2"]
+    assert len(index) == 1
@@ -0,0 +1,73 @@
+"""Tests for invoice field extraction and the identifiers fed to verification."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.schemas import OCRResult
+from app.services.invoice_parser import parse_invoice, parse_invoice_date
+from app.services.pipeline import _invoice_identifiers
+
+INVOICE = """TAX INVOICE
+Vendor: Green Fields Agro Rs 12 Traders
+GSTIN: 29BFBRJ8715S1ZE
+Invoice No: INV-2025-001
+Date: 05/01/2025
+Total: 4,85,000.00
+"""
+
+
+def test_parse_invoice_extracts_all_fields_with_line_hints() -> None:
+    fields = parse_invoice(INVOICE)
+
+    assert fields["vendor"] == "Green Fields Agro Rs 12 Traders"
+    assert fields["amount"] == 12.0  # first currency-marked amount, even inside the vendor line
+    assert fields["date"] == "05/01/2025"
+    assert fields["invoice_number"] == "INV-2025-001"
+    assert fields["gstin"] == "29BFBRJ8715S1ZE"
+    assert fields["line_hints"] == {"vendor": 1, "amount": 1, "date": 4, "invoice_number": 3, "gstin": 2}
+
+
+def test_parse_invoice_falls_back_to_total_and_rejects_embedded_gstin() -> None:
+    fields = parse_invoice("bill # B-77\nref X29BFBRJ8715S1ZE\ntotal 1,250.50\n")
+
+    assert fields["amount"] == 1250.5
+    assert fields["line_hints"]["amount"] == 2
+    assert fields["invoice_number"] == "B-77"
+    assert fields["gstin"] is None
+    assert fields["vendor"] is None and fields["date"] is None
+    assert parse_invoice("") == {
+        "vendor": None,
+        "amount": None,
+        "date": None,
+        "invoice_number": None,
+        "gstin": None,
+        "line_hints": {},
+    }
+
+
+def test_parse_invoice_date_formats() -> None:
+    assert parse_invoice_date("5/1/2025") == datetime(2025, 1, 5)
+    assert parse_invoice_date("05-01-2025") == datetime(2025, 1, 5)
+    assert parse_invoice_date("2025-01-05") == datetime(2025, 1, 5)
+    assert parse_invoice_date("05/01-2025") is None
+    assert parse_invoice_date("31/02/2025") is None
+    assert parse_invoice_date("05/01/25") is None
+
+
+def test_verification_prefers_ocr_identifiers_per_field() -> None:
+    ocr = [
+        OCRResult(doc_id="d1", raw_text="", ocr_confidence=0.5, parsed_fields={}, crosscheck_results={}),
+        OCRResult(
+            doc_id="d2",
+            raw_text="",
+            ocr_confidence=0.9,
+            parsed_fields={"invoice_number": "INV-9", "gstin": None},
+            crosscheck_results={},
+        ),
+    ]
+
+    values, sources = _invoice_identifiers(ocr, {"invoice_number": "INV-1", "gstin": "29BFBRJ8715S1ZE"})
+
+    assert values == {"invoice_number": "INV-9", "gstin": "29BFBRJ8715S1ZE"}
+    assert sources == {"invoice_number": "ocr", "gstin": "metadata"}
@@ -0,0 +1,41 @@
+"""Tests for deferred loading of optional backends."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from app.utils.lazy_import import LazyModule, dependency_status, import_timings, optional_module
+
+
+def test_availability_is_answered_without_importing(tmp_path, monkeypatch) -> None:
+    (tmp_path / "vidya_fake_backend.py").write_text("VALUE = 42\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = optional_module("vidya_fake_backend", label="fake_backend")
+
+    assert dependency_status()["fake_backend"] is True
+    assert "vidya_fake_backend" not in sys.modules
+    assert "fake_backend" not in import_timings()
+
+    assert module.VALUE == 42
+    assert "vidya_fake_backend" in sys.modules
+    assert import_timings()["fake_backend"] >= 0.0
+    assert optional_module("vidya_fake_backend") is module
+
+
+def test_missing_backend_behaves_like_none() -> None:
+    module = LazyModule("vidya_not_installed_backend")
+
+    assert module.available() is False
+    assert not module
+    assert module.loaded and module.load() is None
+    with pytest.raises(ImportError):
+        module.anything()
+
+
+def test_attribute_imports_resolve_to_the_named_object() -> None:
+    dumps = LazyModule("json", "dumps")
+
+    assert dumps({"a": 1}) == '{"a": 1}'
+    assert dumps.available() is True
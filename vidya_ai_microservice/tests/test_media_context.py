@@ -0,0 +1,79 @@
+"""Tests for the shared per-case media context."""
+
+from __future__ import annotations
+
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from app.config import detection_config, duplicate_config, quality_config
+from app.schemas import EvidenceImage
+from app.services.hashing import DuplicateDetector
+from app.services.object_detection import ObjectDetectionService
+from app.services.quality import ImageQualityAnalyzer
+from app.utils.media_context import CaseMediaContext
+from app.utils.media_loader import MediaLoader, MediaLoaderError
+from app.utils.state import LocalStateStore
+
+
+class CountingLoader(MediaLoader):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def _resolve_payload(self, evidence):
+        self.calls += 1
+        return super()._resolve_payload(evidence)
+
+
+def _image_base64() -> str:
+    frame = np.random.default_rng(7).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buffer).decode("utf-8")
+
+
+def test_layers_share_one_load_per_item(tmp_path) -> None:
+    loader = CountingLoader()
+    media = CaseMediaContext(loader)
+    images = [
+        EvidenceImage(id="img-1", base64_data=_image_base64(), declared_asset_type="tractor"),
+        EvidenceImage(id="img-2", base64_data=_image_base64(), declared_asset_type="tractor"),
+    ]
+
+    ImageQualityAnalyzer(loader, quality_config).analyze_batch(images, media)
+    ObjectDetectionService(loader, detection_config).analyze(images, "tractor", media)
+    DuplicateDetector(loader, LocalStateStore(tmp_path / "state.json"), duplicate_config).evaluate_images(
+        images, applicant_id="app-1", case_id="case-1", media=media
+    )
+
+    assert loader.calls == len(images)
+    loaded = media.get(images[0])
+    assert loaded.frame is loaded.frame
+    assert loaded.luma is loaded.luma
+    assert loaded.luma.shape == (480, 640)
+    assert loaded.image.size == (640, 480)
+
+
+def test_load_failures_are_cached() -> None:
+    loader = CountingLoader()
+    media = CaseMediaContext(loader)
+    missing = EvidenceImage(id="missing", file_path="/nonexistent/evidence.jpg")
+
+    for _ in range(2):
+        with pytest.raises(MediaLoaderError):
+            media.get(missing)
+
+    assert loader.calls == 1
+
+
+def test_undecodable_payload_fails_every_view() -> None:
+    media = CaseMediaContext(MediaLoader())
+    loaded = media.get(EvidenceImage(id="junk", base64_data=base64.b64encode(b"not an image").decode("ascii")))
+
+    for _ in range(2):
+        with pytest.raises(MediaLoaderError):
+            loaded.luma
+    with pytest.raises(MediaLoaderError):
+        loaded.frame
@@ -0,0 +1,96 @@
+"""Tests for size limits and disk spooling in the media loader."""
+
+from __future__ import annotations
+
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+
+from app.schemas import EvidenceImage
+from app.utils.media_loader import MediaLoader, MediaLoaderError
+
+PAYLOAD = bytes(range(256)) * 64  # 16 KiB
+
+
+@pytest.fixture
+def media_server() -> Iterator[str]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            self.send_response(200)
+            if self.path == "/sized":
+                self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_small_payloads_stay_in_memory() -> None:
+    loader = MediaLoader(spool_threshold=len(PAYLOAD) * 2)
+    encoded = base64.b64encode(PAYLOAD).decode()
+
+    payload = loader.load_image_bytes(EvidenceImage(id="img", base64_data=encoded))
+
+    assert isinstance(payload, bytes)
+    assert payload == PAYLOAD
+
+
+def test_large_base64_is_spooled_to_mmap() -> None:
+    loader = MediaLoader(spool_threshold=1024)
+    encoded = base64.b64encode(PAYLOAD).decode()
+
+    payload = loader.load_image_bytes(EvidenceImage(id="img", base64_data=encoded))
+
+    assert isinstance(payload, memoryview)
+    assert payload.readonly
+    assert payload.tobytes() == PAYLOAD
+
+
+def test_large_file_is_memory_mapped(tmp_path) -> None:
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(PAYLOAD)
+
+    payload = MediaLoader(spool_threshold=1024).load_image_bytes(EvidenceImage(id="img", file_path=str(path)))
+
+    assert isinstance(payload, memoryview)
+    assert payload.tobytes() == PAYLOAD
+
+
+def test_oversized_file_is_rejected(tmp_path) -> None:
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(PAYLOAD)
+
+    with pytest.raises(MediaLoaderError):
+        MediaLoader(max_bytes=1024).load_image_bytes(EvidenceImage(id="img", file_path=str(path)))
+
+
+def test_invalid_base64_raises_loader_error() -> None:
+    with pytest.raises(MediaLoaderError):
+        MediaLoader().load_image_bytes(EvidenceImage(id="img", base64_data="abc"))
+
+
+def test_download_streams_and_spools(media_server: str) -> None:
+    loader = MediaLoader(spool_threshold=1024)
+
+    payload = loader.load_image_bytes(EvidenceImage(id="img", url=f"{media_server}/stream"))
+
+    assert isinstance(payload, memoryview)
+    assert payload.tobytes() == PAYLOAD
+
+
+@pytest.mark.parametrize("path", ["/sized", "/stream"])
+def test_download_aborts_past_max_bytes(media_server: str, path: str) -> None:
+    loader = MediaLoader(max_bytes=4096)
+
+    with pytest.raises(MediaLoaderError):
+        loader.load_image_bytes(EvidenceImage(id="img", url=f"{media_server}{path}"))
@@ -0,0 +1,67 @@
+"""Tests for the metrics registry and pipeline instrumentation."""
+
+from __future__ import annotations
+
+import base64
+
+import cv2
+import numpy as np
+
+from app.schemas import EvidencePackage
+from app.utils.metrics import REGISTRY, STAGE_SECONDS, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency", ("stage",), buckets=(0.1, 1.0))
+    errors = registry.counter("demo_errors_total", "Demo errors", ("kind",))
+
+    latency.observe(0.05, stage="ocr")
+    latency.observe(0.5, stage="ocr")
+    latency.observe(5.0, stage="ocr")
+    errors.inc(kind='bad "input"')
+
+    text = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="ocr",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="ocr",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="ocr",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="ocr"} 3' in text
+    assert 'demo_errors_total{kind="bad \\"input\\""} 1.0' in text
+
+
+def test_drained_deltas_merge_into_another_registry() -> None:
+    worker, server = MetricsRegistry(), MetricsRegistry()
+    for registry in (worker, server):
+        registry.histogram("demo_seconds", "Demo latency")
+        registry.counter("demo_total", "Demo count", ("layer",))
+    worker._metrics["demo_seconds"].observe(0.2)
+    worker._metrics["demo_total"].inc(2, layer="quality")
+
+    server.merge(worker.drain())
+
+    assert server._metrics["demo_seconds"].count() == 1
+    assert server._metrics["demo_total"].value(layer="quality") == 2
+    assert worker.drain() == {}
+
+
+def test_pipeline_records_stage_latency(scratch_pipeline) -> None:
+    pipeline = scratch_pipeline
+    _, buffer = cv2.imencode(".jpg", np.random.default_rng(1).integers(0, 255, (240, 320, 3), dtype=np.uint8))
+    package = EvidencePackage.model_validate(
+        {
+            "case_id": "MET-1",
+            "asset_images": [{"id": "a1", "base64_data": base64.b64encode(buffer).decode("utf-8")}],
+            "metadata": {"case_id": "MET-1", "applicant_id": "APP-MET", "declared_loan_amount": 100000},
+        }
+    )
+    before = STAGE_SECONDS.count(stage="quality")
+
+    response = pipeline.score_case(package)
+
+    assert STAGE_SECONDS.count(stage="quality") == before + 1
+    assert {"quality", "ocr", "features", "state_commit"} <= set(response.timings)
+    text = REGISTRY.render()
+    assert 'vidya_item_seconds_count{layer="quality"}' in text
+    assert 'vidya_detection_results_total{mode=' in text
@@ -0,0 +1,81 @@
+"""Tests for the fraud model registry and shadow scoring."""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+from app.config import fraud_rule_config
+from app.schemas import FraudFeatureVector
+from app.services.fraud_model import FraudScoringService
+from app.services.model_registry import ModelRegistry
+
+BASELINE = Path(__file__).resolve().parents[1] / "models" / "baseline.json"
+
+
+def _deploy(folder: Path, version: str) -> Path:
+    path = folder / f"{version}.json"
+    path.write_bytes(BASELINE.read_bytes())
+    return path
+
+
+def _vector() -> FraudFeatureVector:
+    return FraudFeatureVector(case_id="case-1", features={"gps_deviation_km": 0.2}, explanation_fields={})
+
+
+def test_refresh_swaps_in_newer_versions(tmp_path) -> None:
+    _deploy(tmp_path, "2025-01-01")
+    registry = ModelRegistry(tmp_path)
+    service = FraudScoringService(tmp_path, fraud_rule_config, registry=registry)
+    assert service.score(_vector()).model_version == "2025-01-01"
+
+    assert registry.refresh() is False
+    _deploy(tmp_path, "2025-02-01")
+
+    assert registry.refresh() is True
+    assert service.score(_vector()).model_version == "2025-02-01"
+
+
+def test_broken_upload_keeps_serving_current_model(tmp_path) -> None:
+    _deploy(tmp_path, "v1")
+    registry = ModelRegistry(tmp_path)
+    broken = tmp_path / "v2.json"
+    broken.write_text("{ half written", encoding="utf-8")
+
+    registry.refresh()
+
+    assert registry.live.version == "v1"
+    assert "v2" in registry.load_errors
+
+    _deploy(tmp_path, "v2")
+    os.utime(broken, ns=(1, 1))  # make sure the listing changes even on coarse clocks
+    registry.refresh()
+
+    assert registry.live.version == "v2"
+    assert registry.load_errors == {}
+
+
+def test_pinned_live_version_ignores_newer_files(tmp_path) -> None:
+    _deploy(tmp_path, "v1")
+    _deploy(tmp_path, "v2")
+
+    registry = ModelRegistry(tmp_path, live_version="v1", shadow_version="latest")
+
+    assert registry.live.version == "v1"
+    assert registry.shadow.version == "v2"
+
+
+def test_shadow_scores_are_logged_not_returned(tmp_path, caplog) -> None:
+    _deploy(tmp_path, "v1")
+    _deploy(tmp_path, "v2")
+    live_only = FraudScoringService(tmp_path, fraud_rule_config, registry=ModelRegistry(tmp_path, live_version="v1"))
+    with_shadow = FraudScoringService(
+        tmp_path, fraud_rule_config, registry=ModelRegistry(tmp_path, live_version="v1", shadow_version="v2")
+    )
+
+    with caplog.at_level(logging.INFO, logger="app.services.fraud_model"):
+        result = with_shadow.score(_vector())
+
+    assert result == live_only.score(_vector())
+    assert any("shadow_version=v2" in record.getMessage() for record in caplog.records)
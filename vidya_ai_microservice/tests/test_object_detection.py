@@ -37,3 +37,65 @@ def test_detection_flags_mismatch_with_unknown_asset() -> None:
 
     assert result.asset_match is False
     assert result.asset_match_score == 0.0
+
+
+class _FakeBox:
+    def __init__(self, cls_id: int, conf: float) -> None:
+        self.cls = np.array([cls_id])
+        self.conf = np.array([conf])
+        self.xyxy = np.array([[1.0, 2.0, 30.0, 40.0]])
+
+
+class _FakeResult:
+    def __init__(self, boxes) -> None:
+        self.boxes = boxes
+
+
+class _FakeYOLO:
+    names = {0: "tractor", 1: "person"}
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def predict(self, source, **kwargs):
+        self.calls.append(len(source))
+        return [_FakeResult([_FakeBox(0, 0.9), _FakeBox(1, 0.6)]) for _ in source]
+
+
+def _service_with_fake_model(**kwargs) -> ObjectDetectionService:
+    service = ObjectDetectionService(MediaLoader(), detection_config, model_path=None, **kwargs)
+    service.model = _FakeYOLO()
+    return service
+
+
+def test_detection_batches_all_case_images_into_one_call() -> None:
+    service = _service_with_fake_model()
+    images = [
+        EvidenceImage(id=f"img-{idx}", base64_data=_blank_image_base64(), declared_asset_type="tractor")
+        for idx in range(3)
+    ]
+    broken = EvidenceImage(id="broken", file_path="/nonexistent.jpg")
+
+    results = service.analyze(images[:2] + [broken] + images[2:], declared_asset="tractor")
+
+    assert service.model.calls == [3]
+    assert [result.image_id for result in results] == ["img-0", "img-1", "broken", "img-2"]
+    assert results[0].asset_match is True
+    assert results[0].details["matched_label"] == "tractor"
+    assert "error" in results[2].details
+
+
+def test_micro_batcher_merges_concurrent_cases() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.services.detection_batcher import MicroBatcher
+
+    service = _service_with_fake_model()
+    service.batcher = MicroBatcher(service._predict_frames, window_ms=200, max_batch=8)
+    images = [EvidenceImage(id=f"img-{idx}", base64_data=_blank_image_base64()) for idx in range(4)]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        outputs = list(pool.map(lambda batch: service.analyze(batch, "tractor"), [images[:2], images[2:]]))
+
+    assert service.model.calls == [4]
+    assert [len(output) for output in outputs] == [2, 2]
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 
 import pytest
 
@@ -48,3 +48,17 @@ def test_ocr_crosscheck_accepts_close_amount_and_date(ocr_service: DocumentOCRSe
     assert crosscheck["vendor_match"] is True
     assert crosscheck["amount_match"] is True
     assert crosscheck["date_match"] is True
+
+
+def test_ocr_crosscheck_accepts_timezone_aware_declared_date(ocr_service: DocumentOCRService) -> None:
+    parsed = {"vendor": "Trusted Vendor", "amount": 100000.0, "date": "05/01/2025"}
+    penalties, crosscheck = ocr_service._crosscheck(
+        parsed,
+        declared_vendor="Trusted Vendor",
+        declared_amount=100000.0,
+        declared_date=datetime(2025, 1, 5, tzinfo=timezone.utc),
+        confidence=0.95,
+    )
+
+    assert "date_mismatch" not in penalties
+    assert crosscheck["date_match"] is True
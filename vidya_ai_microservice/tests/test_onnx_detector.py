@@ -0,0 +1,83 @@
+"""Tests for the ONNX Runtime detection backend."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services.onnx_detector import letterbox, postprocess
+
+NAMES = {0: "tractor", 1: "person"}
+
+
+def _head(anchors):
+    """Build a (4 + classes, anchors) YOLOv8 head from (cx, cy, w, h, cls, score) tuples."""
+    output = np.zeros((4 + len(NAMES), len(anchors)), dtype=np.float32)
+    for idx, (cx, cy, w, h, cls_id, score) in enumerate(anchors):
+        output[:4, idx] = (cx, cy, w, h)
+        output[4 + cls_id, idx] = score
+    return output
+
+
+def test_postprocess_runs_class_aware_nms_and_unpads() -> None:
+    output = _head(
+        [
+            (150, 230, 100, 100, 0, 0.9),
+            (155, 232, 100, 100, 0, 0.7),  # suppressed by the 0.9 tractor
+            (150, 230, 100, 100, 1, 0.8),  # same box, other class: kept
+            (400, 400, 50, 50, 0, 0.2),  # under the confidence threshold
+        ]
+    )
+
+    detections = postprocess(output, 0.45, 0.4, gain=1.0, pad=(0, 80), original_shape=(480, 640), names=NAMES)
+
+    assert [(label, round(conf, 2)) for label, conf, _ in detections] == [("tractor", 0.9), ("person", 0.8)]
+    assert detections[0][2] == pytest.approx([100.0, 100.0, 200.0, 200.0])
+
+
+def test_letterbox_pads_to_model_size() -> None:
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    boxed, gain, pad = letterbox(frame, (320, 320))
+
+    assert boxed.shape == (320, 320, 3)
+    assert gain == pytest.approx(0.5)
+    assert pad == (0, 40)
+    assert boxed[0, 0, 0] == 114
+
+
+def test_detector_runs_exported_graph(tmp_path) -> None:
+    pytest.importorskip("onnxruntime")
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper
+
+    from app.services.onnx_detector import OnnxYoloDetector
+
+    head = _head([(32, 32, 20, 20, 0, 0.9)])[None]
+    graph = helper.make_graph(
+        [
+            helper.make_node("ReduceMean", ["images"], ["mean"], axes=[1, 2, 3], keepdims=1),
+            helper.make_node("Mul", ["mean", "zero"], ["scaled"]),
+            helper.make_node("Reshape", ["scaled", "shape"], ["flat"]),
+            helper.make_node("Add", ["flat", "head"], ["output0"]),
+        ],
+        "fake-yolo",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, 64, 64])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 6, 1])],
+        initializer=[
+            helper.make_tensor("zero", TensorProto.FLOAT, [], [0.0]),
+            helper.make_tensor("shape", TensorProto.INT64, [3], [-1, 1, 1]),
+            helper.make_tensor("head", TensorProto.FLOAT, head.shape, head.flatten().tolist()),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    helper.set_model_props(model, {"names": repr(NAMES)})
+    path = tmp_path / "fake.onnx"
+    onnx.save(model, str(path))
+
+    detector = OnnxYoloDetector(path, intra_op_threads=1)
+    frames = [np.zeros((64, 64, 3), dtype=np.uint8), np.zeros((128, 128, 3), dtype=np.uint8)]
+    outputs = detector.detect(frames, conf=0.45, iou=0.4, max_batch=8)
+
+    assert [[label for label, _, _ in detections] for detections in outputs] == [["tractor"], ["tractor"]]
+    assert outputs[1][0][2] == pytest.approx([44.0, 44.0, 84.0, 84.0])
@@ -0,0 +1,92 @@
+"""Tests for vectorized aggregation and portfolio what-if re-tiering."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from app.config import ThresholdConfig, WeightConfig
+from app.schemas import DuplicateResult, FraudScoreResult, ImageQualityResult, ObjectDetectionResult, OCRResult
+from app.services.aggregation import RISK_TIERS, RiskAggregator
+from app.services.portfolio import RiskPortfolio
+from app.utils.state import CASE_RISK_COMPONENTS, LocalStateStore
+
+
+def _case_inputs(rng: random.Random) -> dict:
+    return {
+        "quality": [ImageQualityResult(
+            image_id="img", quality_score=rng.random(), blur_variance=0.0, brightness=0.0, contrast=0.0,
+            resolution_ok=True, flags=[], officer_review_flag=False,
+        )],
+        "detection": [ObjectDetectionResult(
+            image_id="img", detected_objects=[], asset_match=True, asset_match_score=rng.random(),
+            match_score=1.0, details={},
+        )],
+        "ocr_results": [OCRResult(
+            doc_id="doc", raw_text="", ocr_confidence=0.9, parsed_fields={}, crosscheck_results={},
+            penalties={"amount_mismatch": rng.uniform(0, 40)}, match_score=0.9,
+        )],
+        "duplicates": [DuplicateResult(
+            evidence_id="dup", duplicate_found=False, hash_distance=0, reference_case_id=None,
+            penalty_points=rng.choice([0.0, 15.0, 30.0]),
+        )],
+        "fraud_score": FraudScoreResult(
+            fraud_score=rng.uniform(0, 100), model_version="rules", feature_importance={}, rule_penalties={},
+        ),
+    }
+
+
+def test_score_columns_matches_aggregate(aggregator: RiskAggregator) -> None:
+    rng = random.Random(7)
+    results = [aggregator.aggregate(**_case_inputs(rng)) for _ in range(300)]
+    components = np.array([[result["components"][name] for result in results] for name in CASE_RISK_COMPONENTS])
+
+    scores, tiers = aggregator.score_columns(components)
+
+    assert scores.tolist() == [result["final_risk_score"] for result in results]
+    assert [RISK_TIERS[tier] for tier in tiers] == [result["risk_tier"] for result in results]
+
+
+def test_portfolio_tracks_rescores_and_other_writers(tmp_path) -> None:
+    path = tmp_path / "state.db"
+    store = LocalStateStore(path)
+    portfolio = RiskPortfolio(store, initial_capacity=2)
+    store.record_case_risk("case-1", [10, 10, 0, 0, 10], verification_failed=False)
+    store.record_case_risk("case-2", [50, 50, 40, 30, 50], verification_failed=True)
+    assert portfolio.sync() == 2
+
+    # A worker process writing to the same file, including a rescore of case-1.
+    other = LocalStateStore(path)
+    other.record_case_risk("case-1", [20, 20, 0, 0, 20], verification_failed=False)
+    for idx in range(5):
+        other.record_case_risk(f"case-{idx + 3}", [90, 90, 90, 90, 90], verification_failed=False)
+
+    components, failed = portfolio.columns()
+    assert len(portfolio) == 7
+    assert components[:, 0].tolist() == [20, 20, 0, 0, 20]
+    assert failed.tolist() == [False, True, False, False, False, False, False]
+
+
+def test_simulate_reports_tier_migrations(tmp_path) -> None:
+    store = LocalStateStore(tmp_path / "state.db")
+    aggregator = RiskAggregator(WeightConfig(), ThresholdConfig(auto_approve_threshold=30, officer_review_threshold=60))
+    store.record_case_risk("low", [10, 10, 10, 10, 10], verification_failed=True)
+    store.record_case_risk("mid", [40, 40, 40, 40, 40], verification_failed=False)
+    store.record_case_risk("fraud", [0, 0, 0, 0, 90], verification_failed=False)
+    portfolio = RiskPortfolio(store)
+
+    unchanged = portfolio.simulate(aggregator, aggregator.weights)
+    assert unchanged["baseline"] == {"auto-approve": 1, "officer-review": 1, "video-verify": 1}
+    assert unchanged["migrations"] == {tier: {} for tier in RISK_TIERS}
+
+    result = portfolio.simulate(
+        aggregator,
+        aggregator.weights,
+        ThresholdConfig(auto_approve_threshold=50, officer_review_threshold=60),
+        verification_knockout=True,
+    )
+    assert result["cases"] == 3
+    assert result["simulated"] == {"auto-approve": 1, "officer-review": 0, "video-verify": 2}
+    assert result["migrations"]["auto-approve"] == {"video-verify": 1}
+    assert result["migrations"]["officer-review"] == {"auto-approve": 1}
@@ -0,0 +1,83 @@
+"""Tests for the process-pool execution tier."""
+
+from __future__ import annotations
+
+import base64
+
+import cv2
+import numpy as np
+
+from app import config
+from app.schemas import EvidencePackage
+from app.services.config_store import ConfigStore
+from app.services.process_pool import ProcessPoolScorer, pack_package
+
+
+def _image_base64(seed: int) -> str:
+    frame = np.random.default_rng(seed).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buffer).decode("utf-8")
+
+
+def _package() -> EvidencePackage:
+    return EvidencePackage.model_validate(
+        {
+            "case_id": "POOL-1",
+            "asset_images": [{"id": "a1", "base64_data": _image_base64(1)}, {"id": "dup", "base64_data": _image_base64(2)}],
+            "doc_images": [{"id": "dup", "base64_data": _image_base64(3)}],
+            "metadata": {"case_id": "POOL-1", "applicant_id": "APP-POOL", "declared_loan_amount": 100000},
+        }
+    )
+
+
+class _ServerPipeline:
+    def __init__(self, config_path) -> None:
+        seed = {
+            "weights": config.weight_config,
+            "thresholds": config.threshold_config,
+            "quality": config.quality_config,
+            "detection": config.detection_config,
+            "ocr": config.ocr_config,
+            "duplicates": config.duplicate_config,
+            "fraud_rules": config.fraud_rule_config,
+        }
+        self.config_store = ConfigStore(config_path, seed)
+        self.config = self.config_store.update(weights={"fraud_score_weight": 0.5})
+
+
+def test_pack_package_moves_payloads_into_shared_memory() -> None:
+    package = _package()
+
+    stripped, block, segments = pack_package(package)
+    try:
+        offset, length = segments["a1"]
+        assert bytes(block.buf[offset : offset + length]) == base64.b64decode(package.asset_images[0].base64_data)
+        assert stripped.asset_images[0].base64_data is None
+        # "dup" names two different payloads, so both stay inline.
+        assert "dup" not in segments
+        assert stripped.asset_images[1].base64_data == package.asset_images[1].base64_data
+        assert stripped.doc_images[0].base64_data == package.doc_images[0].base64_data
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_worker_scores_case_from_shared_memory(tmp_path, monkeypatch) -> None:
+    # Spawned workers read their settings from the environment.
+    monkeypatch.setenv("DUPLICATE_STATE_PATH", str(tmp_path / "state.db"))
+    monkeypatch.setenv("LEGACY_STATE_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.setenv("RUNTIME_CONFIG_PATH", str(tmp_path / "runtime_config.db"))
+    monkeypatch.setenv("VERIFICATION_REGISTRY_PATH", str(tmp_path / "verification_registry.db"))
+    monkeypatch.setenv("VERIFICATION_SEED_DEMO", "true")
+    scorer = ProcessPoolScorer(_ServerPipeline(tmp_path / "runtime_config.db"), max_workers=1)
+    try:
+        assert len(scorer.start()) == 1
+        response = scorer.score_case(_package())
+    finally:
+        scorer.shutdown()
+
+    assert response.case_id == "POOL-1"
+    # The worker scored under the version the server forwarded, not its file seed.
+    assert response.config_version == 2
+    assert [result.image_id for result in response.scores.image_quality] == ["a1", "dup", "dup"]
+    assert all(result.blur_variance > 0 for result in response.scores.image_quality)
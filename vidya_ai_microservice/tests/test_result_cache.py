@@ -0,0 +1,60 @@
+"""Tests for the content-addressed layer result cache."""
+
+from __future__ import annotations
+
+import base64
+
+import cv2
+import numpy as np
+
+from app.config import QualityConfig, quality_config
+from app.schemas import EvidenceImage
+from app.services.quality import ImageQualityAnalyzer
+from app.utils.media_loader import MediaLoader
+from app.utils.result_cache import ResultCache, config_fingerprint
+
+
+def _image_base64(seed: int) -> str:
+    frame = np.random.default_rng(seed).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buffer).decode("utf-8")
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    cache = ResultCache(max_entries=2)
+    cache.put("phash", "a", "", "1")
+    cache.put("phash", "b", "", "2")
+    assert cache.get("phash", "a") == "1"
+    cache.put("phash", "c", "", "3")
+
+    assert cache.get("phash", "b") is None
+    assert cache.get("phash", "a") == "1"
+    assert cache.hits["phash"] == 2
+    assert cache.misses["phash"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path) -> None:
+    ResultCache(max_entries=1, disk_dir=tmp_path).put("ocr_text", "digest", "", {"text": "Total: 10", "confidence": 0.9})
+
+    restarted = ResultCache(max_entries=1, disk_dir=tmp_path)
+
+    assert restarted.get("ocr_text", "digest") == {"text": "Total: 10", "confidence": 0.9}
+
+
+def test_quality_results_are_reused_for_identical_bytes() -> None:
+    cache = ResultCache()
+    analyzer = ImageQualityAnalyzer(MediaLoader(), quality_config, cache=cache)
+    payload = _image_base64(3)
+
+    first = analyzer.analyze_batch([EvidenceImage(id="upload-1", base64_data=payload)])[0]
+    second = analyzer.analyze_batch([EvidenceImage(id="upload-2", base64_data=payload)])[0]
+
+    assert cache.hits["quality"] == 1
+    assert second.image_id == "upload-2"
+    assert second.model_dump(exclude={"image_id"}) == first.model_dump(exclude={"image_id"})
+
+
+def test_config_change_invalidates_cached_results() -> None:
+    stricter = QualityConfig(**{**quality_config.model_dump(), "blur_variance_threshold": 10_000.0})
+
+    assert config_fingerprint(quality_config) != config_fingerprint(stricter)
@@ -21,4 +21,3 @@ def test_high_risk_video_verify(aggregator: RiskAggregator, high_risk_case):
     result = aggregator.aggregate(**high_risk_case)
     assert result["risk_tier"] == "video-verify"
     assert result["final_risk_score"] >= 70
-*** End of File**
\ No newline at end of file
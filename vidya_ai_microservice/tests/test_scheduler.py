@@ -0,0 +1,59 @@
+"""Tests for the concurrent pipeline stage scheduler."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.services.scheduler import Stage, StageScheduler
+
+
+def test_independent_stages_overlap() -> None:
+    scheduler = StageScheduler(max_workers=3)
+
+    def sleeper(_):
+        time.sleep(0.1)
+        return "done"
+
+    started = time.perf_counter()
+    run = scheduler.run([Stage("a", sleeper), Stage("b", sleeper), Stage("c", sleeper)])
+    elapsed = time.perf_counter() - started
+
+    assert run.results == {"a": "done", "b": "done", "c": "done"}
+    assert elapsed < 0.25
+    assert set(run.timings) == {"a", "b", "c"}
+    assert all(value >= 90 for value in run.timings.values())
+
+
+def test_dependent_stage_receives_upstream_results() -> None:
+    scheduler = StageScheduler(max_workers=2)
+
+    run = scheduler.run(
+        [
+            Stage("sum", lambda done: done["left"] + done["right"], depends_on=("left", "right")),
+            Stage("left", lambda _: 2),
+            Stage("right", lambda _: 3),
+        ]
+    )
+
+    assert run.results["sum"] == 5
+
+
+def test_cycles_and_unknown_dependencies_are_rejected() -> None:
+    scheduler = StageScheduler(max_workers=1)
+
+    with pytest.raises(ValueError):
+        scheduler.run([Stage("a", lambda _: 1, depends_on=("b",)), Stage("b", lambda _: 1, depends_on=("a",))])
+    with pytest.raises(ValueError):
+        scheduler.run([Stage("a", lambda _: 1, depends_on=("missing",))])
+
+
+def test_stage_errors_propagate() -> None:
+    scheduler = StageScheduler(max_workers=2)
+
+    def boom(_):
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        scheduler.run([Stage("ok", lambda _: 1), Stage("boom", boom)])
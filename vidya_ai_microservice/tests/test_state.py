@@ -0,0 +1,173 @@
+"""Tests for the SQLite-backed local state store."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.utils.state import LocalStateStore
+
+# Server clock for the store: shortly after every submission in these tests.
+CLOCK = datetime(2025, 6, 2).timestamp
+
+
+def test_hashes_are_scoped_per_applicant_and_survive_reopen(tmp_path) -> None:
+    path = tmp_path / "state.db"
+    store = LocalStateStore(path, clock=CLOCK)
+    store.record_hash("app-1", "img-1", "ffff0000ffff0000", "case-1")
+    store.record_hash("app-2", "img-9", "0000ffff0000ffff", "case-9")
+    store.close()
+
+    reopened = LocalStateStore(path, clock=CLOCK)
+
+    assert reopened.list_hashes("app-1") == {"img-1": {"hash": "ffff0000ffff0000", "case_id": "case-1"}}
+    assert reopened.list_hashes("missing") == {}
+
+
+def test_device_usage_counts_events_inside_window(tmp_path) -> None:
+    store = LocalStateStore(tmp_path / "state.db", clock=CLOCK)
+    now = datetime(2025, 6, 1, 12, 0)
+
+    store.record_device_usage("dev-1", now - timedelta(days=10))
+    store.record_device_usage("dev-1", now - timedelta(days=2))
+    count = store.record_device_usage("dev-1", now)
+
+    assert count == 2
+    assert store.record_device_usage(None, now) == 0
+
+
+def test_batch_defers_commit_until_exit(tmp_path) -> None:
+    path = tmp_path / "state.db"
+    store = LocalStateStore(path, clock=CLOCK)
+    observer = LocalStateStore(path, clock=CLOCK)
+
+    with store.batch():
+        store.record_hash("app-1", "img-1", "ffff0000ffff0000", "case-1")
+        store.record_submission("app-1", datetime(2025, 6, 1, 12, 0))
+        assert observer.list_hashes("app-1") == {}
+
+    assert "img-1" in observer.list_hashes("app-1")
+
+
+def test_open_batch_holds_no_write_lock(tmp_path) -> None:
+    path = tmp_path / "state.db"
+    store = LocalStateStore(path, clock=CLOCK)
+    other = LocalStateStore(path, clock=CLOCK)  # e.g. another worker process
+    now = datetime(2025, 6, 1, 12, 0)
+
+    with store.batch():
+        store.record_hash("app-1", "img-1", "ffff0000ffff0000", "case-1")
+        assert store.record_device_velocity("dev-1", now)["cases_1h"] == 1
+        other.record_hash("app-2", "img-2", "0000ffff0000ffff", "case-2")
+        assert other.record_device_velocity("dev-1", now)["cases_1h"] == 1
+        assert store.record_submission("app-1", now) == 0.0
+
+    assert set(other.list_hashes("app-1")) == {"img-1"}
+    assert other.record_device_velocity("dev-1", now)["cases_1h"] == 3
+    assert other.record_submission("app-1", now + timedelta(minutes=5)) == 1.0
+
+
+def test_writes_wait_for_another_connection_to_commit(tmp_path) -> None:
+    path = tmp_path / "state.db"
+    store = LocalStateStore(path, clock=CLOCK)
+    worker = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+    worker.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.2, lambda: worker.execute("COMMIT")).start()
+
+    started = time.monotonic()
+    store.record_hash("app-1", "img-1", "ffff0000ffff0000", "case-1")
+
+    assert time.monotonic() - started >= 0.15
+    assert "img-1" in store.list_hashes("app-1")
+
+
+def test_legacy_json_state_is_imported_once(tmp_path) -> None:
+    legacy = tmp_path / "duplicates_state.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "devices": {"dev-1": {"events": ["2025-06-01T10:00:00"]}},
+                "applicants": {
+                    "app-1": {
+                        "timestamps": ["2025-06-01T09:00:00"],
+                        "hashes": {"img-1": {"hash": "ffff0000ffff0000", "case_id": "case-1"}},
+                    }
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    store = LocalStateStore(tmp_path / "state.db", legacy_json_path=legacy, clock=CLOCK)
+    store.close()
+    store = LocalStateStore(tmp_path / "state.db", legacy_json_path=legacy, clock=CLOCK)
+
+    assert store.list_hashes("app-1")["img-1"]["case_id"] == "case-1"
+    assert store.record_submission("app-1", datetime(2025, 6, 1, 10, 0)) == 1.0
+    assert store.record_device_usage("dev-1", datetime(2025, 6, 1, 12, 0)) == 2
+
+
+def test_device_velocity_windows_and_bounded_buckets(tmp_path) -> None:
+    store = LocalStateStore(tmp_path / "state.db", clock=CLOCK)
+    now = datetime(2025, 6, 1, 12, 30)
+
+    for offset in (timedelta(days=30), timedelta(days=3), timedelta(hours=5), timedelta(minutes=10)):
+        store.record_device_velocity("dev-1", now - offset)
+    velocity = store.record_device_velocity("dev-1", now)
+
+    assert velocity == {"cases_1h": 2, "cases_24h": 3, "cases_7d": 4}
+    (rows,) = store._conn.execute("SELECT COUNT(*) FROM device_buckets").fetchone()
+    assert rows == 3
+
+
+def test_future_submission_cannot_prune_other_devices(tmp_path) -> None:
+    store = LocalStateStore(tmp_path / "state.db", clock=CLOCK)
+    now = datetime.fromtimestamp(CLOCK())
+    for _ in range(5):
+        store.record_device_velocity("dev-a", now)
+
+    forged = store.record_device_velocity("dev-b", now + timedelta(days=365))
+    velocity = store.record_device_velocity("dev-a", now)
+
+    assert forged == {"cases_1h": 1, "cases_24h": 1, "cases_7d": 1}
+    assert velocity == {"cases_1h": 6, "cases_24h": 6, "cases_7d": 6}
+    (latest,) = store._conn.execute("SELECT MAX(bucket) FROM device_buckets").fetchone()
+    assert latest * 3600 <= CLOCK()
+
+
+def test_rapid_submission_ratio_uses_running_counters(tmp_path) -> None:
+    store = LocalStateStore(tmp_path / "state.db", clock=CLOCK)
+    start = datetime(2025, 6, 1, 8, 0)
+
+    assert store.record_submission("app-1", start) == 0.0
+    assert store.record_submission("app-1", start + timedelta(hours=1)) == 1.0
+    assert store.record_submission("app-1", start + timedelta(hours=6)) == 0.5
+    assert store.record_submission("app-2", start) == 0.0
+
+
+def test_event_tables_from_earlier_versions_are_folded_in(tmp_path) -> None:
+    path = tmp_path / "state.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(
+        """
+        CREATE TABLE device_events (device_id TEXT NOT NULL, ts REAL NOT NULL);
+        CREATE TABLE case_timestamps (applicant_id TEXT NOT NULL, ts TEXT NOT NULL);
+        """
+    )
+    now = datetime(2025, 6, 1, 12, 0)
+    conn.execute("INSERT INTO device_events VALUES ('dev-1', ?)", ((now - timedelta(days=1)).timestamp(),))
+    conn.executemany(
+        "INSERT INTO case_timestamps VALUES ('app-1', ?)", [("2025-06-01T11:00:00",), ("2025-06-01T09:00:00",)]
+    )
+    conn.commit()
+    conn.close()
+
+    store = LocalStateStore(path, clock=CLOCK)
+
+    assert store.record_device_usage("dev-1", now) == 2
+    assert store.record_submission("app-1", datetime(2025, 6, 1, 18, 0)) == 0.0
+    tables = {row[0] for row in store._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "device_events" not in tables and "case_timestamps" not in tables
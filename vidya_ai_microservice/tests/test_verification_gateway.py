@@ -0,0 +1,133 @@
+"""Tests for the async GSTN/CBS gateway against the local verification stub."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.mock_data import SANCTIONED_LOANS, VALID_GST_INVOICES
+from app.services.verification import VerificationService
+from app.services.verification_gateway import CircuitBreaker, GatewayUnavailable, VerificationGateway
+from app.stubs import VerificationStubServer
+
+INVOICE, INVOICE_RECORD = next(iter(VALID_GST_INVOICES.items()))
+APPLICANT, LOAN = next(iter(SANCTIONED_LOANS.items()))
+
+
+def test_lookups_replay_mock_data_and_are_cached() -> None:
+    with VerificationStubServer() as stub:
+        gateway = VerificationGateway(stub.gst_url, stub.cbs_url)
+        service = VerificationService(gateway)
+        try:
+            result = service.verify_gst_invoice(INVOICE.lower())
+            assert result["verified"] is True
+            assert result["registered_data"] == INVOICE_RECORD
+            assert service.verify_bank_sanction(APPLICANT, LOAN["allowed_asset"])["sanction_details"] == LOAN
+            assert service.verify_gst_invoice("INV-UNKNOWN")["verified"] is False
+
+            # Repeats, including the "not found", come from the TTL cache.
+            service.verify_gst_invoice(INVOICE)
+            service.verify_gst_invoice("INV-UNKNOWN")
+        finally:
+            gateway.close()
+
+    assert stub.request_count == 3
+
+
+def test_concurrent_lookups_share_requests_and_respect_the_limit() -> None:
+    with VerificationStubServer(latency_ms=50) as stub:
+        gateway = VerificationGateway(stub.gst_url, stub.cbs_url, max_concurrency=2)
+        try:
+            gateway.prefetch(INVOICE, APPLICANT)
+            with ThreadPoolExecutor(8) as pool:
+                keys = [INVOICE] * 8 + [f"INV-{idx}" for idx in range(6)]
+                results = list(pool.map(gateway.gst_invoice, keys))
+            assert gateway.sanction(APPLICANT) == LOAN
+        finally:
+            gateway.close()
+
+    assert results[:8] == [INVOICE_RECORD] * 8
+    assert results[8:] == [None] * 6
+    assert stub.request_count == 8  # one per distinct key
+    assert stub.max_in_flight <= 4  # two per endpoint
+
+
+def test_failures_open_the_circuit_and_fail_soft() -> None:
+    with VerificationStubServer(fail_first=100) as stub:
+        gateway = VerificationGateway(stub.gst_url, stub.cbs_url, failure_threshold=2, reset_seconds=60)
+        service = VerificationService(gateway)
+        try:
+            for _ in range(4):
+                result = service.verify_bank_sanction(APPLICANT, "tractor")
+                assert result["match"] is False and result["gateway_error"] is True
+        finally:
+            gateway.close()
+
+    assert stub.request_count == 2
+    assert gateway.endpoints["cbs"].breaker.state == "open"
+
+
+def test_non_json_answers_fail_soft_and_half_open_trials_settle() -> None:
+    with VerificationStubServer(fail_first=2, fail_status=200, fail_body=b"<html>proxy error</html>") as stub:
+        gateway = VerificationGateway(stub.gst_url, stub.cbs_url, failure_threshold=1, reset_seconds=0.05)
+        service = VerificationService(gateway)
+        breaker = gateway.endpoints["gst"].breaker
+        try:
+            assert service.verify_gst_invoice(INVOICE)["gateway_error"] is True
+            time.sleep(0.06)
+            with pytest.raises(GatewayUnavailable):
+                gateway.gst_invoice(INVOICE)  # the half-open trial gets a bad body too
+            assert breaker.state == "open" and not breaker._trial_running
+            time.sleep(0.06)
+            assert gateway.gst_invoice(INVOICE) == INVOICE_RECORD
+        finally:
+            gateway.close()
+
+    assert breaker.state == "closed"
+
+
+def test_timeouts_and_unset_endpoints_fall_back() -> None:
+    class Registry:
+        version = "local"
+
+        def gst_invoice(self, key):
+            return {"gstin": "from-registry"}
+
+    with VerificationStubServer(latency_ms=500) as stub:
+        gateway = VerificationGateway(cbs_url=stub.cbs_url, fallback=Registry(), timeout_seconds=0.05)
+        service = VerificationService(gateway)
+        try:
+            assert gateway.gst_invoice(INVOICE) == {"gstin": "from-registry"}
+            assert gateway.version == "gateway+local"
+            assert "gateway unavailable" in service.verify_bank_sanction(APPLICANT, "tractor")["reason"]
+        finally:
+            gateway.close()
+
+
+def test_stored_answers_expire_with_the_cache_ttl() -> None:
+    with VerificationStubServer() as stub:
+        cached = VerificationGateway(stub.gst_url, stub.cbs_url, cache_ttl_seconds=0.05)
+        uncached = VerificationGateway(stub.gst_url, stub.cbs_url, cache_ttl_seconds=0)
+        try:
+            first = VerificationService(cached).answers_version
+            assert first.startswith("gateway@")
+            time.sleep(0.06)
+            assert cached.answers_version != first
+            assert uncached.answers_version != uncached.answers_version
+        finally:
+            cached.close()
+            uncached.close()
+
+
+def test_breaker_lets_one_trial_through_after_reset() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow() is False
+    now[0] = 10.0
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # a trial is already running
+    breaker.record_success()
+    assert breaker.state == "closed"
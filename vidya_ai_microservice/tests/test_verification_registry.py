@@ -0,0 +1,59 @@
+"""Tests for the on-disk verification registry and the service reading it."""
+
+from __future__ import annotations
+
+from app.services.mock_data import SANCTIONED_LOANS, VALID_GST_INVOICES
+from app.services.verification import VerificationService
+from app.services.verification_registry import VerificationRegistry, import_registry, read_extract
+
+GST_ROW = {"invoice_number": "inv-1", "gstin": "29BFBRJ8715S1ZE", "vendor": "Agri Corp", "amount": "1200.5", "date": ""}
+
+
+def test_demo_seed_matches_bundled_records(tmp_path) -> None:
+    registry = VerificationRegistry(tmp_path / "registry.db", seed_demo=True)
+    service = VerificationService(registry)
+
+    invoice, record = next(iter(VALID_GST_INVOICES.items()))
+    result = service.verify_gst_invoice(invoice.lower())
+    assert result["verified"] is True
+    assert result["registered_data"] == record
+
+    applicant, loan = next(iter(SANCTIONED_LOANS.items()))
+    assert service.verify_bank_sanction(applicant, loan["allowed_asset"])["sanction_details"] == loan
+    assert service.verify_bank_sanction("APPLICANT-UNKNOWN", "tractor")["match"] is False
+    assert registry.snapshot.counts == {"gst_invoices": len(VALID_GST_INVOICES), "sanctions": len(SANCTIONED_LOANS)}
+
+
+def test_reimport_swaps_atomically_and_keeps_missing_extracts(tmp_path) -> None:
+    path = tmp_path / "registry.db"
+    import_registry(path, [GST_ROW], [{"applicant_id": "A-1", "allowed_asset": "tractor", "max_amount": 5}], "v1")
+    registry = VerificationRegistry(path)
+    old = registry.snapshot
+    assert registry.gst_invoice("INV-1")["amount"] == 1200.5
+
+    # Only a new GST extract: sanctions are carried over from the live file.
+    import_registry(path, [{**GST_ROW, "invoice_number": "INV-2"}], None, "v2")
+    assert old.lookup("gst_invoices", "INV-2") is None  # a published snapshot never changes underneath readers
+
+    assert registry.refresh() is True
+    assert registry.version == "v2"
+    assert registry.gst_invoice("INV-1") is None
+    assert registry.gst_invoice("INV-2")["gstin"] == "29BFBRJ8715S1ZE"
+    assert registry.sanction("A-1") == {"allowed_asset": "tractor", "max_amount": 5.0}
+    assert registry.refresh() is False
+
+
+def test_hot_key_cache_is_bounded_and_extracts_stream_from_csv(tmp_path) -> None:
+    extract = tmp_path / "gstn.csv"
+    rows = [f"INV-{idx},,Vendor {idx},{idx},2025-01-01" for idx in range(50)]
+    lines = ["invoice_number,gstin,vendor,amount,date", *rows]
+    extract.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    path = tmp_path / "registry.db"
+    counts = import_registry(path, read_extract(extract), [])
+    registry = VerificationRegistry(path, cache_entries=8)
+
+    assert counts == {"gst_invoices": 50, "sanctions": 0}
+    for idx in range(50):
+        assert registry.gst_invoice(f"INV-{idx}")["vendor"] == f"Vendor {idx}"
+    assert registry.gst_invoice("INV-404") is None
+    assert len(registry.snapshot._cache) == 8
@@ -0,0 +1,68 @@
+"""Tests for the pooled Vision REST client against the local stub server."""
+
+from __future__ import annotations
+
+import base64
+
+from app.config import ocr_config
+from app.schemas import EvidenceDocument
+from app.services.ocr_processing import DocumentOCRService
+from app.services.vision_client import VisionRestClient
+from app.stubs import VisionStubServer
+from app.utils.media_loader import MediaLoader
+
+
+def _document(idx: int) -> EvidenceDocument:
+    return EvidenceDocument(id=f"page-{idx}", base64_data=base64.b64encode(f"page {idx}".encode()).decode())
+
+
+def test_annotate_batches_up_to_sixteen_images_per_request() -> None:
+    with VisionStubServer(text_for=lambda content: base64.b64decode(content).decode()) as stub:
+        client = VisionRestClient("test-key", base_url=stub.base_url)
+        contents = [base64.b64encode(f"page {idx}".encode()).decode() for idx in range(20)]
+
+        results = client.annotate(contents)
+
+    assert sorted(stub.batch_sizes) == [4, 16]
+    assert [text for text, _ in results] == [f"page {idx}" for idx in range(20)]
+    assert all(confidence == 0.9 for _, confidence in results)
+
+
+def test_rest_confidence_stays_fixed_whatever_the_pages_report() -> None:
+    response = {"fullTextAnnotation": {"text": "Total: 100", "pages": [{"confidence": 0.4}, {"confidence": 0.5}]}}
+
+    assert VisionRestClient._parse_response(response) == ("Total: 100", 0.9)
+
+
+def test_annotate_retries_transient_failures() -> None:
+    with VisionStubServer(fail_first=2) as stub:
+        client = VisionRestClient("test-key", base_url=stub.base_url, backoff_seconds=0.0)
+
+        results = client.annotate(["aW1hZ2U="])
+
+    assert stub.request_count == 3
+    assert results[0][0].startswith("Vendor: Agri Supplies")
+
+
+def test_annotate_gives_up_after_max_retries() -> None:
+    with VisionStubServer(fail_first=10) as stub:
+        client = VisionRestClient("test-key", base_url=stub.base_url, max_retries=1, backoff_seconds=0.0)
+
+        results = client.annotate(["aW1hZ2U="])
+
+    assert stub.request_count == 2
+    assert results == [("", 0.0)]
+
+
+def test_multi_page_invoice_uses_one_request() -> None:
+    with VisionStubServer() as stub:
+        service = DocumentOCRService(
+            MediaLoader(), ocr_config, rest_client=VisionRestClient("test-key", base_url=stub.base_url)
+        )
+
+        results = service.process_documents([_document(idx) for idx in range(3)], "Agri Supplies", 245000.0, None)
+
+    assert stub.batch_sizes == [3]
+    assert [result.doc_id for result in results] == ["page-0", "page-1", "page-2"]
+    assert all(result.parsed_fields["amount"] == 245000.0 for result in results)
+    assert all(result.crosscheck_results["vendor_match"] for result in results)